@@ -0,0 +1,101 @@
+"""Load-tests the full game loop of LLMAgent teams against the offline fake provider.
+
+Run with:
+
+    uv run python -m benchmarks.load --teams 4 --latency 0.2 --latency-distribution lognormal \\
+        --rate-limit-rate 0.05 --malformed-rate 0.1 --deadline 1.0
+
+Every team plays real games through `Team.play_games`, with results written
+to a temporary directory, and every agent talks to one shared `FakeClient`.
+The report gives throughput and decision latency percentiles for the run,
+how decisions were reached, and what the fake provider injected.
+"""
+import argparse
+import logging
+import tempfile
+import time
+from collections import Counter, deque
+
+from themind.agents import FakeClient, LLMAgent, Team
+from themind.agents.llmagent import percentile
+from themind.main import run_teams
+
+
+def build_teams(args: argparse.Namespace, client: FakeClient, results_dir: str) -> list[Team]:
+    """Creates `args.teams` teams of LLMAgents sharing the fake client."""
+    teams = []
+    for team_index in range(args.teams):
+        agents = []
+        for player in range(args.players):
+            agent = LLMAgent(
+                name=f"Team {team_index + 1} Player {player + 1}",
+                model_name="fake",
+                decision_deadline=args.deadline,
+                hedge_percentile=args.hedge_percentile,
+                fallback="gap",
+                client=client,
+            )
+            agent.decision_events = deque()  # Keep every decision, not just the most recent
+            agents.append(agent)
+        teams.append(Team(agents, args.games, results_dir, stream=True))
+    return teams
+
+
+def report(teams: list[Team], client: FakeClient, elapsed: float):
+    """Prints throughput, latency percentiles and outcome counts for a finished run."""
+    events = [event for team in teams for agent in team.agents for event in agent.decision_events]
+    latencies = [event.latency for event in events]
+    games = sum(team.stats.games_played for team in teams)
+    wins = sum(team.stats.wins for team in teams)
+
+    print(f"games:      {games} ({wins} won) in {elapsed:.2f}s, {games / elapsed:.2f} games/s")
+    print(f"decisions:  {len(events)}, {len(events) / elapsed:.1f} decisions/s")
+    print(f"requests:   {client.requests}, {client.requests / elapsed:.1f} requests/s")
+    if latencies:
+        print("latency:    " + ", ".join(
+            f"p{q} {percentile(latencies, q) * 1000:.1f}ms" for q in (50, 90, 99)
+        ) + f", max {max(latencies) * 1000:.1f}ms")
+    outcomes = Counter(event.outcome for event in events)
+    print("outcomes:   " + ", ".join(f"{outcome} {count}" for outcome, count in sorted(outcomes.items())))
+    print(f"injected:   {client.rate_limited} rate limits, {client.errors} server errors, "
+          f"{client.malformed} malformed replies ({client.heals} heals)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test LLMAgent teams against a fake LLM provider.")
+    parser.add_argument("--teams", type=int, default=1, help="Teams playing concurrently.")
+    parser.add_argument("--players", type=int, default=2, help="LLMAgents per team.")
+    parser.add_argument("--games", type=int, default=5, help="Games per team.")
+    parser.add_argument("--strategy", default="gap", help="How the fake provider answers decisions.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean seconds per request.")
+    parser.add_argument("--latency-distribution", default="lognormal",
+                        help="constant, uniform, exponential or lognormal.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a server error.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a 429.")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Probability of a malformed reply.")
+    parser.add_argument("--deadline", type=float, default=None, help="LLMAgent decision deadline in seconds.")
+    parser.add_argument("--hedge-percentile", type=float, default=None, help="LLMAgent hedging percentile.")
+    parser.add_argument("--seed", type=int, default=0, help="Seeds the fake provider.")
+    parser.add_argument("--log-level", default="ERROR", help="Logging level; retries and heals log warnings.")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s - %(levelname)s - %(message)s')
+
+    client = FakeClient(
+        strategy=args.strategy,
+        latency=args.latency,
+        latency_distribution=args.latency_distribution,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+    with tempfile.TemporaryDirectory() as results_dir:
+        teams = build_teams(args, client, results_dir)
+        start = time.perf_counter()
+        run_teams(teams)
+        elapsed = time.perf_counter() - start
+    report(teams, client, elapsed)
+
+
+if __name__ == "__main__":
+    main()
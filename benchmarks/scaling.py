@@ -0,0 +1,47 @@
+"""Measures how the engine's per-turn cost scales with deck size and table size.
+
+Run with:
+
+    uv run python -m benchmarks.scaling
+
+Every game is played by PerfectAgents, which never make a mistake, so each
+configuration plays its full level schedule.
+"""
+import argparse
+import time
+
+from themind.agents import PerfectAgent
+from themind.game import Game, GameRules
+
+
+def time_games(deck_size: int, num_players: int, num_levels: int, num_games: int) -> tuple[float, int]:
+    """Plays `num_games` games and returns (seconds per turn, turns per game)."""
+    rules = GameRules(deck_size=deck_size, num_levels=num_levels)
+    total_turns = 0
+    start = time.perf_counter()
+    for _ in range(num_games):
+        players = [PerfectAgent(name=f"Player {i + 1}") for i in range(num_players)]
+        game = Game(players, rules=rules)
+        game.play()
+        total_turns += sum(len(level.turns) for level in game.levels)
+    elapsed = time.perf_counter() - start
+    return elapsed / total_turns, total_turns // num_games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark engine cost against deck and table size.")
+    parser.add_argument("--games", type=int, default=20, help="Games to play per configuration.")
+    parser.add_argument("--levels", type=int, default=12, help="Levels per game.")
+    args = parser.parse_args()
+
+    print(f"{'deck size':>10} {'players':>8} {'turns/game':>11} {'us/turn':>9}")
+    for deck_size in (100, 10_000, 1_000_000):
+        per_turn, turns = time_games(deck_size, 4, args.levels, args.games)
+        print(f"{deck_size:>10} {4:>8} {turns:>11} {per_turn * 1e6:>9.1f}")
+    for num_players in (8, 64, 256):
+        per_turn, turns = time_games(1_000_000, num_players, args.levels, max(1, args.games // num_players))
+        print(f"{1_000_000:>10} {num_players:>8} {turns:>11} {per_turn * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from themind.agents import PerfectAgent, NoisyAgent
+from themind.agents.team import Team
+from themind.analysis.paired import compare_teams, paired_difference
+from themind.game.deals import DealLibrary
+from themind.game.game import Game, GameRules
+
+
+@pytest.fixture
+def library(tmp_path):
+    return DealLibrary.build(str(tmp_path / "deals.npy"), num_games=3, seed=7, max_players=4)
+
+
+def test_build_and_open(library, tmp_path):
+    """Tests that a built library reopens memory-mapped with the same deals."""
+    reopened = DealLibrary(str(tmp_path / "deals.npy"))
+
+    assert (reopened.num_games, reopened.num_levels, reopened.cards_per_deal) == (3, 12, 48)
+    assert isinstance(reopened.cards, np.memmap)
+    assert reopened.deal(2, 5, 4, 5) == library.deal(2, 5, 4, 5)
+
+
+def test_deals_are_seeded_by_game(tmp_path):
+    """Tests that libraries with the same seed agree on shared games and differ across seeds."""
+    small = DealLibrary.build(str(tmp_path / "small.npy"), num_games=1, seed=7)
+    large = DealLibrary.build(str(tmp_path / "large.npy"), num_games=2, seed=7)
+    other = DealLibrary.build(str(tmp_path / "other.npy"), num_games=1, seed=8)
+
+    assert small.deal(0, 3, 2, 3) == large.deal(0, 3, 2, 3)
+    assert small.deal(0, 3, 2, 3) != other.deal(0, 3, 2, 3)
+
+
+def test_open_or_build_reuses_a_matching_library(library, tmp_path):
+    """Tests that an existing library is reopened when it covers the configuration."""
+    reopened = DealLibrary.open_or_build(str(tmp_path / "deals.npy"), 2, seed=7, max_players=3)
+
+    assert reopened.deal(1, 4, 3, 4) == library.deal(1, 4, 3, 4)
+
+
+@pytest.mark.parametrize("num_games, seed, max_players, problem", [
+    (5, 7, 4, "3 games, fewer than 5"),
+    (3, 8, 4, "seed 7, not 8"),
+    (3, 7, 9, "48 cards per deal, too few for 9 players"),
+])
+def test_open_or_build_rejects_a_mismatched_library(library, tmp_path, num_games, seed, max_players, problem):
+    """Tests that reusing a library built for another configuration fails up front, not mid-run."""
+    with pytest.raises(ValueError, match=problem):
+        DealLibrary.open_or_build(str(tmp_path / "deals.npy"), num_games, seed=seed, max_players=max_players)
+
+
+def test_deal_hands_are_disjoint(library):
+    """Tests that the hands dealt for one level never share a card."""
+    hands = library.deal(0, 12, 4, 12)
+    cards = [card for hand in hands for card in hand]
+
+    assert len(cards) == len(set(cards)) == 48
+    assert all(1 <= card <= 100 for card in cards)
+
+
+def test_deal_out_of_range(library):
+    """Tests that requests beyond the library are rejected."""
+    with pytest.raises(IndexError):
+        library.deal(3, 1, 2, 1)
+    with pytest.raises(ValueError):
+        library.deal(0, 12, 5, 12)
+
+
+def test_game_uses_library_deals(library):
+    """Tests that a game deals its hands from the library."""
+    players = [PerfectAgent(name="a"), PerfectAgent(name="b")]
+    game = Game(players, deal_library=library, game_index=1)
+
+    game.play_level()
+
+    assert game.levels[0].turns[0].player_hands == {"a": library.deal(1, 1, 2, 1)[0], "b": library.deal(1, 1, 2, 1)[1]}
+
+
+def test_game_rejects_library_for_other_deck(library):
+    """Tests that a library must match the game's deck size."""
+    with pytest.raises(ValueError):
+        Game([PerfectAgent(name="a")], rules=GameRules(deck_size=200), deal_library=library)
+
+
+def test_paired_difference():
+    """Tests the paired statistics on matched samples."""
+    result = paired_difference([5, 7, 9, 11], [4, 6, 8, 9])
+
+    assert result["mean_difference"] == 1.25
+    assert result["paired_standard_error"] == pytest.approx(0.25)
+    assert result["variance_reduction"] > 1
+
+
+def test_compare_teams_on_shared_deals(library, tmp_path):
+    """Tests that two teams playing the same library can be compared game by game."""
+    teams = []
+    for agents in (
+        [PerfectAgent(name="a"), PerfectAgent(name="b")],
+        [NoisyAgent(name="a", offset=0, noise=3), NoisyAgent(name="b", offset=0, noise=3)],
+    ):
+        team = Team(agents, 3, results_dir=str(tmp_path), game_options={"deal_library": library})
+        team.play_games()
+        teams.append(team)
+
+    assert teams[0].games[0].levels[0].turns[0].player_hands == teams[1].games[0].levels[0].turns[0].player_hands
+    comparison = compare_teams(teams[0].results_dir, teams[1].results_dir)
+    assert comparison["won"]["games"] == 3
+    assert comparison["levels_cleared"]["mean_a"] == 12
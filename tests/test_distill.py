@@ -0,0 +1,95 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from themind.agents.distill import DistilledAgent, PolicyTable, iter_logged_decisions, iter_results_decisions
+from themind.agents import AGENT_REGISTRY
+from themind.agents.llmagent import LLMAgent
+
+
+def write_level(game_dir, level_number, turns):
+    game_dir.mkdir(parents=True, exist_ok=True)
+    with open(game_dir / f"{level_number}.json", 'w') as f:
+        json.dump(turns, f)
+
+
+def test_iter_results_decisions(tmp_path):
+    """Tests that decisions are read from saved level files for the requested players."""
+    write_level(tmp_path / "team" / "1", 1, [{
+        "Previous-card": 10,
+        "Acting-player": "LLM",
+        "Card played": 12,
+        "Seconds waited": 2,
+        "Correct decision": True,
+        "LLM-hand": [12, 40],
+        "LLM-lowest-card": 12,
+        "LLM-seconds": 2,
+        "Other-hand": [30],
+        "Other-lowest-card": 30,
+        "Other-seconds": 20,
+        "Done-hand": [],
+        "Done-lowest-card": None,
+        "Done-seconds": None,
+    }])
+
+    assert list(iter_results_decisions(str(tmp_path))) == [((2, 2, 1), 2), ((20, 1, 2), 20)]
+    assert list(iter_results_decisions(str(tmp_path), ["LLM"])) == [((2, 2, 1), 2)]
+
+
+def test_iter_logged_decisions(tmp_path):
+    """Tests that decisions are read from a JSON Lines cache."""
+    path = tmp_path / "decisions.jsonl"
+    path.write_text(json.dumps({"hand": [50, 7], "last_played_card": 3, "num_other_cards": 6, "time_to_wait": 4}) + "\n")
+
+    assert list(iter_logged_decisions(str(path))) == [((4, 2, 6), 4)]
+
+
+@patch('themind.agents.llmagent.call_llm_with_retry')
+def test_llmagent_decision_log_round_trip(mock_call_llm, tmp_path):
+    """Tests that the decisions an LLMAgent logs are read back as distillation input."""
+    mock_call_llm.side_effect = ["seconds: 4", "no idea"]
+    path = tmp_path / "decisions.jsonl"
+    agent = LLMAgent(name="LLM", model_name="test_model", decision_log=str(path))
+    agent.receive_hand([50, 7])
+
+    agent.decide_move(last_played_card=3, num_other_cards=6)
+    with patch('themind.agents.llmagent.heal_llm_output', return_value="still no idea"):
+        agent.decide_move(last_played_card=3, num_other_cards=5)  # Answered by the fallback, so not logged
+
+    assert list(iter_logged_decisions(str(path))) == [((4, 2, 6), 4)]
+
+
+def test_policy_table_exact_and_interpolated_lookup():
+    """Tests that observed states replay their mean wait and unseen ones are interpolated."""
+    table = PolicyTable.from_decisions([
+        ((2, 1, 3), 2), ((2, 1, 3), 4),
+        ((10, 1, 3), 11),
+        ((20, 1, 3), 21),
+    ])
+
+    assert table.lookup(2, 1, 3) == 3
+    assert table.lookup(15, 1, 3) == 16
+    # An unseen group falls back to the nearest one.
+    assert table.lookup(10, 2, 3) == 11
+    # Gaps beyond the observed range follow the fitted slope.
+    assert table.lookup(30, 1, 3) > 21
+
+
+def test_policy_table_requires_entries():
+    """Tests that an empty table is rejected."""
+    with pytest.raises(ValueError):
+        PolicyTable.from_decisions([])
+
+
+def test_distilled_agent_replays_saved_policy(tmp_path):
+    """Tests that the registry agent plays from a saved policy table."""
+    path = tmp_path / "policy.json"
+    PolicyTable.from_decisions([((5, 2, 4), 7), ((1, 2, 4), 1)]).save(str(path))
+
+    agent = AGENT_REGISTRY["DistilledAgent"](name="distilled", policy_path=str(path))
+    agent.receive_hand([30, 15])
+    response = agent.decide_move(last_played_card=10, num_other_cards=4)
+
+    assert isinstance(agent, DistilledAgent)
+    assert response.card_to_play == 15
+    assert response.time_to_wait == 7
@@ -1,8 +1,8 @@
 import pytest
 from unittest.mock import patch, MagicMock
 
-from themind.game.game import Deck, Game
-from themind.agents.agents import DummyAgent, FastAgent
+from themind.game.game import Deck, Game, GameRules
+from themind.agents.agents import DummyAgent, FastAgent, PerfectAgent
 
 
 def test_deck_creation():
@@ -30,6 +30,57 @@ def test_deck_deal():
     assert len(deck.cards) == 95
 
 
+def test_large_deck_deal():
+    """Tests that a huge deck deals unique cards in range without building the whole deck."""
+    deck = Deck(1_000_000)
+    hand = deck.deal(50) + deck.deal(50)
+    assert len(set(hand)) == 100
+    assert all(1 <= card <= 1_000_000 for card in hand)
+    assert deck._cards is None
+
+
+def test_deck_deal_most_of_deck():
+    """Tests that dealing nearly the whole deck still deals every card exactly once."""
+    deck = Deck(10)
+    hand = deck.deal(3) + deck.deal(7)
+    assert sorted(hand) == list(range(1, 11))
+    assert deck.cards == []
+
+
+def test_game_rules_validation():
+    """Tests that inconsistent rules are rejected."""
+    with pytest.raises(ValueError):
+        GameRules(deck_size=0)
+    with pytest.raises(ValueError):
+        GameRules(num_levels=3, cards_per_level=[1, 2])
+    assert GameRules(num_levels=2, cards_per_level=[3, 5]).cards_for_level(2) == 5
+
+
+def test_game_with_custom_rules():
+    """Tests that a game follows the configured deck size and level schedule."""
+    players = [PerfectAgent(name="p1"), PerfectAgent(name="p2")]
+    game = Game(players, rules=GameRules(deck_size=1000, num_levels=3, cards_per_level=[2, 4, 6]))
+
+    game.play()
+
+    assert game.is_win()
+    assert [len(level.turns) for level in game.levels] == [4, 8, 12]
+    assert max(turn.played_card for level in game.levels for turn in level.turns) <= 1000
+
+
+def test_game_over_when_deck_too_small():
+    """Tests that the game ends when a level needs more cards than the deck holds."""
+    players = [PerfectAgent(name="p1"), PerfectAgent(name="p2")]
+    game = Game(players, rules=GameRules(deck_size=5, num_levels=3))
+
+    game.play()
+
+    assert game.game_over
+    assert not game.is_win()
+    assert len(game.levels) == 3
+    assert game.levels[-1].turns == []
+
+
 def test_agent_receive_hand():
     """Tests that an agent receives and sorts its hand."""
     agent = DummyAgent(name="test_agent")
@@ -120,3 +171,36 @@ def test_game_review(mock_deal: MagicMock):
         assert "    p1 played card 15 after waiting 10s." in actual_output
         assert "  Your Recommendation:" in actual_output
         assert "    You wanted to play card 25 and wait 10s." in actual_output
+
+
+@patch('themind.game.game.Deck.deal')
+def test_speculative_hints(mock_deal: MagicMock):
+    """Tests that each player is hinted at the state after the fastest player plays."""
+    players = [DummyAgent(name="p1"), FastAgent(name="p2"), DummyAgent(name="p3")]
+    game = Game(players, speculative=True)
+    mock_deal.side_effect = [[10], [5], [30]]
+
+    with patch.object(DummyAgent, 'prefetch') as mock_dummy_prefetch, \
+            patch.object(FastAgent, 'prefetch') as mock_fast_prefetch:
+        game.play_level()
+
+    # p2 plays first, then p1; p3 is left with no cards after its play and gets no hint on the last turn.
+    assert [c.args for c in mock_dummy_prefetch.call_args_list] == [([10], 5, 1), ([30], 5, 1), ([30], 10, 0)]
+    mock_fast_prefetch.assert_not_called()
+    assert [turn.played_card for turn in game.levels[0].turns] == [5, 10, 30]
+
+
+@patch('themind.game.game.Deck.deal')
+def test_speculative_hints_follow_fastest_decision_so_far(mock_deal: MagicMock):
+    """Tests that players are hinted as soon as they decide and re-hinted when a faster decision comes in."""
+    players = [DummyAgent(name="p1"), DummyAgent(name="p2"), FastAgent(name="p3")]
+    game = Game(players, speculative=True)
+    mock_deal.side_effect = [[10], [20], [5]]
+
+    with patch.object(DummyAgent, 'prefetch') as mock_dummy_prefetch:
+        game.play_level()
+
+    # On the first turn p2 is hinted that p1 plays 10, then p1 and p2 are told that p3 plays 5 instead.
+    assert [c.args for c in mock_dummy_prefetch.call_args_list] == [
+        ([20], 10, 1), ([10], 5, 1), ([20], 5, 1), ([20], 10, 0)
+    ]
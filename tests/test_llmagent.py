@@ -1,6 +1,9 @@
+import time
 import pytest
 from unittest.mock import patch
-from themind.agents.llmagent import LLMAgent, parse_message
+from themind.agents.llmagent import LLMAgent, parse_message, percentile
+from themind.agents.llmclient import configure_shared_clients
+from themind.agents.prompts import PromptBuilder, estimate_tokens
 from themind.agents.agents import AgentResponse
 
 def test_parse_message():
@@ -60,6 +63,11 @@ def test_llmagent_decide_move_with_healing(mock_call_llm, mock_heal_llm):
     assert response.time_to_wait == 5
     mock_call_llm.assert_called_once()
     mock_heal_llm.assert_called_once()
+    assert [usage.kind for usage in agent.token_usage] == ["decision", "heal"]
+    heal = agent.token_usage[1]
+    assert heal.completion_tokens == estimate_tokens("seconds: 5")
+    assert 0 < heal.prefix_tokens < heal.prompt_tokens
+    assert agent.token_totals.calls == 2
 
 
 @pytest.mark.integration
@@ -82,3 +90,177 @@ def test_llmagent_decide_move_integration():
     assert isinstance(response.time_to_wait, int)
     assert response.time_to_wait is not None
 
+
+
+@patch('themind.agents.llmagent.call_llm_with_retry')
+def test_llmagent_speculation_hit(mock_call_llm):
+    """Tests that a prefetched state is answered from the speculative query."""
+    mock_call_llm.return_value = "seconds: 7"
+    agent = LLMAgent(name="test_agent", model_name="test_model")
+    agent.receive_hand([10, 25])
+
+    agent.prefetch([10, 25], last_played_card=8, num_other_cards=2)
+    response = agent.decide_move(last_played_card=8, num_other_cards=2)
+
+    assert response.time_to_wait == 7
+    assert mock_call_llm.call_count == 1
+    assert agent.speculation_stats.hits == 1
+    assert agent.speculation_stats.hit_rate == 1.0
+
+
+@patch('themind.agents.llmagent.call_llm_with_retry')
+def test_llmagent_speculation_miss(mock_call_llm):
+    """Tests that a speculative query for another state is discarded."""
+    mock_call_llm.return_value = "seconds: 7"
+    agent = LLMAgent(name="test_agent", model_name="test_model")
+    agent.receive_hand([10, 25])
+
+    agent.prefetch([10, 25], last_played_card=8, num_other_cards=2)
+    agent.prefetch([10, 25], last_played_card=9, num_other_cards=2)
+    response = agent.decide_move(last_played_card=5, num_other_cards=3)
+
+    assert response.time_to_wait == 7
+    assert agent.speculation_stats.issued == 2
+    assert agent.speculation_stats.misses == 2
+    assert agent.speculation_stats.hits == 0
+
+
+@patch('themind.agents.llmagent.call_llm_with_retry')
+def test_llmagent_speculation_counts_wasted_calls(mock_call_llm):
+    """Tests that a discarded speculation whose query already ran is counted as a wasted call."""
+    mock_call_llm.return_value = "seconds: 7"
+    agent = LLMAgent(name="test_agent", model_name="test_model")
+    agent.receive_hand([10, 25])
+
+    agent.prefetch([10, 25], last_played_card=8, num_other_cards=2)
+    agent._speculation[1].result()
+    agent.decide_move(last_played_card=5, num_other_cards=3)
+
+    assert agent.speculation_stats.misses == 1
+    assert agent.speculation_stats.wasted == 1
+
+
+@patch('themind.agents.llmagent.call_llm_with_retry')
+def test_llmagent_close_shuts_down_background_pool(mock_call_llm):
+    """Tests that closing the agent discards its speculation and shuts down its pool."""
+    mock_call_llm.return_value = "seconds: 7"
+    agent = LLMAgent(name="test_agent", model_name="test_model")
+    agent.prefetch([10, 25], last_played_card=8, num_other_cards=2)
+    executor = agent._executor
+
+    agent.close()
+
+    assert agent._speculation is None
+    assert agent._executor is None
+    assert executor._shutdown
+    assert agent.speculation_stats.misses == 1
+
+
+@patch('themind.agents.llmagent.call_llm_with_retry')
+def test_llmagent_without_client_uses_shared_cache(mock_call_llm):
+    """Tests that the default llmutils path is answered from the shared response cache."""
+    mock_call_llm.return_value = "seconds: 7"
+    agent = LLMAgent(name="test_agent", model_name="test_model")
+    agent.receive_hand([10, 25])
+    try:
+        configure_shared_clients(requests_per_second=100, cache_size=10)
+        agent.decide_move(last_played_card=8, num_other_cards=2)
+        response = agent.decide_move(last_played_card=8, num_other_cards=2)
+    finally:
+        configure_shared_clients()
+
+    assert response.time_to_wait == 7
+    assert mock_call_llm.call_count == 1
+
+
+def slow_then_fast(delays: list[float], reply: str = "seconds: 12"):
+    """Returns a side effect that sleeps for the next delay before replying."""
+    delays = list(delays)
+
+    def respond(model, message):
+        time.sleep(delays.pop(0) if delays else 0)
+        return reply
+    return respond
+
+
+@patch('themind.agents.llmagent.call_llm_with_retry')
+def test_llmagent_deadline_uses_fallback_policy(mock_call_llm):
+    """Tests that a decision past its deadline is answered by the fallback policy."""
+    mock_call_llm.side_effect = slow_then_fast([0.5])
+    agent = LLMAgent(name="test_agent", model_name="test_model", decision_deadline=0.05, fallback="gap")
+    agent.receive_hand([10, 25])
+
+    response = agent.decide_move(last_played_card=4, num_other_cards=3)
+
+    assert response.time_to_wait == 6
+    assert agent.decision_events[-1].outcome == "deadline"
+    assert response.details["outcome"] == "deadline" and response.details["latency"] >= 0.05
+
+
+@patch('themind.agents.llmagent.call_llm_with_retry')
+def test_llmagent_hedged_request(mock_call_llm):
+    """Tests that a slow request is hedged and the faster duplicate wins."""
+    mock_call_llm.side_effect = slow_then_fast([0.5, 0.0])
+    agent = LLMAgent(name="test_agent", model_name="test_model", hedge_percentile=90, hedge_min_samples=3)
+    agent._latencies.extend([0.01, 0.01, 0.02])
+    agent.receive_hand([10, 25])
+
+    started = time.perf_counter()
+    response = agent.decide_move(last_played_card=4, num_other_cards=3)
+
+    assert response.time_to_wait == 12
+    assert time.perf_counter() - started < 0.4
+    assert mock_call_llm.call_count == 2
+    assert agent.decision_events[-1].outcome == "hedge"
+    assert agent.decision_events[-1].hedged
+
+
+def test_llmagent_unknown_fallback():
+    """Tests that an unknown fallback policy is rejected."""
+    with pytest.raises(ValueError):
+        LLMAgent(name="test_agent", fallback="guess")
+
+
+def test_percentile():
+    """Tests percentile interpolation."""
+    assert percentile([1, 2, 3, 4, 5], 50) == 3
+    assert percentile([0, 10], 99) == pytest.approx(9.9)
+
+
+def test_prompt_layout_is_static_first():
+    """Tests that prompts share their prefix across states and only differ after the notes."""
+    builder = PromptBuilder()
+    first = builder.decision("- Play fast", "The most recent card played was 3")
+    second = builder.decision("- Play fast", "The most recent card played was 40")
+
+    assert first.prefix == second.prefix
+    assert first.text.index("The Mind") < first.text.index("- Play fast") < first.text.index("card played was 3")
+    assert builder.prefix_tokens(first) == estimate_tokens(first.prefix)
+
+
+def test_estimate_tokens():
+    """Tests the local token estimate."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("seconds: 12") == 4
+    assert estimate_tokens("extraordinarily") == 4
+
+
+@patch('themind.agents.llmagent.call_llm_with_retry')
+def test_llmagent_records_token_usage(mock_call_llm):
+    """Tests that every LLM call records its estimated token counts."""
+    mock_call_llm.return_value = "seconds: 12"
+    agent = LLMAgent(name="test_agent", model_name="test_model")
+    agent.receive_hand([10, 25])
+
+    agent.decide_move(last_played_card=4, num_other_cards=3)
+    agent.decide_move(last_played_card=10, num_other_cards=2)
+    agent.review_game(["Game 1: ..."])
+
+    assert [usage.kind for usage in agent.token_usage] == ["decision", "decision", "review"]
+    decision = agent.token_usage[0]
+    assert decision.estimated
+    assert decision.completion_tokens == estimate_tokens("seconds: 12")
+    assert 0 < decision.prefix_tokens < decision.prompt_tokens
+    assert agent.token_totals.calls == 3
+    assert agent.token_totals.prompt_tokens == sum(usage.prompt_tokens for usage in agent.token_usage)
+    assert 0.5 < agent.token_totals.prefix_share < 1
@@ -0,0 +1,201 @@
+import time
+
+import openai
+import pytest
+from unittest.mock import patch, MagicMock
+
+from themind.agents.llmagent import LLMAgent
+from themind.agents.llmclient import (
+    CLIENT_REGISTRY, FakeClient, LocalClient, PooledHTTPClient, RateLimiter, ResponseCache, TransientLLMError,
+    configure_shared_clients, gap_responder, get_shared_client, resolve_client,
+)
+
+
+def test_gap_responder():
+    """Tests that the default local responder answers with the gap to the lowest card."""
+    prompt = "The most recent card played was 12\nYou have [20, 40] in your hand and your next card to be played is 20"
+    assert gap_responder("model", prompt) == "seconds: 8"
+
+
+def test_local_client_retries_transient_errors():
+    """Tests that transient failures are retried until a reply arrives."""
+    responder = MagicMock(side_effect=[TransientLLMError("429"), TransientLLMError("429"), "seconds: 3"])
+    client = LocalClient(responder=responder, max_retries=2)
+
+    assert client.complete("model", "prompt") == "seconds: 3"
+    assert responder.call_count == 3
+
+
+def test_local_client_gives_up_after_max_retries():
+    """Tests that the last transient failure is raised once retries run out."""
+    client = LocalClient(responder=MagicMock(side_effect=TransientLLMError("429")), max_retries=1)
+
+    with pytest.raises(TransientLLMError):
+        client.complete("model", "prompt")
+
+
+def test_shared_client_is_reused():
+    """Tests that clients requested by name are shared process-wide."""
+    assert get_shared_client("local") is get_shared_client("local")
+    assert resolve_client("local") is get_shared_client("local")
+
+
+def test_resolve_client_from_config():
+    """Tests that a config dict builds a dedicated client."""
+    client = resolve_client({"type": "local", "params": {"max_retries": 5}})
+
+    assert isinstance(client, LocalClient)
+    assert client.max_retries == 5
+    assert client is not get_shared_client("local")
+    with pytest.raises(ValueError):
+        resolve_client({"type": "carrier-pigeon"})
+
+
+def test_pooled_client_retries_provider_timeouts():
+    """Tests that provider timeouts are retried over the pooled connection."""
+    client = PooledHTTPClient(api_key="test", max_retries=1, backoff=0)
+    reply = MagicMock()
+    reply.choices[0].message.content = "seconds: 4"
+    create = MagicMock(side_effect=[openai.APITimeoutError(request=MagicMock()), reply])
+
+    with patch.object(client._client.chat.completions, 'create', create):
+        assert client.complete("model", "prompt") == "seconds: 4"
+    assert create.call_count == 2
+    assert create.call_args.kwargs["messages"] == [{"role": "user", "content": "prompt"}]
+
+
+def test_pooled_client_reports_usage():
+    """Tests that provider-reported token counts, including cached prefix tokens, are exposed per call."""
+    client = PooledHTTPClient(api_key="test")
+    reply = MagicMock()
+    reply.choices[0].message.content = "seconds: 4"
+    reply.usage.prompt_tokens = 300
+    reply.usage.completion_tokens = 5
+    reply.usage.prompt_tokens_details.cached_tokens = 256
+
+    with patch.object(client._client.chat.completions, 'create', MagicMock(return_value=reply)):
+        client.complete("model", "prompt")
+    assert client.last_usage() == {"prompt_tokens": 300, "completion_tokens": 5, "cached_tokens": 256}
+    assert LocalClient().last_usage() is None
+
+
+def test_llmagent_with_local_client():
+    """Tests that an LLMAgent decides, heals and reviews through its client."""
+    replies = iter(["I will wait 7 seconds.", "- New notes"])
+    agent = LLMAgent(name="local", client=LocalClient(responder=lambda model, prompt: next(replies)))
+    agent.receive_hand([10, 30])
+
+    response = agent.decide_move(last_played_card=3, num_other_cards=4)
+    agent.review_game(["Game 1: ..."])
+
+    assert response.time_to_wait == 7
+    assert agent.notes == "- New notes"
+
+
+def test_response_cache_is_bounded():
+    """Tests that the cache evicts its least recently used replies."""
+    cache = ResponseCache(max_entries=2)
+    cache.put("m", "a", "1")
+    cache.put("m", "b", "2")
+    cache.get("m", "a")
+    cache.put("m", "c", "3")
+
+    assert cache.get("m", "a") == "1"
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "c") == "3"
+
+
+def test_client_uses_cache():
+    """Tests that identical prompts are answered from an attached cache."""
+    responder = MagicMock(return_value="seconds: 2")
+    client = LocalClient(responder=responder)
+    client.cache = ResponseCache()
+
+    assert client.complete("m", "prompt") == client.complete("m", "prompt") == "seconds: 2"
+    assert responder.call_count == 1
+
+
+def test_rate_limiter_spaces_requests():
+    """Tests that requests beyond the burst wait for the configured rate."""
+    limiter = RateLimiter(requests_per_second=20, burst=1)
+
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+
+    assert time.monotonic() - started >= 0.09
+
+
+def test_configure_shared_clients():
+    """Tests that shared clients pick up the shared limiter and cache."""
+    client = get_shared_client("local")
+    try:
+        configure_shared_clients(requests_per_second=100, cache_size=10)
+        assert client.cache is not None and client.rate_limiter is not None
+        assert get_shared_client("local").cache is client.cache
+    finally:
+        configure_shared_clients()
+    assert client.cache is None
+
+
+def test_dedicated_clients_share_the_limiter_and_cache():
+    """Tests that clients built from a config dict use the shared limiter and cache, set before or after."""
+    before = resolve_client({"type": "local", "params": {"max_retries": 5}})
+    try:
+        configure_shared_clients(requests_per_second=100, cache_size=10)
+        after = resolve_client({"type": "local"})
+        for client in (before, after):
+            assert client.cache is get_shared_client("local").cache is not None
+            assert client.rate_limiter is get_shared_client("local").rate_limiter is not None
+    finally:
+        configure_shared_clients()
+    assert before.cache is None and after.rate_limiter is None
+
+
+def test_fake_client_latency_distributions():
+    """Tests that fake latencies have the configured mean."""
+    for distribution in ("constant", "uniform", "exponential", "lognormal"):
+        client = FakeClient(latency=0.01, latency_distribution=distribution, seed=0)
+        draws = [client._draw_latency() for _ in range(5000)]
+        assert sum(draws) / len(draws) == pytest.approx(0.01, rel=0.1)
+
+
+def test_fake_client_injects_and_retries_failures():
+    """Tests that injected 429s and server errors are retried and counted."""
+    client = FakeClient(rate_limit_rate=0.2, error_rate=0.1, max_retries=10, seed=1)
+    prompt = "The most recent card played was 12\nYou have [20] in your hand and your next card to be played is 20"
+
+    replies = [client.complete("model", prompt) for _ in range(50)]
+
+    assert replies == ["seconds: 8"] * 50
+    assert client.rate_limited > 0 and client.errors > 0
+    assert client.requests == 50 + client.rate_limited + client.errors
+
+
+def test_fake_client_malformed_replies_are_healed_through_the_provider():
+    """Tests that an LLMAgent heals malformed fake replies with a request to the fake provider."""
+    client = FakeClient(malformed_rate=1.0, latency=0.001, seed=0)
+    agent = LLMAgent(name="fake", client=client)
+    agent.receive_hand([10, 30])
+
+    response = agent.decide_move(last_played_card=3, num_other_cards=4)
+
+    assert response.time_to_wait == 7
+    assert client.malformed == 1 and client.heals == 1
+    assert [usage.kind for usage in agent.token_usage] == ["decision", "heal"]
+
+
+def test_fake_client_script():
+    """Tests that scripted replies are returned in order, cycling."""
+    client = FakeClient(script=["seconds: 1", "seconds: 2"])
+    assert [client.complete("model", "prompt") for _ in range(3)] == ["seconds: 1", "seconds: 2", "seconds: 1"]
+
+
+def test_fake_client_from_config():
+    """Tests that the fake provider is registered and rejects bad settings."""
+    assert CLIENT_REGISTRY["fake"] is FakeClient
+    assert resolve_client({"type": "fake", "params": {"latency": 0.1}}).latency == 0.1
+    with pytest.raises(ValueError):
+        FakeClient(latency_distribution="pareto")
+    with pytest.raises(ValueError):
+        FakeClient(error_rate=1.5)
@@ -1,9 +1,11 @@
+import argparse
 import pytest
 import yaml
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
-from themind.main import main
+from themind.main import build_team, main, run_teams, find_config_files
+from themind.game.realtime import VirtualClock
 from themind.agents import RandomAgent, PerfectAgent
 
 
@@ -15,6 +17,12 @@ def create_test_config(tmp_path: Path, config_data: dict) -> str:
     return str(config_file)
 
 
+def make_args(*config_files: str) -> argparse.Namespace:
+    """Helper function to build the parsed command line arguments."""
+    return argparse.Namespace(config_file=list(config_files), workers=None, rate_limit=None, cache_size=None,
+                              profile=None, profile_output="profile", profile_interval=0.005)
+
+
 @patch('themind.main.argparse.ArgumentParser')
 @patch('themind.main.Team')
 def test_successful_agent_creation(mock_team, mock_argparse, tmp_path):
@@ -33,7 +41,7 @@ def test_successful_agent_creation(mock_team, mock_argparse, tmp_path):
 
     # Mock argparse to return the path to our test config
     mock_parser = MagicMock()
-    mock_parser.parse_args.return_value.config_file = config_file_path
+    mock_parser.parse_args.return_value = make_args(config_file_path)
     mock_argparse.return_value = mock_parser
 
     # Act
@@ -63,9 +71,109 @@ def test_unknown_agent_type(mock_argparse, tmp_path):
 
     # Mock argparse
     mock_parser = MagicMock()
-    mock_parser.parse_args.return_value.config_file = config_file_path
+    mock_parser.parse_args.return_value = make_args(config_file_path)
     mock_argparse.return_value = mock_parser
 
     # Act & Assert
     with pytest.raises(ValueError, match="Unknown agent type: UnknownAgent"):
         main()
+
+
+@patch('themind.main.argparse.ArgumentParser')
+def test_multiple_configs_run_concurrently(mock_argparse, tmp_path):
+    """
+    Tests that every config in a directory gets its own team and results directory.
+    """
+    # Arrange
+    config_dir = tmp_path / "configs"
+    config_dir.mkdir()
+    for name in ("a", "b"):
+        with open(config_dir / f"{name}.yaml", 'w') as f:
+            yaml.dump({
+                "game_name": name,
+                "num_games": 2,
+                "results_dir": str(tmp_path / "results"),
+                "agents": [{"type": "PerfectAgent", "name": "p1"}, {"type": "PerfectAgent", "name": "p2"}],
+            }, f)
+    (config_dir / "notes.txt").write_text("not a config")
+
+    mock_parser = MagicMock()
+    mock_parser.parse_args.return_value = make_args(str(config_dir))
+    mock_argparse.return_value = mock_parser
+
+    # Act
+    with patch('themind.main.run_teams', wraps=run_teams) as mock_run:
+        main()
+
+    # Assert
+    teams = mock_run.call_args[0][0]
+    assert len(teams) == 2
+    assert teams[0].results_dir != teams[1].results_dir
+    assert all(team.stats.games_played == 2 for team in teams)
+    assert all((Path(team.results_dir) / "summary.json").is_file() for team in teams)
+
+
+@pytest.mark.parametrize("real_time", [True, {}, {"speedup": 10}])
+def test_real_time_enabled(real_time, tmp_path):
+    """Tests that any real_time setting other than false, including an empty mapping, plays on a virtual clock."""
+    team = build_team({"results_dir": str(tmp_path), "real_time": real_time,
+                       "agents": [{"type": "PerfectAgent", "name": "p1"}]})
+    assert isinstance(team.game_options["clock"], VirtualClock)
+
+
+def test_real_time_disabled(tmp_path):
+    """Tests that real_time: false plays turn by turn."""
+    team = build_team({"results_dir": str(tmp_path), "real_time": False,
+                       "agents": [{"type": "PerfectAgent", "name": "p1"}]})
+    assert "clock" not in team.game_options
+
+
+def test_run_teams_needs_a_team():
+    """Tests that running no teams fails with a clear error rather than inside the thread pool."""
+    with pytest.raises(ValueError, match="No teams to run"):
+        run_teams([])
+
+
+@patch('themind.main.argparse.ArgumentParser')
+def test_empty_config_directory(mock_argparse, tmp_path):
+    """Tests that a directory without configs is reported as a usage error."""
+    mock_parser = MagicMock()
+    mock_parser.parse_args.return_value = make_args(str(tmp_path))
+    mock_parser.error.side_effect = SystemExit(2)
+    mock_argparse.return_value = mock_parser
+
+    with pytest.raises(SystemExit):
+        main()
+    assert "No YAML config files found" in mock_parser.error.call_args[0][0]
+
+
+@patch('themind.main.argparse.ArgumentParser')
+def test_profile_option(mock_argparse, tmp_path):
+    """Tests that --profile writes collapsed stacks and phase timings for the run."""
+    config_file = create_test_config(tmp_path, {
+        "num_games": 2,
+        "results_dir": str(tmp_path / "results"),
+        "agents": [{"type": "PerfectAgent", "name": "p1"}, {"type": "PerfectAgent", "name": "p2"}],
+    })
+    args = make_args(config_file)
+    args.profile = "sample"
+    args.profile_output = str(tmp_path / "profile")
+    mock_parser = MagicMock()
+    mock_parser.parse_args.return_value = args
+    mock_argparse.return_value = mock_parser
+
+    main()
+
+    assert (tmp_path / "profile.collapsed").is_file()
+    assert "persist" in (tmp_path / "profile.phases.collapsed").read_text()
+
+
+def test_find_config_files(tmp_path):
+    """Tests that directories expand to their YAML files in order."""
+    (tmp_path / "b.yml").write_text("")
+    (tmp_path / "a.yaml").write_text("")
+    (tmp_path / "c.txt").write_text("")
+
+    assert find_config_files([str(tmp_path), "other.yaml"]) == [
+        str(tmp_path / "a.yaml"), str(tmp_path / "b.yml"), "other.yaml"
+    ]
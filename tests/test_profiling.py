@@ -0,0 +1,89 @@
+import pstats
+import threading
+import time
+import pytest
+from themind.agents import PerfectAgent, Team
+from themind.game import Game
+from themind.profiling import Profiler, phase, current_phases, _thread_phases
+
+
+def read_collapsed(path) -> dict[str, int]:
+    """Parses a collapsed-stack file into {stack: count}."""
+    counts = {}
+    with open(path) as f:
+        for line in f:
+            stack, count = line.rsplit(" ", 1)
+            counts[stack] = int(count)
+    return counts
+
+
+def test_phase_is_a_no_op_without_a_profiler():
+    """Tests that phases record nothing when no profiler is running."""
+    _thread_phases.clear()
+    with phase("decide"):
+        assert current_phases(threading.get_ident()) == []
+
+
+def test_phase_times_exclude_nested_phases(tmp_path):
+    """Tests that each phase is charged only for the time outside its nested phases."""
+    profiler = Profiler("sample", str(tmp_path / "out"), interval=1)
+    with profiler:
+        with phase("review"):
+            with phase("decide"):
+                time.sleep(0.05)
+
+    assert profiler.phase_times["review;decide"] >= 0.05
+    assert profiler.phase_times["review"] < 0.05
+
+
+def test_sampling_profile_of_a_game(tmp_path):
+    """Tests that sampled stacks are prefixed with the phase they were taken in."""
+    def slow_decide(self, last_played_card, num_other_cards):
+        time.sleep(0.002)
+        return PerfectAgent.decide_move(self, last_played_card, num_other_cards)
+
+    class SlowAgent(PerfectAgent):
+        decide_move = slow_decide
+
+    game = Game([SlowAgent("a"), SlowAgent("b")])
+    with Profiler("sample", str(tmp_path / "profile"), interval=0.001):
+        game.play()
+
+    stacks = read_collapsed(tmp_path / "profile.collapsed")
+    assert any(stack.startswith("decide;") and "slow_decide" in stack for stack in stacks)
+    phases = read_collapsed(tmp_path / "profile.phases.collapsed")
+    assert {"deal", "decide", "resolve"} <= set(phases)
+
+
+def test_parallel_reviews_are_attributed_to_the_review_phase(tmp_path):
+    """Tests that reviews run on the team's pool threads are still charged to the review phase."""
+    def slow_review(self, game_reviews):
+        time.sleep(0.02)
+
+    class ReviewingAgent(PerfectAgent):
+        review_game = slow_review
+
+    team = Team([ReviewingAgent("a"), ReviewingAgent("b")], 2, results_dir=str(tmp_path / "results"),
+                review_workers=2)
+    with Profiler("sample", str(tmp_path / "profile"), interval=0.001):
+        team.play_games()
+
+    stacks = read_collapsed(tmp_path / "profile.collapsed")
+    review_stacks = [stack for stack in stacks if "slow_review" in stack]
+    assert review_stacks and all(stack.startswith("review;") for stack in review_stacks)
+
+
+def test_cprofile_mode(tmp_path):
+    """Tests that the deterministic mode writes a pstats file and phase timings."""
+    with Profiler("cprofile", str(tmp_path / "profile")):
+        Game([PerfectAgent("a"), PerfectAgent("b")]).play()
+
+    stats = pstats.Stats(str(tmp_path / "profile.prof"))
+    assert any(func[2] == "play_level" for func in stats.stats)
+    assert (tmp_path / "profile.phases.collapsed").exists()
+
+
+def test_profiler_rejects_unknown_mode():
+    """Tests that an unknown profiling mode is rejected."""
+    with pytest.raises(ValueError):
+        Profiler("perf")
@@ -0,0 +1,116 @@
+from unittest.mock import patch, MagicMock
+
+from themind.game.game import Game
+from themind.game.realtime import VirtualClock, TimerQueue
+from themind.agents.agents import Agent, AgentResponse, DummyAgent, FastAgent, PerfectAgent
+
+
+class PatientAgent(Agent):
+    """Waits a fixed time measured from its first decision, ignoring other plays."""
+
+    def __init__(self, name: str, wait: int):
+        super().__init__(name)
+        self.wait = wait
+
+    def decide_move(self, last_played_card: int, num_other_cards: int) -> AgentResponse:
+        return AgentResponse(card_to_play=min(self.hand), time_to_wait=self.wait)
+
+    def on_card_played(self, player_name: str, last_played_card: int, num_other_cards: int):
+        return None
+
+    def review_game(self, game_reviews: list[str]):
+        pass
+
+
+def test_timer_queue_orders_by_time_then_player():
+    """Tests that timers fire in time order and ties go to the lower player index."""
+    timers = TimerQueue()
+    timers.schedule(1, 5.0)
+    timers.schedule(0, 5.0)
+    timers.schedule(2, 1.0)
+
+    assert timers.pop() == (1.0, 2)
+    assert timers.pop() == (5.0, 0)
+    assert timers.pop() == (5.0, 1)
+    assert not timers
+
+
+def test_timer_queue_reschedule_and_cancel():
+    """Tests that rescheduling replaces a timer and cancelling removes it."""
+    timers = TimerQueue()
+    timers.schedule(0, 1.0)
+    timers.schedule(0, 9.0)
+    timers.schedule(1, 3.0)
+    timers.cancel(1)
+
+    assert timers.pop() == (9.0, 0)
+    assert not timers
+
+
+@patch('themind.game.realtime.time.sleep')
+def test_virtual_clock_speedup(mock_sleep: MagicMock):
+    """Tests that a paced clock sleeps for the scaled interval and never goes backwards."""
+    clock = VirtualClock(speedup=10)
+    clock.advance_to(20)
+    clock.advance_to(5)
+
+    assert clock.now == 20
+    mock_sleep.assert_called_once_with(2.0)
+
+
+@patch('themind.game.realtime.time.sleep')
+def test_virtual_clock_as_fast_as_possible(mock_sleep: MagicMock):
+    """Tests that an unpaced clock never sleeps."""
+    clock = VirtualClock()
+    clock.advance_to(100)
+
+    assert clock.now == 100
+    mock_sleep.assert_not_called()
+
+
+@patch('themind.game.game.Deck.deal')
+def test_real_time_level_matches_turn_based(mock_deal: MagicMock):
+    """Tests that re-deciding agents play the same cards as in the turn-based engine."""
+    players = [PerfectAgent(name="p1"), PerfectAgent(name="p2")]
+    game = Game(players, clock=VirtualClock())
+    mock_deal.side_effect = [[10, 40], [20, 30]]
+    game.current_level_number = 2
+
+    game.play_level()
+
+    assert not game.game_over
+    level = game.levels[0]
+    assert [turn.played_card for turn in level.turns] == [10, 20, 30, 40]
+    assert [turn.played_at for turn in level.turns] == [10, 20, 30, 40]
+
+
+@patch('themind.game.game.Deck.deal')
+def test_real_time_timer_keeps_running(mock_deal: MagicMock):
+    """Tests that an agent keeping its timer plays before one that restarts after each play."""
+    # p1 re-decides a 10s wait after each card, p2 fires 15s after the level started.
+    players = [DummyAgent(name="p1"), PatientAgent(name="p2", wait=15)]
+    game = Game(players, clock=VirtualClock())
+    mock_deal.side_effect = [[5, 50], [60, 70]]
+    game.current_level_number = 2
+
+    game.play_level()
+
+    assert game.game_over
+    turns = game.levels[0].turns
+    assert [turn.player_who_played for turn in turns] == ["p1", "p2"]
+    assert turns[1].played_at == 15
+    assert turns[1].correct_card == 50
+
+
+@patch('themind.game.game.Deck.deal')
+def test_real_time_fail_out_of_order(mock_deal: MagicMock):
+    """Tests that the real-time engine ends the game on an out-of-order play."""
+    players = [DummyAgent(name="p1"), FastAgent(name="p2")]
+    game = Game(players, clock=VirtualClock())
+    mock_deal.side_effect = [[10], [20]]
+
+    game.play_level()
+
+    assert game.game_over
+    assert game.level_lost == 1
+    assert game.levels[0].turns[0].player_who_played == "p2"
@@ -0,0 +1,103 @@
+import pytest
+from themind.agents import NoisyAgent, PerfectAgent, FastAgent
+from themind.agents.team import Team
+from themind.game.replay import ReplayGame, ReplayDivergedError, RecordedAgent, load_recording
+
+
+def record_game(tmp_path, agents):
+    team = Team(agents, 1, results_dir=str(tmp_path))
+    team.play_games()
+    return team.games[0], load_recording(str(tmp_path / team.team_guid / "1"))
+
+
+def test_load_recording(tmp_path):
+    """Tests that the deals and decisions of a saved game are recovered."""
+    game, recording = record_game(tmp_path, [PerfectAgent(name="a"), PerfectAgent(name="b")])
+
+    assert recording.player_names == ["a", "b"]
+    assert set(recording.deals) == {level.level_number for level in game.levels if level.turns}
+    first_turn = game.levels[0].turns[0]
+    assert recording.deals[1] == first_turn.player_hands
+    assert recording.decisions["a"][(tuple(first_turn.player_hands["a"]), 0, 1)] == \
+        first_turn.recommended_actions["a"].time_to_wait
+
+
+def test_load_recording_rejects_several_games(tmp_path):
+    """Tests that a team directory is rejected instead of merging its games into one recording."""
+    team = Team([PerfectAgent(name="a"), PerfectAgent(name="b")], 2, results_dir=str(tmp_path))
+    team.play_games()
+
+    with pytest.raises(ValueError, match="more than one game"):
+        load_recording(str(tmp_path / team.team_guid))
+
+
+def test_replay_without_substitutes_reproduces_game(tmp_path):
+    """Tests that replaying every player from the recording reproduces the game exactly."""
+    game, recording = record_game(tmp_path, [NoisyAgent(name="a", offset=0, noise=4), NoisyAgent(name="b", offset=0, noise=4)])
+
+    replay = ReplayGame(recording, substitutes=[])
+    replay.play()
+
+    assert replay.live_calls == 0
+    assert replay.level_lost == game.level_lost
+    assert [[t.played_card for t in level.turns] for level in replay.levels] == \
+        [[t.played_card for t in level.turns] for level in game.levels]
+
+
+def test_replay_with_substitute_uses_live_agents_after_divergence(tmp_path):
+    """Tests that recorded players switch to their live agents once the game diverges."""
+    _, recording = record_game(tmp_path, [FastAgent(name="a"), PerfectAgent(name="b")])
+
+    replay = ReplayGame(recording, substitutes=[PerfectAgent(name="a")], live_agents=[PerfectAgent(name="b")])
+    replay.play()
+
+    assert replay.is_win()
+    assert replay.recorded_calls > 0
+    assert replay.live_calls > 0
+    assert isinstance(replay.players[1], RecordedAgent)
+
+
+def test_replay_diverged_without_live_agent(tmp_path):
+    """Tests that a divergence without a live agent is reported."""
+    _, recording = record_game(tmp_path, [FastAgent(name="a"), PerfectAgent(name="b")])
+
+    replay = ReplayGame(recording, substitutes=[PerfectAgent(name="a")])
+    with pytest.raises(ReplayDivergedError):
+        replay.play()
+
+
+def test_replay_rejects_unknown_substitute(tmp_path):
+    """Tests that substitutes must take over a recorded player."""
+    _, recording = record_game(tmp_path, [PerfectAgent(name="a"), PerfectAgent(name="b")])
+
+    with pytest.raises(ValueError):
+        ReplayGame(recording, substitutes=[PerfectAgent(name="c")])
+
+
+def test_replay_cli_reports_divergence(tmp_path, caplog, monkeypatch):
+    """Tests that the CLI reports where a replay diverged instead of raising."""
+    from themind.game import replay as replay_module
+    team = Team([FastAgent(name="a"), PerfectAgent(name="b")], 1, results_dir=str(tmp_path))
+    team.play_games()
+    game_dir = str(tmp_path / team.team_guid / "1")
+
+    monkeypatch.setattr("sys.argv", ["replay", game_dir, "--agent", '{"type": "PerfectAgent", "name": "a"}'])
+    with pytest.raises(SystemExit) as exit_info:
+        replay_module.main()
+    assert exit_info.value.code == 1
+    assert "Replay diverged on level" in caplog.text and "'b' held" in caplog.text
+
+
+def test_replay_cli_with_live_config(tmp_path, caplog, monkeypatch):
+    """Tests that live agents from a config let the replay play past the divergence."""
+    from themind.game import replay as replay_module
+    team = Team([FastAgent(name="a"), PerfectAgent(name="b")], 1, results_dir=str(tmp_path))
+    team.play_games()
+    config = tmp_path / "config.yaml"
+    config.write_text("agents:\n  - {type: FastAgent, name: a}\n  - {type: PerfectAgent, name: b}\n")
+
+    monkeypatch.setattr("sys.argv", ["replay", str(tmp_path / team.team_guid / "1"),
+                                      "--agent", '{"type": "PerfectAgent", "name": "a"}', "--config", str(config)])
+    caplog.set_level("INFO")
+    replay_module.main()
+    assert "Replay won." in caplog.text
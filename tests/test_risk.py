@@ -0,0 +1,92 @@
+import json
+from itertools import combinations
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+import pytest
+from themind.analysis.risk import lower_card_risk, lower_card_risks, load_decisions, score_decisions
+from themind.game.game import Game, GameRules
+from themind.agents.agents import DummyAgent
+
+
+def brute_force_risk(last_played_card, hand, num_other_cards, deck_size):
+    pool = [c for c in range(last_played_card + 1, deck_size + 1) if c not in hand]
+    draws = list(combinations(pool, num_other_cards))
+    return sum(1 for draw in draws if min(draw) < min(hand)) / len(draws)
+
+
+@pytest.mark.parametrize("last_played_card, hand, num_other_cards", [
+    (0, [5, 9], 3),
+    (4, [6], 2),
+    (2, [3, 10], 4),
+    (0, [12], 1),
+    (7, [11, 12], 2),
+])
+def test_lower_card_risk_matches_enumeration(last_played_card, hand, num_other_cards):
+    """Tests the closed-form risk against enumerating every possible deal on a small deck."""
+    expected = brute_force_risk(last_played_card, hand, num_other_cards, deck_size=12)
+    assert lower_card_risk(last_played_card, hand, num_other_cards, deck_size=12) == pytest.approx(expected)
+
+
+def test_lower_card_risk_zero_without_other_cards():
+    """Tests that there is no risk when nobody else holds cards."""
+    assert lower_card_risk(7, [50], 0) == 0.0
+
+
+def test_lower_card_risk_certain_when_too_few_safe_cards():
+    """Tests that the risk is 1 when the others cannot all hold higher cards."""
+    assert lower_card_risk(0, [9], 2, deck_size=10) == 1.0
+
+
+def test_vectorized_risks_match_scalar():
+    """Tests that the vectorized risks agree with the scalar version."""
+    rng = np.random.default_rng(0)
+    last = rng.integers(0, 60, size=200)
+    lowest = last + rng.integers(1, 30, size=200)
+    hand_sizes = rng.integers(1, 5, size=200)
+    others = rng.integers(0, 12, size=200)
+
+    risks = lower_card_risks(last, lowest, hand_sizes, others)
+
+    for i in range(200):
+        hand = [int(lowest[i])] + [100 - j for j in range(hand_sizes[i] - 1)]
+        assert risks[i] == pytest.approx(lower_card_risk(int(last[i]), hand, int(others[i])), abs=1e-9)
+
+
+def test_load_and_score_decisions(tmp_path):
+    """Tests scoring saved results in one pass over a directory."""
+    game_dir = tmp_path / "team" / "1"
+    game_dir.mkdir(parents=True)
+    turns = [
+        {"Previous-card": 0, "Acting-player": "a", "Card played": 3, "Seconds waited": 3, "Correct decision": True,
+         "a-hand": [3], "a-lowest-card": 3, "a-seconds": 3, "b-hand": [90], "b-lowest-card": 90, "b-seconds": 90},
+        {"Previous-card": 3, "Acting-player": "b", "Card played": 90, "Seconds waited": 87, "Correct decision": True,
+         "a-hand": [], "a-lowest-card": None, "a-seconds": None, "b-hand": [90], "b-lowest-card": 90, "b-seconds": 87},
+    ]
+    with open(game_dir / "1.json", 'w') as f:
+        json.dump(turns, f)
+
+    decisions = load_decisions(str(tmp_path))
+    scores = score_decisions(decisions)
+
+    assert len(decisions["player"]) == 3
+    assert scores["a"]["plays"] == 1
+    assert scores["a"]["mistakes"] == 0
+    assert scores["b"]["decisions"] == 2
+    assert scores["b"]["mean_play_risk"] == 0.0
+    assert scores["a"]["mean_risk"] == pytest.approx(lower_card_risk(0, [3], 1))
+
+
+@patch('themind.game.game.Deck.deal')
+def test_game_risk_oracle(mock_deal: MagicMock):
+    """Tests that the optional oracle records each player's risk on every turn."""
+    players = [DummyAgent(name="p1"), DummyAgent(name="p2")]
+    game = Game(players, rules=GameRules(deck_size=100), risk_oracle=True)
+    mock_deal.side_effect = [[10], [20]]
+
+    game.play_level()
+
+    first, second = game.levels[0].turns
+    assert first.risks["p1"] == pytest.approx(lower_card_risk(0, [10], 1))
+    assert first.risks["p2"] == pytest.approx(lower_card_risk(0, [20], 1))
+    assert second.risks == {"p2": 0.0}
@@ -0,0 +1,163 @@
+import time
+import numpy as np
+import pytest
+from themind.agents import AGENT_REGISTRY, NoisyAgent, PerfectAgent, RolloutAgent
+from themind.agents.registry import build_agents
+from themind.game import Game
+from themind.game.game import Level
+from themind.game.rollout import GameState, rollout, sample_without_replacement, simulate, stack_hands
+
+
+def test_game_state_play_shares_untouched_hands():
+    """Tests that playing a card copies only the hand it came from."""
+    state = GameState(((3, 9), (5,), (7, 8)))
+    after = state.play(0)
+
+    assert after.hands == ((9,), (5,), (7, 8))
+    assert after.hands[1] is state.hands[1] and after.hands[2] is state.hands[2]
+    assert after.last_played_card == 3 and not after.lost
+    assert state.hands[0] == (3, 9)
+    assert after.play(2).lost
+
+
+def test_game_state_cleared():
+    """Tests that a state is cleared once every card has been played in order."""
+    state = GameState(((1, 4), (2,)))
+    for player in (0, 1, 0):
+        state = state.play(player)
+    assert state.cleared
+
+
+def test_simulate_with_perfect_timing_always_clears():
+    """Tests that players waiting exactly the gap clear every rollout."""
+    rng = np.random.default_rng(0)
+    hands = stack_hands([GameState(((3, 40, 41), (10, 50), (2,)))] * 10)
+    assert simulate(hands, 0, [0, 0, 0], 0, rng).all()
+
+
+def test_simulate_detects_mistakes():
+    """Tests that a forced early play of a higher card fails the rollout."""
+    rng = np.random.default_rng(0)
+    hands = stack_hands([GameState(((30,), (10,)))])
+    assert not simulate(hands, 0, [0, 0], 0, rng, first_waits=np.array([0]))[0]
+    assert simulate(hands, 0, [0, 0], 0, rng, first_waits=np.array([25]))[0]
+
+
+@pytest.mark.parametrize("k", [0, 3, 7, 10])
+def test_sample_without_replacement_is_uniform(k):
+    """Tests that samples are distinct and every index and position is equally likely."""
+    rng = np.random.default_rng(0)
+    samples = sample_without_replacement(10, k, 20_000, rng)
+
+    assert samples.shape == (20_000, k)
+    assert all(len(set(row)) == k for row in samples[:500])
+    if k:
+        # Each index lands in each position with probability 1/10.
+        counts = np.stack([(samples == index).mean(axis=0) for index in range(10)])
+        assert np.allclose(counts, 0.1, atol=0.01)
+
+
+def test_simulate_first_waits_seat():
+    """Tests that the forced first wait applies to the given seat."""
+    rng = np.random.default_rng(0)
+    hands = stack_hands([GameState(((10,), (30,)))])
+    assert not simulate(hands, 0, [0, 0], 0, rng, first_waits=np.array([0]), first_waits_seat=1)[0]
+    assert simulate(hands, 0, [0, 0], 0, rng, first_waits=np.array([25]), first_waits_seat=1)[0]
+
+
+def test_rollout_from_game_snapshot():
+    """Tests rolling out a snapshot of a real game."""
+    game = Game([PerfectAgent("a"), PerfectAgent("b")])
+    game.levels.append(Level(level_number=1))
+    game.players[0].receive_hand([12])
+    game.players[1].receive_hand([40])
+
+    state = game.snapshot()
+
+    assert state == GameState(((12,), (40,)), 0, 1, False)
+    assert rollout(state, 100, [0, 0], 0) == 1.0
+    assert rollout(state, 1000, [5, 5], 20, np.random.default_rng(0)) < 1.0
+
+
+def test_rollout_agent_is_registered():
+    """Tests that the rollout agent can be built from a config."""
+    assert AGENT_REGISTRY["RolloutAgent"] is RolloutAgent
+
+
+def test_rollout_agent_runs_thousands_of_rollouts_within_budget():
+    """Tests that a decision runs its rollouts and respects the time budget."""
+    agent = RolloutAgent("r", time_budget=0.5, max_rollouts=2000, seed=0)
+    agent.receive_hand([20, 45, 70, 90])
+
+    started = time.perf_counter()
+    response = agent.decide_move(last_played_card=10, num_other_cards=4)
+
+    assert time.perf_counter() - started < 1.0
+    assert response.card_to_play == 20
+    assert agent.last_rollouts == 2000
+    assert 0 < agent.last_clear_rate <= 1
+
+
+def test_rollout_agent_stops_at_the_time_budget():
+    """Tests that a tiny budget stops after the first batch."""
+    agent = RolloutAgent("r", time_budget=1e-9, max_rollouts=100_000, batch_size=100, seed=0)
+    agent.receive_hand([20, 45])
+    agent.decide_move(last_played_card=10, num_other_cards=2)
+    assert agent.last_rollouts == 100
+
+
+def test_rollout_agent_without_other_cards_plays_the_conventional_wait():
+    """Tests that with nothing left to collide with, the agent waits the gap plus the team's offset."""
+    agent = RolloutAgent("r", teammate_offset=5)
+    agent.receive_hand([20])
+    assert agent.decide_move(last_played_card=10, num_other_cards=0).time_to_wait == 15
+
+
+def test_rollout_agent_models_its_own_seat():
+    """Tests that rollouts seat the agent where it sits, since ties go to the earlier seat."""
+    cleared = []
+    for seat in (0, 1):
+        agent = RolloutAgent("r", teammate_offset=0, teammate_noise=0, seat=seat, seed=0)
+        agent.receive_hand([20])
+        # Waiting 5s ties with a teammate holding 5, who waits exactly the gap.
+        cleared.append(agent._rollout_batch(1, np.array([5]), 0, np.array([5]), 1)[0])
+    assert cleared == [0, 1]
+
+
+def test_rollout_agent_plays_a_game():
+    """Tests a full game with a noisy teammate."""
+    game = Game([RolloutAgent("r", time_budget=0.01, max_rollouts=200, seed=1), NoisyAgent("n")])
+    game.play()
+    assert game.game_over
+
+
+def test_build_agents_seats_rollout_agents_at_the_table():
+    """Tests that rollout agents built from a config learn their seat, teammates and deck size."""
+    agents = build_agents([
+        {"type": "NoisyAgent", "name": "n"},
+        {"type": "RolloutAgent", "name": "r"},
+        {"type": "RolloutAgent", "name": "pinned", "params": {"seat": 0}},
+    ], rules={"deck_size": 60})
+
+    assert (agents[1].seat, agents[1].num_teammates, agents[1].deck_size) == (1, 2, 60)
+    assert (agents[2].seat, agents[2].num_teammates) == (0, 2)
+
+
+def test_rollout_agent_warns_about_a_mismatched_table(caplog):
+    """Tests that a deal inconsistent with num_teammates is reported once."""
+    agent = RolloutAgent("r", max_rollouts=10, num_teammates=1, seed=0)
+    agent.receive_hand([20])
+    agent.decide_move(last_played_card=0, num_other_cards=2)
+    agent.decide_move(last_played_card=0, num_other_cards=2)
+
+    assert sum("check num_teammates" in record.message for record in caplog.records) == 1
+
+
+def test_rollout_agent_rejects_bad_parameters():
+    """Tests that invalid rollout settings are rejected."""
+    with pytest.raises(ValueError):
+        RolloutAgent("r", num_teammates=0)
+    with pytest.raises(ValueError):
+        RolloutAgent("r", time_budget=0)
+    with pytest.raises(ValueError):
+        RolloutAgent("r", seat=2)
@@ -0,0 +1,90 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from themind.agents import PerfectAgent, FastAgent
+from themind.agents.stopping import StoppingRule
+from themind.agents.team import Team
+from themind.game.game import GameRules
+
+
+def finished_game(win: bool, level_lost: int | None = None):
+    game = MagicMock()
+    game.is_win.return_value = win
+    game.level_lost = level_lost
+    game.rules = GameRules()
+    return game
+
+
+def test_stopping_rule_validation():
+    """Tests that a rule needs a known metric and a target."""
+    with pytest.raises(ValueError):
+        StoppingRule(metric="score", ci_width=0.1)
+    with pytest.raises(ValueError):
+        StoppingRule()
+
+
+def test_stops_when_interval_is_narrow():
+    """Tests that the run stops once the win-rate interval is narrow enough."""
+    rule = StoppingRule(ci_width=0.2, min_games=5)
+    games_needed = 0
+    while not rule.should_stop():
+        rule.update(finished_game(win=True))
+        games_needed += 1
+
+    assert 5 <= games_needed < 40
+    low, high = rule.interval()
+    assert high - low <= 0.2
+    assert "narrower" in rule.reason
+
+
+def test_never_stops_before_min_games():
+    """Tests that min_games is respected even when the target is met."""
+    rule = StoppingRule(ci_width=10, min_games=3)
+    rule.update(finished_game(win=False, level_lost=2))
+    rule.update(finished_game(win=False, level_lost=4))
+
+    assert not rule.should_stop()
+
+
+def test_level_lost_threshold():
+    """Tests that the mean losing level is tested against a threshold, counting wins as the level after the last."""
+    rule = StoppingRule(metric="level_lost", threshold=6, min_games=2)
+    for level_lost in (2, 3, 2, 3, 2, 3, 2, 3):
+        rule.update(finished_game(win=False, level_lost=level_lost))
+    assert rule.should_stop()
+    assert "below 6" in rule.reason
+
+    wins = StoppingRule(metric="level_lost", ci_width=1)
+    wins.update(finished_game(win=True))
+    assert wins.mean == 13
+
+
+def test_level_lost_with_constant_outcomes_does_not_stop_at_once():
+    """Tests that identical outcomes do not give a zero-width interval or instant significance."""
+    rule = StoppingRule(metric="level_lost", ci_width=0.5, threshold=1.5)
+    for _ in range(10):
+        rule.update(finished_game(win=False, level_lost=1))
+
+    low, high = rule.interval()
+    assert high - low > 0.5
+    assert not rule.should_stop()
+
+    while not rule.should_stop():
+        rule.update(finished_game(win=False, level_lost=1))
+    assert 10 < rule.games < 100
+
+
+def test_team_stops_early_and_reports_savings(tmp_path):
+    """Tests that a team with a stopping rule stops early and records the games saved."""
+    agents = [PerfectAgent(name="Agent 1"), PerfectAgent(name="Agent 2")]
+    team = Team(agents, 1000, results_dir=str(tmp_path), stream=True,
+                stopping_rule=StoppingRule(ci_width=0.25, min_games=5))
+
+    team.play_games()
+
+    assert team.stats.games_played < 1000
+    with open(tmp_path / team.team_guid / "summary.json", 'r') as f:
+        summary = json.load(f)
+    assert summary["games_saved"] == 1000 - team.stats.games_played
+    assert summary["early_stopping"]["estimate"] == 1.0
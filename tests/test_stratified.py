@@ -0,0 +1,88 @@
+import random
+
+import pytest
+from themind.game import GameRules
+from themind.game.stratified import LevelEstimate, StratifiedResult, allocate, evaluate, play_level_trials
+
+PERFECT = [{"type": "PerfectAgent", "name": "a"}, {"type": "PerfectAgent", "name": "b"}]
+NOISY = [{"type": "NoisyAgent", "name": "a", "params": {"offset": 3, "noise": 1}},
+         {"type": "NoisyAgent", "name": "b", "params": {"offset": 3, "noise": 1}}]
+
+
+def test_play_level_trials():
+    """Tests that a single level is played on its own, from fresh deals."""
+    assert play_level_trials(PERFECT, {}, 12, 20, seed=0) == 20
+    assert 0 < play_level_trials(NOISY, {}, 12, 50, seed=0) < 50
+
+
+def test_allocate_favours_uncertain_levels():
+    """Tests that new trials go to levels whose clear rate is far from 1."""
+    levels = [LevelEstimate(1, 2, trials=100, cleared=99), LevelEstimate(2, 4, trials=100, cleared=50)]
+    allocation = allocate(levels, 200)
+    assert sum(allocation) == 200
+    assert allocation[1] > allocation[0]
+
+
+def test_perfect_team_always_wins():
+    """Tests that a team that never makes mistakes is estimated to always win."""
+    result = evaluate(PERFECT, GameRules(num_levels=4), num_trials=200, pilot_trials=20, rounds=2)
+    assert result.win_probability == 1.0
+    assert sum(level.trials for level in result.levels) == 200
+    low, high = result.interval()
+    assert low > 0.9 and high == 1.0
+
+
+def test_stratified_estimate_is_reproducible_and_covers_the_estimate():
+    """Tests that a seeded evaluation is reproducible and its interval contains the estimate."""
+    first = evaluate(NOISY, GameRules(num_levels=6), num_trials=1200, pilot_trials=50, seed=3)
+    second = evaluate(NOISY, GameRules(num_levels=6), num_trials=1200, pilot_trials=50, seed=3)
+
+    assert first.to_dict() == second.to_dict()
+    low, high = first.interval()
+    assert low < first.win_probability < high
+    assert first.levels[-1].trials > first.levels[0].trials
+
+
+def test_play_level_trials_leaves_the_global_generator_alone():
+    """Tests that trials are seeded locally, including agents that take a seed."""
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    first = play_level_trials(NOISY, {}, 8, 50, seed=0)
+
+    assert random.random() == expected
+    assert play_level_trials(NOISY, {}, 8, 50, seed=0) == first
+
+
+def test_interval_covers_levels_always_or_never_cleared():
+    """Tests that the estimate uses raw rates and the interval contains it at the 0 and n extremes."""
+    always = StratifiedResult([LevelEstimate(level, 2 * level, trials=100, cleared=100) for level in range(1, 13)])
+    low, high = always.interval()
+    assert always.win_probability == 1.0
+    assert 0.9 < low < high == 1.0
+    assert always.sequential_cost() == 0.0
+
+    never = StratifiedResult([LevelEstimate(1, 2, trials=100, cleared=60), LevelEstimate(2, 4, trials=100, cleared=0)])
+    low, high = never.interval()
+    assert never.win_probability == 0.0
+    assert low == 0.0 and 0 < high < 0.05
+
+
+def test_parallel_evaluation():
+    """Tests that trials split across worker processes are all counted."""
+    result = evaluate(PERFECT, GameRules(num_levels=3), num_trials=90, pilot_trials=10, rounds=1, workers=2)
+    assert sum(level.trials for level in result.levels) == 90
+    assert result.win_probability == 1.0
+
+
+def test_stratified_is_cheaper_than_sequential_games():
+    """Tests that the reported sequential cost exceeds the stratified one when late levels are hard."""
+    levels = [LevelEstimate(level, 2 * level, trials=500, cleared=int(500 * (1 - level / 15))) for level in range(1, 13)]
+    result = StratifiedResult(levels)
+    assert result.sequential_cost() > result.cost
+
+
+def test_evaluate_needs_a_pilot_trial_per_level():
+    """Tests that too small a budget is rejected."""
+    with pytest.raises(ValueError):
+        evaluate(PERFECT, num_trials=5)
@@ -1,9 +1,11 @@
 import pytest
 import os
 import json
+import time
+import tracemalloc
 from unittest.mock import patch, MagicMock
-from themind.agents.team import Team
-from themind.agents import PerfectAgent
+from themind.agents.team import STREAM_REVIEW_HISTORY, Team, iter_saved_levels
+from themind.agents import PerfectAgent, FastAgent
 
 
 @pytest.fixture
@@ -44,6 +46,18 @@ def test_play_games(mock_game, agents):
     assert mock_game.call_count == num_games
 
 
+@patch('themind.agents.team.Game')
+def test_play_games_closes_agents(mock_game, agents):
+    """Tests that every agent is closed once the team has played, even if a game fails."""
+    mock_game.return_value.play.side_effect = RuntimeError("boom")
+    team = Team(agents, 1)
+
+    with patch.object(PerfectAgent, 'close') as mock_close, pytest.raises(RuntimeError):
+        team.play_games()
+
+    assert mock_close.call_count == len(agents)
+
+
 @patch('themind.agents.team.Game')
 def test_save_game_results(mock_game, agents, tmp_path):
     """Tests that the game results are saved correctly."""
@@ -59,10 +73,12 @@ def test_save_game_results(mock_game, agents, tmp_path):
     mock_turn.player_who_played = "Agent 1"
     mock_turn.played_card = 12
     mock_turn.correct_decision = True
+    mock_turn.played_at = None
+    mock_turn.risks = None
     mock_turn.player_hands = {"Agent 1": [12, 25], "Agent 2": [15, 30]}
     mock_turn.recommended_actions = {
-        "Agent 1": MagicMock(time_to_wait=2),
-        "Agent 2": MagicMock(time_to_wait=5),
+        "Agent 1": MagicMock(time_to_wait=2, details=None),
+        "Agent 2": MagicMock(time_to_wait=5, details={"outcome": "deadline", "latency": 1.5, "hedged": True}),
     }
     mock_level.turns = [mock_turn]
     mock_level.level_number = 1
@@ -95,3 +111,173 @@ def test_save_game_results(mock_game, agents, tmp_path):
     assert turn_data["Agent 2-hand"] == [15, 30]
     assert turn_data["Agent 2-lowest-card"] == 15
     assert turn_data["Agent 2-seconds"] == 5
+    assert "Agent 1-decision" not in turn_data
+    assert turn_data["Agent 2-decision"] == {"outcome": "deadline", "latency": 1.5, "hedged": True}
+
+
+def test_saved_levels_parse_back(tmp_path):
+    """Tests that saved turns read back into the hands and decisions they were written from."""
+    # Arrange
+    agents = [PerfectAgent(name="Agent 1"), PerfectAgent(name="Agent 2")]
+    team = Team(agents, 2, results_dir=str(tmp_path))
+    team.play_games()
+
+    # Act
+    levels = list(iter_saved_levels(str(tmp_path)))
+    game_dir, level_number, turns = levels[0]
+    hands, decisions = Team.parse_turn_data(turns[0])
+
+    # Assert
+    assert len(levels) == sum(len(game.levels) for game in team.games)
+    assert (os.path.basename(game_dir), level_number) == ("1", 1)
+    first_turn = team.games[0].levels[0].turns[0]
+    assert hands == {name: sorted(hand) for name, hand in first_turn.player_hands.items()}
+    assert [(d.player, d.hand, d.seconds, d.played) for d in decisions] == [
+        (name, tuple(sorted(hand)), first_turn.recommended_actions[name].time_to_wait,
+         name == first_turn.player_who_played)
+        for name, hand in first_turn.player_hands.items()
+    ]
+    assert all(d.last_played_card == 0 and d.num_other_cards == 1 and not d.mistake for d in decisions)
+
+
+def test_stream_mode_keeps_only_aggregates(tmp_path):
+    """Tests that streaming runs release games and fold them into the running stats."""
+    # Arrange
+    agents = [PerfectAgent(name="Agent 1"), FastAgent(name="Agent 2")]
+    team = Team(agents, 4, results_dir=str(tmp_path), stream=True)
+
+    # Act
+    team.play_games()
+
+    # Assert
+    assert team.games == []
+    assert team.stats.games_played == 4
+    assert team.stats.wins + sum(team.stats.level_lost_counts.values()) == 4
+
+    with open(tmp_path / team.team_guid / "summary.json", 'r') as f:
+        summary = json.load(f)
+    assert summary["games_played"] == 4
+    assert summary["wins"] == team.stats.wins
+
+
+def test_max_review_history(tmp_path):
+    """Tests that agents only review their most recent games when a limit is set."""
+    # Arrange
+    agents = [PerfectAgent(name="Agent 1"), PerfectAgent(name="Agent 2")]
+    team = Team(agents, 3, results_dir=str(tmp_path), stream=True, max_review_history=2)
+
+    # Act
+    with patch.object(PerfectAgent, 'review_game') as mock_review:
+        team.play_games()
+
+    # Assert
+    assert len(team.agent_review_histories["Agent 1"]) == 2
+    assert team.agent_review_histories["Agent 1"][-1].startswith("Game 3:")
+    assert len(mock_review.call_args[0][0]) == 2
+
+
+def test_stream_mode_caps_review_history(tmp_path):
+    """Tests that streaming runs keep a bounded review history, so memory stays flat over many games."""
+    # Arrange
+    agents = [PerfectAgent(name="Agent 1"), FastAgent(name="Agent 2")]
+    team = Team(agents, 50, results_dir=str(tmp_path), stream=True)
+    tracemalloc.start()
+
+    # Act
+    try:
+        team.play_games()
+        after_warmup = tracemalloc.get_traced_memory()[0]
+        team.num_games = 300
+        team.play_games()
+        after_run = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    # Assert
+    assert team.max_review_history == STREAM_REVIEW_HISTORY
+    assert all(len(history) == STREAM_REVIEW_HISTORY for history in team.agent_review_histories.values())
+    # Uncapped, 250 more games add roughly 400 KB of review text.
+    assert after_run - after_warmup < 100_000
+
+
+def test_max_review_history_must_be_positive(agents, tmp_path):
+    """Tests that a non-positive review history limit is rejected."""
+    with pytest.raises(ValueError):
+        Team(agents, 1, results_dir=str(tmp_path), max_review_history=0)
+
+
+def test_parallel_reviews(tmp_path):
+    """Tests that agents review a finished game concurrently and every agent gets its own history."""
+    # Arrange
+    agents = [PerfectAgent(name=f"Agent {i}") for i in range(4)]
+    team = Team(agents, 1, results_dir=str(tmp_path), review_workers=4)
+    reviewed = {}
+
+    def slow_review(agent, game_reviews):
+        time.sleep(0.2)
+        reviewed[agent.name] = list(game_reviews)
+
+    # Act
+    started = time.perf_counter()
+    with patch.object(PerfectAgent, 'review_game', autospec=True, side_effect=slow_review):
+        team.play_games()
+    elapsed = time.perf_counter() - started
+
+    # Assert
+    assert elapsed < 0.6
+    assert set(reviewed) == {agent.name for agent in agents}
+    assert reviewed["Agent 2"] == team.agent_review_histories["Agent 2"]
+
+
+def test_parallel_review_errors_are_raised(tmp_path):
+    """Tests that an agent's failed review surfaces from a parallel learning phase."""
+    agents = [PerfectAgent(name="Agent 1"), PerfectAgent(name="Agent 2")]
+    team = Team(agents, 1, results_dir=str(tmp_path), review_workers=2)
+
+    with patch.object(PerfectAgent, 'review_game', side_effect=RuntimeError("provider down")):
+        with pytest.raises(RuntimeError, match="provider down"):
+            team.play_games()
+
+
+def test_results_are_flushed_when_a_game_raises(tmp_path):
+    """Tests that games already played are on disk even if a later game fails."""
+    agents = [PerfectAgent(name="Agent 1"), PerfectAgent(name="Agent 2")]
+    team = Team(agents, 3, results_dir=str(tmp_path))
+
+    with patch.object(PerfectAgent, 'review_game', side_effect=[None, None, RuntimeError("provider down")]):
+        with pytest.raises(RuntimeError, match="provider down"):
+            team.play_games()
+
+    assert team._writer is None
+    assert team.get_game_history(1)
+    assert team.get_game_history(2)
+
+
+def test_synchronous_writes(tmp_path):
+    """Tests that a queue size of 0 writes results without a background writer."""
+    agents = [PerfectAgent(name="Agent 1"), PerfectAgent(name="Agent 2")]
+    team = Team(agents, 1, results_dir=str(tmp_path), writer_queue_size=0)
+
+    with patch('themind.agents.team.ResultsWriter') as mock_writer:
+        team.play_games()
+
+    mock_writer.assert_not_called()
+    assert 1 in team.get_game_history(1)
+
+
+def test_running_out_of_cards_counts_as_a_loss(tmp_path):
+    """Tests that a level the deck cannot deal is recorded as lost in the stats and summary."""
+    # Arrange: nine players need 108 cards on level 12, more than the 100-card deck holds
+    agents = [PerfectAgent(name=f"Agent {i + 1}") for i in range(9)]
+    team = Team(agents, 2, results_dir=str(tmp_path))
+
+    # Act
+    team.play_games()
+
+    # Assert
+    assert all(game.level_lost == 12 and not game.is_win() for game in team.games)
+    assert team.stats.level_lost_counts == {12: 2}
+    with open(tmp_path / team.team_guid / "summary.json", 'r') as f:
+        summary = json.load(f)
+    assert summary["wins"] == 0
+    assert summary["level_lost_counts"] == {"12": 2}
@@ -0,0 +1,63 @@
+import json
+import threading
+import pytest
+from unittest.mock import patch
+from themind.agents.writer import ResultsWriter
+
+
+def test_writer_writes_queued_files_on_close(tmp_path):
+    """Tests that every queued file is on disk, with its directory created, once the writer closes."""
+    writer = ResultsWriter(max_pending=2)
+    for level in range(1, 6):
+        writer.write(str(tmp_path / "1" / f"{level}.json"), [{"level": level}])
+    writer.close()
+
+    for level in range(1, 6):
+        with open(tmp_path / "1" / f"{level}.json") as f:
+            assert json.load(f) == [{"level": level}]
+
+
+def test_writer_applies_backpressure(tmp_path):
+    """Tests that writes block once max_pending files are waiting."""
+    release = threading.Event()
+    real_dump = json.dump
+
+    def slow_dump(*args, **kwargs):
+        release.wait()
+        real_dump(*args, **kwargs)
+
+    with patch('themind.agents.writer.json.dump', side_effect=slow_dump):
+        writer = ResultsWriter(max_pending=1)
+        writer.write(str(tmp_path / "a.json"), 1)  # Taken by the writer thread, which blocks
+        writer.write(str(tmp_path / "b.json"), 2)  # Fills the queue
+        blocked = threading.Thread(target=writer.write, args=(str(tmp_path / "c.json"), 3))
+        blocked.start()
+        blocked.join(timeout=0.1)
+        assert blocked.is_alive()
+
+        release.set()
+        blocked.join(timeout=1)
+        writer.close()
+    assert not blocked.is_alive()
+    assert (tmp_path / "c.json").exists()
+
+
+def test_writer_errors_are_raised(tmp_path):
+    """Tests that a failed write surfaces from the next call instead of being lost."""
+    (tmp_path / "taken").write_text("")
+    writer = ResultsWriter()
+    writer.write(str(tmp_path / "taken" / "1.json"), [])
+
+    with pytest.raises(OSError):
+        writer.flush()
+    with pytest.raises(OSError):
+        writer.close()
+
+
+def test_writer_flushes_when_the_block_raises(tmp_path):
+    """Tests that leaving the context through an exception still writes queued files."""
+    with pytest.raises(RuntimeError):
+        with ResultsWriter() as writer:
+            writer.write(str(tmp_path / "1.json"), [1])
+            raise RuntimeError("game crashed")
+    assert (tmp_path / "1.json").exists()
@@ -1,6 +1,9 @@
 from .agents import AgentResponse, RandomAgent, NoisyAgent, PerfectAgent, Agent, DummyAgent, FastAgent
 from .llmagent import LLMAgent
+from .llmclient import LLMClient, PooledHTTPClient, LocalClient, FakeClient, CLIENT_REGISTRY
+from .distill import DistilledAgent, PolicyTable
+from .rolloutagent import RolloutAgent
 from .registry import AGENT_REGISTRY
 from .team import Team
 
-__all__ = ['AgentResponse', 'RandomAgent', 'NoisyAgent', 'PerfectAgent', 'Agent', "DummyAgent", "FastAgent", "LLMAgent", "AGENT_REGISTRY", "Team"]
+__all__ = ['AgentResponse', 'RandomAgent', 'NoisyAgent', 'PerfectAgent', 'Agent', "DummyAgent", "FastAgent", "LLMAgent", "LLMClient", "PooledHTTPClient", "LocalClient", "FakeClient", "CLIENT_REGISTRY", "DistilledAgent", "PolicyTable", "RolloutAgent", "AGENT_REGISTRY", "Team"]
@@ -8,6 +8,7 @@ class AgentResponse:
     """The response from an agent for a given turn."""
     card_to_play: int
     time_to_wait: int
+    details: dict | None = None  # How the decision was reached, saved with the turn's results
 
 
 class Agent(ABC):
@@ -36,6 +37,44 @@ class Agent(ABC):
         """
         pass
 
+    def on_card_played(
+        self, player_name: str, last_played_card: int, num_other_cards: int
+    ) -> AgentResponse | None:
+        """
+        Called in real-time play when another player plays a card while this agent's timer is running.
+
+        The default re-decides from the new state, restarting the timer. Agents that want their
+        current timer to keep running can return None.
+
+        Args:
+            player_name: The name of the player who played.
+            last_played_card: The card that was just played.
+            num_other_cards: The total number of cards in other players' hands.
+
+        Returns:
+            A new AgentResponse to reschedule the agent's play, or None to keep the current one.
+        """
+        return self.decide_move(last_played_card, num_other_cards)
+
+    def prefetch(self, hand: list[int], last_played_card: int, num_other_cards: int):
+        """
+        Hints at the state the agent will most likely see on its next decision.
+
+        Called in speculative mode while a turn's decisions are collected, after the agent has
+        decided and again whenever a faster decision changes the predicted state. Agents with
+        slow decisions can start working on the hinted state early; the default does nothing.
+
+        Args:
+            hand: The agent's hand in the predicted state.
+            last_played_card: The predicted last played card.
+            num_other_cards: The predicted number of cards in other players' hands.
+        """
+        pass
+
+    def close(self):
+        """Releases any resources the agent holds, such as background workers. Called once its team is done."""
+        pass
+
     @abstractmethod
     def review_game(self, game_reviews: list[str]):
         """
@@ -50,14 +89,15 @@ class Agent(ABC):
 class RandomAgent(Agent):
     """An agent that plays a random card and waits a random amount of time."""
 
-    def __init__(self, name: str, min_wait: int = 0, max_wait: int = 100):
+    def __init__(self, name: str, min_wait: int = 0, max_wait: int = 100, seed: int | None = None):
         super().__init__(name)
         self.min_wait = min_wait
         self.max_wait = max_wait
+        self.rng = random.Random(seed) if seed is not None else random
 
     def decide_move(self, last_played_card: int, num_other_cards: int) -> AgentResponse:
         card_to_play = min(self.hand)
-        time_to_wait = random.randint(self.min_wait, self.max_wait)
+        time_to_wait = self.rng.randint(self.min_wait, self.max_wait)
         return AgentResponse(card_to_play=card_to_play, time_to_wait=time_to_wait)
 
     def review_game(self, game_reviews: list[str]):
@@ -81,12 +121,13 @@ class NoisyAgent(Agent):
     An agent that plays like a PerfectAgent but adds an offset and uniform noise to the wait time.
     """
 
-    def __init__(self, name: str, offset: int = 5, noise: int = 2):
+    def __init__(self, name: str, offset: int = 5, noise: int = 2, seed: int | None = None):
         super().__init__(name)
         if offset < 0 or noise < 0:
             raise ValueError("Offset and noise must be non-negative.")
         self.offset = offset
         self.noise = noise
+        self.rng = random.Random(seed) if seed is not None else random
 
     def decide_move(self, last_played_card: int, num_other_cards: int) -> AgentResponse:
         card_to_play = min(self.hand)
@@ -95,7 +136,7 @@ class NoisyAgent(Agent):
         # Calculate noisy time to wait
         noisy_time_to_wait = perfect_time_to_wait + self.offset
         if self.noise > 0:
-            noisy_time_to_wait += random.randint(-self.noise, self.noise)
+            noisy_time_to_wait += self.rng.randint(-self.noise, self.noise)
         
         return AgentResponse(card_to_play=card_to_play, time_to_wait=noisy_time_to_wait)
 
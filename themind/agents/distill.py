@@ -0,0 +1,174 @@
+import argparse
+import bisect
+import json
+import logging
+import os
+from typing import Iterable, Iterator
+
+from .agents import Agent, AgentResponse
+from .team import Team, iter_saved_levels
+
+# (gap between the last played card and the lowest card in hand, hand size, cards held by others)
+PolicyKey = tuple[int, int, int]
+
+
+def iter_results_decisions(results_dir: str, player_names: list[str] | None = None) -> Iterator[tuple[PolicyKey, int]]:
+    """Yields every recorded decision in a directory of saved game results.
+
+    Args:
+        results_dir: A directory containing level files written by `Team.save_game_results`,
+            at any depth (a single game, a team, or a whole results tree).
+        player_names: If given, only decisions made by these players are returned.
+
+    Yields:
+        Tuples of (policy key, seconds waited).
+    """
+    for _, _, turns in iter_saved_levels(results_dir):
+        for turn in turns:
+            for decision in Team.parse_turn_data(turn)[1]:
+                if player_names is None or decision.player in player_names:
+                    key = (min(decision.hand) - decision.last_played_card, len(decision.hand), decision.num_other_cards)
+                    yield key, decision.seconds
+
+
+def iter_logged_decisions(path: str) -> Iterator[tuple[PolicyKey, int]]:
+    """Yields decisions from a JSON Lines cache of LLM decisions.
+
+    Each line holds `hand`, `last_played_card`, `num_other_cards` and `time_to_wait`.
+    """
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            hand = record["hand"]
+            key = (min(hand) - record["last_played_card"], len(hand), record["num_other_cards"])
+            yield key, record["time_to_wait"]
+
+
+class PolicyTable:
+    """A lookup table from game states to the mean wait an agent chose in them.
+
+    States that were never observed are filled in by interpolating over the gap
+    within the nearest observed (hand size, other cards) group.
+    """
+
+    def __init__(self, entries: dict[PolicyKey, float], counts: dict[PolicyKey, int] | None = None):
+        if not entries:
+            raise ValueError("A policy table needs at least one entry.")
+        self.entries = entries
+        self.counts = counts or {key: 1 for key in entries}
+        self._cache: dict[PolicyKey, int] = {key: round(seconds) for key, seconds in entries.items()}
+
+        groups: dict[tuple[int, int], list[tuple[int, float]]] = {}
+        for (gap, hand_size, other_cards), seconds in entries.items():
+            groups.setdefault((hand_size, other_cards), []).append((gap, seconds))
+        self._groups = {group: sorted(points) for group, points in groups.items()}
+        self._slope = self._fit_slope()
+
+    @classmethod
+    def from_decisions(cls, decisions: Iterable[tuple[PolicyKey, int]]) -> "PolicyTable":
+        """Builds a table holding the mean wait for every observed state."""
+        totals: dict[PolicyKey, float] = {}
+        counts: dict[PolicyKey, int] = {}
+        for key, seconds in decisions:
+            totals[key] = totals.get(key, 0.0) + seconds
+            counts[key] = counts.get(key, 0) + 1
+        return cls({key: totals[key] / counts[key] for key in totals}, counts)
+
+    def lookup(self, gap: int, hand_size: int, num_other_cards: int) -> int:
+        """Returns the number of seconds to wait in a state."""
+        key = (gap, hand_size, num_other_cards)
+        seconds = self._cache.get(key)
+        if seconds is None:
+            seconds = self._cache[key] = round(self._interpolate(gap, hand_size, num_other_cards))
+        return seconds
+
+    def _interpolate(self, gap: int, hand_size: int, num_other_cards: int) -> float:
+        """Estimates the wait for an unseen state from the nearest observed group."""
+        group = min(
+            self._groups,
+            key=lambda g: (abs(g[0] - hand_size) + abs(g[1] - num_other_cards), g),
+        )
+        points = self._groups[group]
+        gaps = [point[0] for point in points]
+        index = bisect.bisect_left(gaps, gap)
+        if index == 0:
+            return points[0][1] + self._slope * (gap - gaps[0])
+        if index == len(points):
+            return points[-1][1] + self._slope * (gap - gaps[-1])
+        (low_gap, low_seconds), (high_gap, high_seconds) = points[index - 1], points[index]
+        weight = (gap - low_gap) / (high_gap - low_gap)
+        return low_seconds + weight * (high_seconds - low_seconds)
+
+    def _fit_slope(self) -> float:
+        """Fits seconds against gap by least squares over all entries."""
+        gaps = [key[0] for key in self.entries]
+        mean_gap = sum(gaps) / len(gaps)
+        mean_seconds = sum(self.entries.values()) / len(self.entries)
+        variance = sum((gap - mean_gap) ** 2 for gap in gaps)
+        if variance == 0:
+            return 0.0
+        covariance = sum((key[0] - mean_gap) * (seconds - mean_seconds) for key, seconds in self.entries.items())
+        return covariance / variance
+
+    def save(self, path: str):
+        """Saves the table as JSON."""
+        rows = [[*key, seconds, self.counts[key]] for key, seconds in sorted(self.entries.items())]
+        with open(path, 'w') as f:
+            json.dump({"columns": ["gap", "hand_size", "num_other_cards", "seconds", "count"], "entries": rows}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "PolicyTable":
+        """Loads a table saved with `save`."""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        entries = {(gap, hand_size, other): seconds for gap, hand_size, other, seconds, _ in data["entries"]}
+        counts = {(gap, hand_size, other): count for gap, hand_size, other, _, count in data["entries"]}
+        return cls(entries, counts)
+
+
+class DistilledAgent(Agent):
+    """An agent that replays a policy table distilled from another agent's decisions."""
+
+    def __init__(self, name: str, policy_path: str):
+        """Initializes the DistilledAgent.
+
+        Args:
+            name: The name of the agent.
+            policy_path: The path of a table written by `PolicyTable.save`.
+        """
+        super().__init__(name)
+        self.policy = PolicyTable.load(policy_path)
+
+    def decide_move(self, last_played_card: int, num_other_cards: int) -> AgentResponse:
+        card_to_play = min(self.hand)
+        time_to_wait = self.policy.lookup(card_to_play - last_played_card, len(self.hand), num_other_cards)
+        return AgentResponse(card_to_play=card_to_play, time_to_wait=time_to_wait)
+
+    def review_game(self, game_reviews: list[str]):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill recorded decisions into a policy table.")
+    parser.add_argument("output", help="Path to write the policy table to.")
+    parser.add_argument("sources", nargs="+", help="Results directories or .jsonl decision caches.")
+    parser.add_argument("--players", nargs="+", help="Only distill decisions made by these players.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    decisions = []
+    for source in args.sources:
+        if os.path.isdir(source):
+            decisions.extend(iter_results_decisions(source, args.players))
+        else:
+            decisions.extend(iter_logged_decisions(source))
+
+    table = PolicyTable.from_decisions(decisions)
+    table.save(args.output)
+    logging.info(f"Distilled {len(decisions)} decisions into {len(table.entries)} states at {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
+import json
 import logging
-from typing import Optional
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError, wait
+from dataclasses import dataclass
+from typing import Callable, Optional
 
 from .agents import Agent, AgentResponse
+from .llmclient import LLMClient, call_with_shared_limits, resolve_client
+from .prompts import Prompt, PromptBuilder, TokenTotals, TokenUsage, estimate_tokens
 from dotenv import load_dotenv
 from llmutils.llm_with_retry import call_llm_with_retry
 from llmutils.self_healing import heal_llm_output
@@ -9,34 +17,6 @@ from llmutils.self_healing import heal_llm_output
 load_dotenv()
 
 
-PROMPT = """
-You are playing "The Mind"
-Objective:
-As a team, play cards from 1-100 into a central pile in perfect ascending order. Successfully play all cards from all players' hands to pass a level. The number of cards per player increases with each level.
-
-Core Mechanics:
-
-- Ascending Order is Law: Cards must be played in strictly increasing value. Playing a card while another player holds a lower one results in a mistake.
-- No Communication: All forms of explicit signaling (gestures, talk, etc.) about your hand are forbidden.
-- Play by Feel (Timing): The decision to play is based on a shared, unspoken sense of timing. The smaller the numeric gap between the last card played and your lowest card, the faster you should play it. Always focus on playing your lowest card first.
-
-Key Events:
-
-- Mistake: Ends the game
-- Level Cleared: When all cards have been legally played, the team advances to the next level. 
-
-The current state of the game is 
-{game_state}
-
-How many seconds do you want to wait before playing your next card? Your response should be an integer number of seconds
-
-Your current strategy notes are
-{notes}
-
-Your response should be in the format
-seconds: <number of seconds>
-"""
-
 game_state_prompt = """
 The most recent card played was {last_played_card}
 You have {hand} in your hand and your next card to be played is {next_card}
@@ -85,6 +65,56 @@ def parse_message(message: str) -> Optional[int]:
     return seconds
 
 
+def fixed_fallback(hand: list[int], last_played_card: int, num_other_cards: int) -> int:
+    """Waits a fixed 10 seconds."""
+    return 10
+
+
+def gap_fallback(hand: list[int], last_played_card: int, num_other_cards: int) -> int:
+    """Waits the gap between the last played card and the lowest card, like a PerfectAgent."""
+    return min(hand) - last_played_card
+
+
+FALLBACK_POLICIES: dict[str, Callable[[list[int], int, int], int]] = {
+    "fixed": fixed_fallback,
+    "gap": gap_fallback,
+}
+
+
+@dataclass
+class DecisionEvent:
+    """How a single decision was reached, for latency analysis."""
+    last_played_card: int
+    num_other_cards: int
+    outcome: str  # "primary", "hedge", "speculation", "deadline" or "error"
+    latency: float
+    hedged: bool = False
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Returns the q-th percentile (0-100) of values, by linear interpolation."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+@dataclass
+class SpeculationStats:
+    """Counts of speculative next-turn queries and the latency they saved."""
+    issued: int = 0
+    hits: int = 0
+    misses: int = 0
+    wasted: int = 0  # Misses whose LLM call had already started, so it was paid for but unused
+    latency_saved: float = 0.0  # Seconds of LLM latency already elapsed when a hit was used
+
+    @property
+    def hit_rate(self) -> float:
+        resolved = self.hits + self.misses
+        return self.hits / resolved if resolved else 0.0
+
+
 class LLMAgent(Agent):
     """An agent that uses a large language model to decide how long to wait."""
 
@@ -92,15 +122,54 @@ class LLMAgent(Agent):
         self,
         name: str,
         model_name: str = "openai/gpt-4.1-mini",
+        decision_deadline: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        fallback: str = "fixed",
+        client: "LLMClient | str | dict | None" = None,
+        decision_log: Optional[str] = None,
     ):
         """Initializes the LLMAgent.
 
         Args:
             name: The name of the agent.
             model_name: The name of the language model to use.
+            decision_deadline: Seconds a decision may take before the fallback policy
+                answers instead. None waits for the LLM indefinitely.
+            hedge_percentile: If set, a duplicate request is sent once a decision has
+                taken longer than this percentile (0-100) of recent decision latencies,
+                and the first answer wins.
+            hedge_min_samples: How many latencies to observe before hedging starts.
+            fallback: The policy used when the deadline passes or the reply cannot be
+                parsed, one of `FALLBACK_POLICIES`.
+            client: The LLM client to send prompts through: an instance, the name of a
+                shared client in `CLIENT_REGISTRY`, or a `{type, params}` config. By
+                default prompts go through llmutils' `call_llm_with_retry`, under the
+                shared rate limiter and response cache.
+            decision_log: If set, every wait the LLM answers is appended to this
+                JSON Lines file, for `themind.agents.distill`. Fallback answers are not logged.
         """
+        if fallback not in FALLBACK_POLICIES:
+            raise ValueError(f"Unknown fallback policy: {fallback}")
         super().__init__(name)
         self.model = model_name
+        self.client = resolve_client(client)
+        self.decision_deadline = decision_deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.fallback = FALLBACK_POLICIES[fallback]
+        self.decision_events: deque[DecisionEvent] = deque(maxlen=1000)
+        self._last_event: Optional[DecisionEvent] = None
+        self._latencies: deque[float] = deque(maxlen=200)
+        self.speculation_stats = SpeculationStats()
+        self._speculation: Optional[tuple[tuple, Future, float]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.prompts = PromptBuilder()
+        self.token_usage: deque[TokenUsage] = deque(maxlen=1000)
+        self.token_totals = TokenTotals()
+        self._token_lock = threading.Lock()
+        self.decision_log = decision_log
+        self._decision_log_lock = threading.Lock()
         logging.info(f"LLMAgent '{self.name}' initialized with model '{self.model}'.")
 
     def decide_move(
@@ -108,9 +177,8 @@ class LLMAgent(Agent):
     ) -> AgentResponse:
         """Uses an LLM to decide the best move.
 
-        The method creates a game state prompt, calls the LLM, and parses the
-        response. If the response is not in the expected format, it uses a
-        self-healing mechanism to attempt to fix it.
+        If a speculative query was issued for exactly this state, its answer is
+        used; any other pending speculation is discarded.
 
         Args:
             last_played_card: The last card played on the pile.
@@ -119,11 +187,178 @@ class LLMAgent(Agent):
         Returns:
             An AgentResponse with the card to play and the time to wait.
         """
-        game_state = create_game_state(self.hand, last_played_card, num_other_cards)
-        message = PROMPT.format(game_state=game_state, notes=self.notes)
-        
-        logging.debug(f"Agent '{self.name}' sending prompt to LLM: {message}")
-        response = call_llm_with_retry(self.model, message)
+        self._last_event = None
+        time_to_wait = self._take_speculation(last_played_card, num_other_cards)
+        if time_to_wait is None:
+            time_to_wait = self._query_with_deadline(last_played_card, num_other_cards)
+
+        card_to_play = min(self.hand)
+        logging.info(f"Agent '{self.name}' decided to play card {card_to_play} and wait {time_to_wait} seconds.")
+        details = None
+        if self._last_event is not None:
+            event = self._last_event
+            details = {"outcome": event.outcome, "latency": event.latency, "hedged": event.hedged}
+        return AgentResponse(card_to_play=card_to_play, time_to_wait=time_to_wait, details=details)
+
+    def prefetch(self, hand: list[int], last_played_card: int, num_other_cards: int):
+        """Starts querying the LLM for a predicted state in the background."""
+        state = (tuple(hand), last_played_card, num_other_cards)
+        if self._speculation is not None:
+            if self._speculation[0] == state:
+                return
+            self._discard_speculation()
+
+        future = self._get_executor().submit(self._query_wait, list(hand), last_played_card, num_other_cards)
+        self._speculation = (state, future, time.perf_counter())
+        self.speculation_stats.issued += 1
+        logging.debug(f"Agent '{self.name}' speculatively querying state {state}.")
+
+    def _take_speculation(self, last_played_card: int, num_other_cards: int) -> Optional[int]:
+        """Returns the speculative answer for this state, if one was issued, and clears it."""
+        if self._speculation is None:
+            return None
+        state, future, started = self._speculation
+        if state != (tuple(self.hand), last_played_card, num_other_cards):
+            self._discard_speculation()
+            return None
+
+        self._speculation = None
+        needed_at = time.perf_counter()
+        try:
+            time_to_wait, duration = future.result(timeout=self.decision_deadline)
+        except TimeoutError:
+            return self._deadline_fallback(last_played_card, num_other_cards, needed_at, hedged=False)
+        self.speculation_stats.hits += 1
+        self.speculation_stats.latency_saved += min(needed_at - started, duration)
+        self._record(last_played_card, num_other_cards, "speculation", time.perf_counter() - needed_at)
+        return time_to_wait
+
+    def _query_with_deadline(self, last_played_card: int, num_other_cards: int) -> int:
+        """Queries the LLM for the current state, hedging slow requests and enforcing the deadline."""
+        started = time.perf_counter()
+        if self.decision_deadline is None and self.hedge_percentile is None:
+            time_to_wait, duration = self._query_wait(self.hand, last_played_card, num_other_cards)
+            self._latencies.append(duration)
+            self._record(last_played_card, num_other_cards, "primary", duration)
+            return time_to_wait
+
+        hand = list(self.hand)
+        executor = self._get_executor()
+        pending = {executor.submit(self._query_wait, hand, last_played_card, num_other_cards)}
+        primary = next(iter(pending))
+        hedge_at = None
+        if self.hedge_percentile is not None and len(self._latencies) >= self.hedge_min_samples:
+            hedge_at = started + percentile(list(self._latencies), self.hedge_percentile)
+        deadline_at = started + self.decision_deadline if self.decision_deadline is not None else None
+        hedged = False
+
+        while pending:
+            next_event = min((t for t in (hedge_at, deadline_at) if t is not None), default=None)
+            timeout = None if next_event is None else max(0.0, next_event - time.perf_counter())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is not None:
+                    logging.warning(f"Agent '{self.name}' LLM request failed: {future.exception()}")
+                    continue
+                for other in pending:
+                    other.cancel()
+                time_to_wait, duration = future.result()
+                self._latencies.append(duration)
+                outcome = "primary" if future is primary else "hedge"
+                self._record(last_played_card, num_other_cards, outcome, time.perf_counter() - started, hedged)
+                return time_to_wait
+
+            now = time.perf_counter()
+            if deadline_at is not None and now >= deadline_at:
+                for future in pending:
+                    future.cancel()
+                return self._deadline_fallback(last_played_card, num_other_cards, started, hedged)
+            if hedge_at is not None and now >= hedge_at and pending:
+                logging.info(f"Agent '{self.name}' hedging LLM request after {now - started:.2f}s.")
+                pending.add(executor.submit(self._query_wait, hand, last_played_card, num_other_cards))
+                hedge_at = None
+                hedged = True
+
+        logging.error(f"Agent '{self.name}' got no usable LLM response. Falling back to the fallback policy.")
+        self._record(last_played_card, num_other_cards, "error", time.perf_counter() - started, hedged)
+        return self.fallback(self.hand, last_played_card, num_other_cards)
+
+    def _complete(self, prompt: Prompt, kind: str) -> str:
+        """Sends a prompt through the agent's client, or llmutils if it has none, and records its token counts."""
+        started = time.perf_counter()
+        if self.client is None:
+            response = call_with_shared_limits(self.model, prompt.text, call_llm_with_retry)
+        else:
+            response = self.client.complete(self.model, prompt.text)
+        self._record_tokens(prompt, response, kind, time.perf_counter() - started)
+        return response
+
+    def _record_tokens(self, prompt: Prompt, response: str, kind: str, latency: float):
+        """Records a call's token counts, preferring those the provider reported over local estimates."""
+        reported = self.client.last_usage() if self.client is not None else None
+        if reported is not None:
+            usage = TokenUsage(kind, reported["prompt_tokens"], reported["completion_tokens"],
+                               self.prompts.prefix_tokens(prompt), reported["cached_tokens"], False, latency)
+        else:
+            usage = TokenUsage(kind, self.prompts.prefix_tokens(prompt) + estimate_tokens(prompt.suffix),
+                               estimate_tokens(response), self.prompts.prefix_tokens(prompt), latency=latency)
+        with self._token_lock:
+            self.token_usage.append(usage)
+            self.token_totals.add(usage)
+
+    def _deadline_fallback(self, last_played_card: int, num_other_cards: int, started: float, hedged: bool) -> int:
+        """Answers with the fallback policy once the decision deadline has passed."""
+        logging.warning(f"Agent '{self.name}' missed its {self.decision_deadline}s decision deadline. "
+                        f"Using the fallback policy.")
+        self._record(last_played_card, num_other_cards, "deadline", time.perf_counter() - started, hedged)
+        return self.fallback(self.hand, last_played_card, num_other_cards)
+
+    def _record(self, last_played_card: int, num_other_cards: int, outcome: str, latency: float, hedged: bool = False):
+        """Logs how a decision was reached."""
+        event = DecisionEvent(last_played_card, num_other_cards, outcome, latency, hedged)
+        self.decision_events.append(event)
+        self._last_event = event
+        logging.debug(f"Agent '{self.name}' decision event: {event}")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Returns the agent's pool for background and hedged LLM requests, creating it if needed."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix=f"llm-{self.name}")
+        return self._executor
+
+    def _discard_speculation(self):
+        """Cancels (or ignores the result of) the pending speculative query."""
+        _, future, _ = self._speculation
+        if not future.cancel():
+            self.speculation_stats.wasted += 1
+        self._speculation = None
+        self.speculation_stats.misses += 1
+
+    def close(self):
+        """Discards any pending speculation and shuts down the agent's background pool."""
+        if self._speculation is not None:
+            self._discard_speculation()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _query_wait(self, hand: list[int], last_played_card: int, num_other_cards: int) -> tuple[int, float]:
+        """Asks the LLM how long to wait in a state.
+
+        The method creates a game state prompt, calls the LLM, and parses the
+        response. If the response is not in the expected format, it uses a
+        self-healing mechanism to attempt to fix it.
+
+        Returns:
+            The number of seconds to wait, and how long the query took.
+        """
+        started = time.perf_counter()
+        game_state = create_game_state(hand, last_played_card, num_other_cards)
+        prompt = self.prompts.decision(self.notes, game_state)
+
+        logging.debug(f"Agent '{self.name}' sending prompt to LLM: {prompt.text}")
+        response = self._complete(prompt, "decision")
         logging.debug(f"Agent '{self.name}' received response from LLM: {response}")
 
         time_to_wait = parse_message(response)
@@ -142,42 +377,67 @@ def parse_message(message):
                     seconds = int(parts[1])
     return seconds
 '''
-            healed_response = heal_llm_output(
+            heal_args = dict(
                 broken_text=response,
                 expected_format="seconds: <integer>",
                 instructions="Your task is to correct the provided text to match the specified format. Analyze the examples to understand the desired output. The text should only contain the corrected text that can be parsed by the parsing code.",
                 good_examples=["seconds: 10", "seconds: 5"],
                 bad_examples=["I think I will wait 5 seconds.", "10"],
                 parsing_code=parsing_code,
-                model_name=self.model,
             )
+            heal_prompt = self.prompts.heal(**heal_args)
+            heal_started = time.perf_counter()
+            if self.client is None:
+                healed_response = call_with_shared_limits(
+                    self.model, heal_prompt.text, lambda model, _: heal_llm_output(**heal_args, model_name=model)
+                )
+            else:
+                healed_response = self.client.heal(**heal_args, model_name=self.model)
+            self._record_tokens(heal_prompt, healed_response, "heal", time.perf_counter() - heal_started)
             logging.debug(f"Agent '{self.name}' received healed response: {healed_response}")
             time_to_wait = parse_message(healed_response)
             if time_to_wait is None:
-                logging.error(f"Agent '{self.name}' failed to heal LLM response. Falling back to default wait time.")
-                time_to_wait = 10  # Fallback
-
-        card_to_play = min(self.hand)
-        logging.info(f"Agent '{self.name}' decided to play card {card_to_play} and wait {time_to_wait} seconds.")
-        return AgentResponse(card_to_play=card_to_play, time_to_wait=time_to_wait)
+                logging.error(f"Agent '{self.name}' failed to heal LLM response. Falling back to the fallback policy.")
+                time_to_wait = self.fallback(hand, last_played_card, num_other_cards)
+                return time_to_wait, time.perf_counter() - started
+
+        if self.decision_log is not None:
+            self._log_decision(hand, last_played_card, num_other_cards, time_to_wait)
+        return time_to_wait, time.perf_counter() - started
+
+    def _log_decision(self, hand: list[int], last_played_card: int, num_other_cards: int, time_to_wait: int):
+        """Appends an LLM decision to the decision log. Queries run on several threads, so writes are locked."""
+        record = {"hand": list(hand), "last_played_card": last_played_card,
+                  "num_other_cards": num_other_cards, "time_to_wait": time_to_wait}
+        with self._decision_log_lock:
+            with open(self.decision_log, 'a') as f:
+                f.write(json.dumps(record) + "\n")
 
     def review_game(self, game_reviews: list[str]):
         """Reviews the game history and updates the agent's notes."""
+        if self.speculation_stats.issued:
+            stats = self.speculation_stats
+            logging.info(f"Agent '{self.name}' speculation: {stats.hits}/{stats.hits + stats.misses} hits "
+                         f"({stats.hit_rate * 100:.1f}%), {stats.latency_saved:.2f}s of latency saved, "
+                         f"{stats.wasted} LLM calls wasted on misses.")
+        if self.decision_events:
+            latencies = [event.latency for event in self.decision_events]
+            outcomes = [event.outcome for event in self.decision_events]
+            logging.info(f"Agent '{self.name}' decision latency: p50 {percentile(latencies, 50):.2f}s, "
+                         f"p99 {percentile(latencies, 99):.2f}s over {len(latencies)} decisions; "
+                         f"{sum(event.hedged for event in self.decision_events)} hedged, "
+                         f"{outcomes.count('deadline')} missed the deadline.")
+        if self.token_totals.calls:
+            totals = self.token_totals
+            logging.info(f"Agent '{self.name}' tokens: {totals.prompt_tokens} prompt "
+                         f"({totals.prefix_share * 100:.1f}% in a cacheable prefix, {totals.cached_tokens} reported cached), "
+                         f"{totals.completion_tokens} completion over {totals.calls} calls.")
         history_string = "\n\n".join(game_reviews)
         logging.debug(f"Agent '{self.name}' reviewing game history: {history_string}")
 
-        prompt = f"""You are an expert player at the game The Mind. You have just completed a series of games and are reviewing your performance to improve your strategy. Below is the game history from your perspective and your current notes.
-
-Game History:
-{history_string}
-
-Your Current Strategy Notes:
-{self.notes}
-
-Based on the game history, please analyze your performance and provide an updated, concise strategy to improve your play in the next game. Your notes should be a list of rules or heuristics. Your response should only be the updated notes.
-"""
-        logging.debug(f"Agent '{self.name}' sending review prompt to LLM: {prompt}")
-        response = call_llm_with_retry(self.model, prompt)
+        prompt = self.prompts.review(self.notes, history_string)
+        logging.debug(f"Agent '{self.name}' sending review prompt to LLM: {prompt.text}")
+        response = self._complete(prompt, "review")
         logging.debug(f"Agent '{self.name}' received updated notes from LLM: {response}")
         self.notes = response
         logging.info(f"Agent '{self.name}' updated its notes.")
@@ -0,0 +1,468 @@
+"""Clients that LLMAgents use to reach a language model.
+
+A client owns everything about talking to a provider: connections, retries and
+response parsing. Agents share clients, so a process keeps one warm connection
+pool no matter how many agents and games it runs.
+"""
+import itertools
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import openai
+
+from .prompts import PromptBuilder
+
+
+class TransientLLMError(Exception):
+    """A provider failure worth retrying, such as a rate limit, timeout or server error."""
+
+
+class RateLimiter:
+    """A thread-safe token bucket limiting how many requests start per second."""
+
+    def __init__(self, requests_per_second: float, burst: int = 1):
+        if requests_per_second <= 0 or burst < 1:
+            raise ValueError("The rate must be positive and the burst at least 1.")
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request may start."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.requests_per_second)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.requests_per_second
+            time.sleep(delay)
+
+
+class ResponseCache:
+    """A thread-safe, size-bounded LRU cache of replies keyed by (model, prompt)."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        with self._lock:
+            reply = self._entries.get((model, prompt))
+            if reply is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((model, prompt))
+            self.hits += 1
+            return reply
+
+    def put(self, model: str, prompt: str, reply: str):
+        with self._lock:
+            self._entries[(model, prompt)] = reply
+            self._entries.move_to_end((model, prompt))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class LLMClient(ABC):
+    """Interface for sending prompts to a language model."""
+
+    def __init__(self, max_retries: int = 3, backoff: float = 1.0):
+        """Initializes the client.
+
+        Args:
+            max_retries: How many times a transient failure is retried.
+            backoff: Seconds to wait before the first retry; doubled on each retry.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rate_limiter: Optional[RateLimiter] = None
+        self.cache: Optional[ResponseCache] = None
+        self._local = threading.local()
+
+    def complete(self, model: str, prompt: str) -> str:
+        """Sends a prompt and returns the model's reply, retrying transient failures.
+
+        Replies are served from `cache` when one is attached, and every request
+        waits for `rate_limiter` when one is attached.
+        """
+        self._local.usage = None
+        if self.cache is not None:
+            reply = self.cache.get(model, prompt)
+            if reply is not None:
+                return reply
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                reply = self._complete_once(model, prompt)
+                if self.cache is not None:
+                    self.cache.put(model, prompt, reply)
+                return reply
+            except TransientLLMError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                logging.warning(f"LLM request to '{model}' failed ({e}). Retrying in {delay:.1f}s.")
+                time.sleep(delay)
+
+    @abstractmethod
+    def _complete_once(self, model: str, prompt: str) -> str:
+        """Sends a single request. Raises TransientLLMError for retryable failures."""
+        pass
+
+    def last_usage(self) -> Optional[dict[str, int]]:
+        """Returns the token counts the provider reported for this thread's last `complete` call.
+
+        The dict has `prompt_tokens`, `completion_tokens` and `cached_tokens` keys,
+        or is None when the provider reported nothing or the reply came from the cache.
+        """
+        return getattr(self._local, "usage", None)
+
+    def _report_usage(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0):
+        """Records the token counts of the request just completed on this thread."""
+        self._local.usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+        }
+
+    def heal(
+        self,
+        broken_text: str,
+        expected_format: str,
+        instructions: str,
+        good_examples: list[str],
+        bad_examples: list[str],
+        parsing_code: str,
+        model_name: str,
+    ) -> str:
+        """Asks the model to rewrite a malformed reply into the expected format."""
+        prompt = PromptBuilder().heal(broken_text, expected_format, instructions, good_examples, bad_examples,
+                                      parsing_code)
+        return self.complete(model_name, prompt.text)
+
+
+class PooledHTTPClient(LLMClient):
+    """An OpenAI-compatible HTTP client that keeps its connections alive between requests.
+
+    One instance holds one connection pool; share it through `get_shared_client`
+    so connection setup is paid once per process rather than once per decision.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://openrouter.ai/api/v1",
+        api_key: Optional[str] = None,
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+    ):
+        """Initializes the client.
+
+        Args:
+            base_url: The provider's OpenAI-compatible API root.
+            api_key: The API key. Defaults to the OPENROUTER_API_KEY environment variable.
+            timeout: Seconds before a single request times out.
+            max_retries: How many times a transient failure is retried.
+            backoff: Seconds to wait before the first retry; doubled on each retry.
+        """
+        super().__init__(max_retries, backoff)
+        self._client = openai.OpenAI(
+            base_url=base_url,
+            api_key=api_key or os.environ.get("OPENROUTER_API_KEY"),
+            timeout=timeout,
+            max_retries=0,
+        )
+
+    def _complete_once(self, model: str, prompt: str) -> str:
+        try:
+            response = self._client.chat.completions.create(
+                model=model, messages=[{"role": "user", "content": prompt}]
+            )
+        except (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError) as e:
+            raise TransientLLMError(str(e)) from e
+        usage = response.usage
+        if usage is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            self._report_usage(usage.prompt_tokens, usage.completion_tokens, getattr(details, "cached_tokens", None) or 0)
+        return response.choices[0].message.content or ""
+
+    def close(self):
+        """Closes the connection pool."""
+        self._client.close()
+
+
+LAST_PLAYED_PATTERN = re.compile(r"most recent card played was (\d+)")
+NEXT_CARD_PATTERN = re.compile(r"next card to be played is (\d+)")
+
+
+def gap_responder(model: str, prompt: str) -> str:
+    """Answers decision prompts with the gap to the lowest card, like a PerfectAgent."""
+    last_played = LAST_PLAYED_PATTERN.search(prompt)
+    next_card = NEXT_CARD_PATTERN.search(prompt)
+    if last_played and next_card:
+        return f"seconds: {int(next_card.group(1)) - int(last_played.group(1))}"
+    return "- Wait roughly one second for every number between the last card played and your lowest card."
+
+
+class LocalClient(LLMClient):
+    """An in-process provider for tests and benchmarks; no network involved."""
+
+    def __init__(self, responder: Callable[[str, str], str] = gap_responder, max_retries: int = 3, backoff: float = 0.0):
+        """Initializes the client.
+
+        Args:
+            responder: Called with (model, prompt) to produce each reply.
+            max_retries: How many times a transient failure is retried.
+            backoff: Seconds to wait before the first retry; doubled on each retry.
+        """
+        super().__init__(max_retries, backoff)
+        self.responder = responder
+
+    def _complete_once(self, model: str, prompt: str) -> str:
+        return self.responder(model, prompt)
+
+    def heal(self, broken_text: str, expected_format: str, instructions: str, good_examples: list[str],
+             bad_examples: list[str], parsing_code: str, model_name: str) -> str:
+        """Heals a reply by keeping its first integer."""
+        number = re.search(r"\d+", broken_text)
+        return f"seconds: {number.group()}" if number else broken_text
+
+
+def fixed_responder(model: str, prompt: str) -> str:
+    """Answers decision prompts with a fixed 10 second wait."""
+    if NEXT_CARD_PATTERN.search(prompt):
+        return "seconds: 10"
+    return "- Always wait 10 seconds."
+
+
+FAKE_STRATEGIES: dict[str, Callable[[str, str], str]] = {
+    "gap": gap_responder,
+    "fixed": fixed_responder,
+}
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+
+
+class FakeClient(LLMClient):
+    """An offline provider that behaves like a real one under load, for load and latency tests.
+
+    Every request sleeps for a latency drawn from a configurable distribution and
+    may fail with a rate limit or server error, which the client retries like real
+    ones. Decision replies may come back malformed, which sends the agent through
+    its healing path; heal requests are answered by the fake provider too, so they
+    pay latency and failures like any other request.
+    """
+
+    def __init__(
+        self,
+        strategy: str = "gap",
+        script: Optional[list[str]] = None,
+        latency: float = 0.0,
+        latency_distribution: str = "constant",
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: Optional[int] = None,
+        max_retries: int = 3,
+        backoff: float = 0.0,
+    ):
+        """Initializes the client.
+
+        Args:
+            strategy: How decisions are answered, one of `FAKE_STRATEGIES`.
+            script: If given, replies are taken from this list in order, cycling,
+                instead of from the strategy.
+            latency: The mean latency of a request in seconds.
+            latency_distribution: One of `LATENCY_DISTRIBUTIONS`. "uniform" draws from
+                [0, 2 * latency]; "lognormal" has shape `latency_sigma` and a heavy tail.
+            latency_sigma: The shape of the lognormal distribution.
+            error_rate: The probability a request fails with a server error.
+            rate_limit_rate: The probability a request fails with a 429 rate limit.
+            malformed_rate: The probability a decision reply is not in the expected format.
+            seed: Seeds latencies, failures and malformed replies.
+            max_retries: How many times a transient failure is retried.
+            backoff: Seconds to wait before the first retry; doubled on each retry.
+        """
+        super().__init__(max_retries, backoff)
+        if strategy not in FAKE_STRATEGIES:
+            raise ValueError(f"Unknown fake strategy: {strategy}")
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        if latency < 0 or not all(0 <= rate <= 1 for rate in (error_rate, rate_limit_rate, malformed_rate)):
+            raise ValueError("Latency must be non-negative and rates between 0 and 1.")
+        self.responder = FAKE_STRATEGIES[strategy]
+        self._script = itertools.cycle(script) if script else None
+        self.latency = latency
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.malformed = 0
+        self.heals = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _complete_once(self, model: str, prompt: str) -> str:
+        is_heal = "Text to correct:" in prompt
+        with self._lock:
+            self.requests += 1
+            delay = self._draw_latency()
+            failure = self._random.random()
+            malformed = self._random.random() < self.malformed_rate
+            scripted = next(self._script) if self._script is not None and not is_heal else None
+        time.sleep(delay)
+
+        if failure < self.rate_limit_rate:
+            with self._lock:
+                self.rate_limited += 1
+            raise TransientLLMError("429 Too Many Requests (fake)")
+        if failure < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise TransientLLMError("500 Internal Server Error (fake)")
+
+        if is_heal:
+            with self._lock:
+                self.heals += 1
+            broken_text = prompt.rsplit("Text to correct:", 1)[1]
+            number = re.search(r"\d+", broken_text)
+            return f"seconds: {number.group()}" if number else broken_text.strip()
+
+        reply = scripted if scripted is not None else self.responder(model, prompt)
+        if malformed and reply.startswith("seconds:"):
+            with self._lock:
+                self.malformed += 1
+            reply = f"I think I will wait{reply[len('seconds:'):]} seconds."
+        return reply
+
+    def _draw_latency(self) -> float:
+        """Draws a request latency with mean `latency`. Call with the lock held."""
+        if self.latency == 0 or self.latency_distribution == "constant":
+            return self.latency
+        if self.latency_distribution == "uniform":
+            return self._random.uniform(0, 2 * self.latency)
+        if self.latency_distribution == "exponential":
+            return self._random.expovariate(1 / self.latency)
+        mu = math.log(self.latency) - self.latency_sigma ** 2 / 2
+        return self._random.lognormvariate(mu, self.latency_sigma)
+
+
+CLIENT_REGISTRY: dict[str, type[LLMClient]] = {
+    "pooled": PooledHTTPClient,
+    "local": LocalClient,
+    "fake": FakeClient,
+}
+
+_shared_clients: dict[str, LLMClient] = {}
+_shared_rate_limiter: Optional[RateLimiter] = None
+_shared_cache: Optional[ResponseCache] = None
+_dedicated_clients: "weakref.WeakSet[LLMClient]" = weakref.WeakSet()  # Built from config dicts
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(client_type: str = "pooled") -> LLMClient:
+    """Returns the process-wide client of a registered type, creating it on first use."""
+    with _shared_clients_lock:
+        if client_type not in _shared_clients:
+            if client_type not in CLIENT_REGISTRY:
+                raise ValueError(f"Unknown LLM client type: {client_type}")
+            client = CLIENT_REGISTRY[client_type]()
+            client.rate_limiter = _shared_rate_limiter
+            client.cache = _shared_cache
+            _shared_clients[client_type] = client
+        return _shared_clients[client_type]
+
+
+def configure_shared_clients(requests_per_second: Optional[float] = None, cache_size: Optional[int] = None):
+    """Sets the rate limiter and response cache that every shared client uses.
+
+    Agents without a client share them too, through `call_with_shared_limits`.
+
+    Args:
+        requests_per_second: The request rate all shared clients together may not exceed.
+        cache_size: How many replies to cache across all shared clients. Identical
+            prompts to the same model are then answered from the cache.
+    """
+    global _shared_rate_limiter, _shared_cache
+    with _shared_clients_lock:
+        _shared_rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+        _shared_cache = ResponseCache(cache_size) if cache_size else None
+        for client in [*_shared_clients.values(), *_dedicated_clients]:
+            client.rate_limiter = _shared_rate_limiter
+            client.cache = _shared_cache
+
+
+def call_with_shared_limits(model: str, prompt: str, send: Callable[[str, str], str]) -> str:
+    """Sends a prompt through `send` under the shared rate limiter and response cache.
+
+    Agents without a client call the provider through llmutils, which retries on its
+    own. This keeps those calls inside the limits set by `configure_shared_clients`.
+    Only the first attempt of each call waits for the rate limiter.
+
+    Args:
+        model: The model the prompt is for.
+        prompt: The prompt text, which is also the cache key.
+        send: Sends the prompt and returns the reply, e.g. `call_llm_with_retry`.
+    """
+    with _shared_clients_lock:
+        rate_limiter, cache = _shared_rate_limiter, _shared_cache
+    if cache is not None:
+        reply = cache.get(model, prompt)
+        if reply is not None:
+            return reply
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    reply = send(model, prompt)
+    if cache is not None:
+        cache.put(model, prompt, reply)
+    return reply
+
+
+def resolve_client(client: "LLMClient | str | dict | None") -> Optional[LLMClient]:
+    """Turns an agent's `client` parameter into a client.
+
+    Args:
+        client: A client instance; the name of a registered type, for the shared
+            instance of that type; or a config dict with `type` and optional `params`,
+            for a dedicated instance. None keeps the default llmutils call path,
+            which `call_with_shared_limits` puts under the same limits.
+            Dedicated instances have their own connections and settings but still
+            share the rate limiter and response cache set by `configure_shared_clients`.
+    """
+    if client is None or isinstance(client, LLMClient):
+        return client
+    if isinstance(client, str):
+        return get_shared_client(client)
+    client_type = client.get("type")
+    if client_type not in CLIENT_REGISTRY:
+        raise ValueError(f"Unknown LLM client type: {client_type}")
+    dedicated = CLIENT_REGISTRY[client_type](**client.get("params", {}))
+    with _shared_clients_lock:
+        dedicated.rate_limiter = _shared_rate_limiter
+        dedicated.cache = _shared_cache
+        _dedicated_clients.add(dedicated)
+    return dedicated
@@ -0,0 +1,170 @@
+"""Prompt layout and token accounting for LLM agents.
+
+Providers cache the longest prompt prefix they have seen recently and bill
+(and serve) those tokens at a discount. Prompts are therefore built from the
+most static content to the most dynamic: the rules first, which never change;
+then the agent's notes, which change once per review; and the game state
+last, which changes on every decision.
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+RULES = """You are playing "The Mind"
+Objective:
+As a team, play cards from 1-100 into a central pile in perfect ascending order. Successfully play all cards from all players' hands to pass a level. The number of cards per player increases with each level.
+
+Core Mechanics:
+
+- Ascending Order is Law: Cards must be played in strictly increasing value. Playing a card while another player holds a lower one results in a mistake.
+- No Communication: All forms of explicit signaling (gestures, talk, etc.) about your hand are forbidden.
+- Play by Feel (Timing): The decision to play is based on a shared, unspoken sense of timing. The smaller the numeric gap between the last card played and your lowest card, the faster you should play it. Always focus on playing your lowest card first.
+
+Key Events:
+
+- Mistake: Ends the game
+- Level Cleared: When all cards have been legally played, the team advances to the next level.
+"""
+
+NOTES = """
+Your current strategy notes are
+{notes}
+"""
+
+DECISION = """
+The current state of the game is
+{game_state}
+How many seconds do you want to wait before playing your next card? Your response should be an integer number of seconds
+
+Your response should be in the format
+seconds: <number of seconds>
+"""
+
+REVIEW_RULES = """You are an expert player at the game The Mind. You have just completed a series of games and are reviewing your performance to improve your strategy. Below are your current notes and the game history from your perspective.
+
+Based on the game history, please analyze your performance and provide an updated, concise strategy to improve your play in the next game. Your notes should be a list of rules or heuristics. Your response should only be the updated notes.
+"""
+
+REVIEW = """
+Game History:
+{history}
+"""
+
+HEAL = """{instructions}
+
+Expected format: {expected_format}
+
+Good examples:
+{good_examples}
+
+Bad examples:
+{bad_examples}
+
+The corrected text must be parseable by this code:
+{parsing_code}
+"""
+
+HEAL_TEXT = """
+Text to correct:
+{broken_text}
+"""
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates how many tokens a BPE tokenizer splits text into.
+
+    Every punctuation mark counts as one token and every word as one token per
+    four characters, which is within about 10% of the cl100k and o200k
+    tokenizers on English prompts like ours.
+    """
+    return sum((len(token) + 3) // 4 for token in TOKEN_PATTERN.findall(text))
+
+
+@dataclass
+class Prompt:
+    """A prompt split into its cacheable prefix and the part that changes on every call."""
+    prefix: str
+    suffix: str
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+
+class PromptBuilder:
+    """Builds decision, review and heal prompts with the static content first."""
+
+    def __init__(self):
+        self._prefix_tokens: dict[str, int] = {}
+
+    def decision(self, notes: str, game_state: str) -> Prompt:
+        """Returns the prompt asking how long to wait in a game state."""
+        return Prompt(RULES + NOTES.format(notes=notes), DECISION.format(game_state=game_state))
+
+    def review(self, notes: str, history: str) -> Prompt:
+        """Returns the prompt asking for updated notes after a series of games."""
+        return Prompt(REVIEW_RULES + NOTES.format(notes=notes), REVIEW.format(history=history))
+
+    def heal(
+        self,
+        broken_text: str,
+        expected_format: str,
+        instructions: str,
+        good_examples: list[str],
+        bad_examples: list[str],
+        parsing_code: str,
+    ) -> Prompt:
+        """Returns the prompt asking to rewrite a malformed reply into the expected format."""
+        prefix = HEAL.format(
+            instructions=instructions,
+            expected_format=expected_format,
+            good_examples="\n".join(good_examples),
+            bad_examples="\n".join(bad_examples),
+            parsing_code=parsing_code,
+        )
+        return Prompt(prefix, HEAL_TEXT.format(broken_text=broken_text))
+
+    def prefix_tokens(self, prompt: Prompt) -> int:
+        """Returns the estimated token count of a prompt's prefix, memoized since prefixes repeat."""
+        tokens = self._prefix_tokens.get(prompt.prefix)
+        if tokens is None:
+            if len(self._prefix_tokens) >= 64:
+                self._prefix_tokens.clear()
+            tokens = self._prefix_tokens[prompt.prefix] = estimate_tokens(prompt.prefix)
+        return tokens
+
+
+@dataclass
+class TokenUsage:
+    """The token counts of a single LLM call."""
+    kind: str  # "decision", "review" or "heal"
+    prompt_tokens: int
+    completion_tokens: int
+    prefix_tokens: int  # Prompt tokens a provider's prefix cache can reuse between calls
+    cached_tokens: Optional[int] = None  # Prompt tokens the provider reported as served from its cache
+    estimated: bool = True  # Whether the prompt and completion counts are local estimates
+    latency: float = 0.0
+
+
+@dataclass
+class TokenTotals:
+    """Running token totals over an agent's LLM calls."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    prefix_tokens: int = 0
+    cached_tokens: int = 0
+
+    def add(self, usage: TokenUsage):
+        self.calls += 1
+        self.prompt_tokens += usage.prompt_tokens
+        self.completion_tokens += usage.completion_tokens
+        self.prefix_tokens += usage.prefix_tokens
+        self.cached_tokens += usage.cached_tokens or 0
+
+    @property
+    def prefix_share(self) -> float:
+        """The fraction of prompt tokens in a cacheable prefix."""
+        return self.prefix_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
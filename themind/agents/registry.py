@@ -1,5 +1,9 @@
+import inspect
+
 from .agents import RandomAgent, PerfectAgent, NoisyAgent, DummyAgent, FastAgent
 from .llmagent import LLMAgent
+from .distill import DistilledAgent
+from .rolloutagent import RolloutAgent
 
 AGENT_REGISTRY = {
     "RandomAgent": RandomAgent,
@@ -8,4 +12,38 @@ AGENT_REGISTRY = {
     "DummyAgent": DummyAgent,
     "FastAgent": FastAgent,
     "LLMAgent": LLMAgent,
+    "DistilledAgent": DistilledAgent,
+    "RolloutAgent": RolloutAgent,
 }
+
+
+def build_agents(agent_configs: list[dict], rules: dict | None = None, at_table: bool = True) -> list:
+    """Creates agents from the `agents` entries of a config.
+
+    Agents that model the table, such as `RolloutAgent`, are given any of
+    `num_teammates`, `seat` and `deck_size` their params leave out.
+
+    Args:
+        agent_configs: The `agents` entries, each with a `type` and optional `name` and `params`.
+        rules: The config's `rules`, for the deck size.
+        at_table: Whether the configs are the whole table in seat order. If False, as for
+            substitutes in a replay, seats and teammates are left to the params.
+    """
+    table = {}
+    if at_table and len(agent_configs) > 1:
+        table["num_teammates"] = len(agent_configs) - 1
+    if rules and "deck_size" in rules:
+        table["deck_size"] = rules["deck_size"]
+
+    agents = []
+    for seat, agent_conf in enumerate(agent_configs):
+        agent_type = agent_conf.get("type")
+        if agent_type not in AGENT_REGISTRY:
+            raise ValueError(f"Unknown agent type: {agent_type}")
+        agent_class = AGENT_REGISTRY[agent_type]
+        params = agent_conf.get("params", {})
+        accepted = inspect.signature(agent_class).parameters
+        defaults = dict(table, seat=seat) if at_table else table
+        params = {**{key: value for key, value in defaults.items() if key in accepted}, **params}
+        agents.append(agent_class(name=agent_conf.get("name", agent_type), **params))
+    return agents
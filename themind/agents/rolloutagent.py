@@ -0,0 +1,143 @@
+import logging
+import time
+
+import numpy as np
+
+from .agents import Agent, AgentResponse
+from ..game.rollout import EMPTY, sample_without_replacement, simulate
+
+
+class RolloutAgent(Agent):
+    """An agent that picks its wait by Monte Carlo rollouts of the rest of the level.
+
+    For each decision it deals the cards it cannot see (every card above the last
+    one played, minus its own hand) into its teammates' hands at random, then
+    plays the level out with teammates modelled as NoisyAgents, once for every
+    candidate wait. All candidates are scored on the same deals, and
+    the wait that clears the level most often is played.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        time_budget: float = 0.05,
+        max_rollouts: int = 2000,
+        batch_size: int = 250,
+        num_teammates: int = 1,
+        teammate_offset: int = 5,
+        teammate_noise: int = 2,
+        deck_size: int = 100,
+        seat: int = 0,
+        seed: int | None = None,
+    ):
+        """Initializes the agent.
+
+        Args:
+            name: The name of the agent.
+            time_budget: Seconds a decision may spend on rollouts. At least one batch
+                is always played.
+            max_rollouts: The most rollouts per decision.
+            batch_size: How many rollouts are played at once between budget checks.
+            num_teammates: How many other players are at the table. Configs built with
+                `build_agents` set this, `seat` and `deck_size` from the table and rules.
+            teammate_offset: The offset teammates are modelled as adding to their waits.
+                The agent also plays its own later turns with this offset.
+            teammate_noise: The uniform noise teammates are modelled as adding to their waits.
+            deck_size: The highest card in the deck.
+            seat: The agent's position at the table, from 0 to `num_teammates`. Ties
+                between equal waits go to the earlier seat.
+            seed: Seeds the rollouts, for reproducible decisions.
+        """
+        super().__init__(name)
+        if time_budget <= 0 or max_rollouts < 1 or batch_size < 1:
+            raise ValueError("The time budget, max_rollouts and batch_size must be positive.")
+        if num_teammates < 1:
+            raise ValueError("num_teammates must be at least 1.")
+        if teammate_offset < 0 or teammate_noise < 0:
+            raise ValueError("Offset and noise must be non-negative.")
+        if not 0 <= seat <= num_teammates:
+            raise ValueError("seat must be between 0 and num_teammates.")
+        self.time_budget = time_budget
+        self.max_rollouts = max_rollouts
+        self.batch_size = batch_size
+        self.num_teammates = num_teammates
+        self.teammate_offset = teammate_offset
+        self.teammate_noise = teammate_noise
+        self.deck_size = deck_size
+        self.seat = seat
+        self.rng = np.random.default_rng(seed)
+        self.last_rollouts = 0
+        self.last_clear_rate: float | None = None
+        self._warned_table = False
+
+    def decide_move(self, last_played_card: int, num_other_cards: int) -> AgentResponse:
+        # At the start of a level every teammate holds as many cards as this agent.
+        if last_played_card == 0 and num_other_cards != self.num_teammates * len(self.hand) and not self._warned_table:
+            logging.warning(f"Agent '{self.name}' models {self.num_teammates} teammates, but {num_other_cards} other "
+                            f"cards were dealt against its {len(self.hand)}; check num_teammates.")
+            self._warned_table = True
+        card_to_play = min(self.hand)
+        conventional = card_to_play - last_played_card + self.teammate_offset
+        # Every card left in the level is above the last one played, and the hand is sorted.
+        unseen = np.delete(np.arange(last_played_card + 1, self.deck_size + 1),
+                           [card - last_played_card - 1 for card in self.hand if card <= self.deck_size])
+        if num_other_cards == 0 or len(unseen) < num_other_cards:
+            if num_other_cards:
+                logging.warning(f"Agent '{self.name}' cannot place {num_other_cards} cards among "
+                                f"{len(unseen)} unseen ones; check deck_size. Playing the conventional wait.")
+            return AgentResponse(card_to_play=card_to_play, time_to_wait=conventional)
+
+        spread = 2 * self.teammate_noise + 2
+        candidates = np.arange(max(0, conventional - spread), conventional + spread + 1)
+        clears = np.zeros(len(candidates))
+        started = time.perf_counter()
+        rollouts = 0
+        while rollouts < self.max_rollouts:
+            batch = min(self.batch_size, self.max_rollouts - rollouts)
+            clears += self._rollout_batch(batch, candidates, last_played_card, unseen, num_other_cards)
+            rollouts += batch
+            if time.perf_counter() - started >= self.time_budget:
+                break
+
+        # Prefer the conventional wait among equally good candidates, so teammates can read the timing.
+        best = np.flatnonzero(clears == clears.max())
+        time_to_wait = int(candidates[best[np.abs(candidates[best] - conventional).argmin()]])
+        self.last_rollouts = rollouts
+        self.last_clear_rate = float(clears.max() / rollouts)
+        logging.debug(f"Agent '{self.name}' ran {rollouts} rollouts per candidate in "
+                      f"{time.perf_counter() - started:.3f}s; waiting {time_to_wait}s clears "
+                      f"{self.last_clear_rate * 100:.1f}% of them.")
+        return AgentResponse(card_to_play=card_to_play, time_to_wait=time_to_wait)
+
+    def _rollout_batch(
+        self, batch: int, candidates: np.ndarray, last_played_card: int, unseen: np.ndarray, num_other_cards: int
+    ) -> np.ndarray:
+        """Plays `batch` random deals once per candidate wait and returns how many each cleared."""
+        # Deal the unseen cards as evenly as possible, as teammates started with equal hands.
+        sizes = [num_other_cards // self.num_teammates + (i < num_other_cards % self.num_teammates)
+                 for i in range(self.num_teammates)]
+        hand_size = max(len(self.hand), max(sizes))
+        dealt = unseen[sample_without_replacement(len(unseen), num_other_cards, batch, self.rng)]
+
+        hands = np.full((batch, self.num_teammates + 1, hand_size), EMPTY, dtype=np.int64)
+        hands[:, self.seat, :len(self.hand)] = self.hand
+        teammate_seats = [seat for seat in range(self.num_teammates + 1) if seat != self.seat]
+        start = 0
+        for teammate, size in zip(teammate_seats, sizes):
+            hands[:, teammate, :size] = np.sort(dealt[:, start:start + size], axis=1)
+            start += size
+
+        num_candidates = len(candidates)
+        cleared = simulate(
+            np.tile(hands, (num_candidates, 1, 1)),
+            last_played_card,
+            [self.teammate_offset] * (self.num_teammates + 1),
+            self.teammate_noise,
+            self.rng,
+            first_waits=np.repeat(candidates, batch),
+            first_waits_seat=self.seat,
+        )
+        return cleared.reshape(num_candidates, batch).sum(axis=1)
+
+    def review_game(self, game_reviews: list[str]):
+        pass
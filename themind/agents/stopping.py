@@ -0,0 +1,114 @@
+import math
+from statistics import NormalDist
+
+from ..game import Game
+
+METRICS = ("win_rate", "level_lost")
+
+
+class StoppingRule:
+    """Decides when a run has played enough games to estimate a metric.
+
+    The metric is either the win rate, or the mean level a game is lost on, where
+    a won game counts as lost on the level after the last one. The run stops once
+    the confidence interval is narrower than `ci_width`, or once it excludes
+    `threshold`, whichever is configured and comes first.
+
+    The level lost is bounded to [1, num_levels + 1], and its variance is floored
+    at a quarter of that range squared (the most a bounded outcome can vary)
+    divided by the number of games. Runs of identical outcomes therefore still get
+    an interval that narrows as 1/n rather than one of zero width.
+
+    The threshold test is checked after every game, so its confidence level is
+    spent across looks (the level at game n uses alpha / (n (n + 1))). That keeps
+    the overall false-positive rate below alpha no matter when the run stops.
+    """
+
+    def __init__(
+        self,
+        metric: str = "win_rate",
+        ci_width: float | None = None,
+        threshold: float | None = None,
+        confidence: float = 0.95,
+        min_games: int = 10,
+    ):
+        """Initializes the rule.
+
+        Args:
+            metric: "win_rate" or "level_lost".
+            ci_width: Stop once the confidence interval is at most this wide.
+            threshold: Stop once the metric is significantly above or below this value.
+            confidence: The confidence level of the interval and the test.
+            min_games: Never stop before this many games.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown stopping metric: {metric}")
+        if ci_width is None and threshold is None:
+            raise ValueError("A stopping rule needs a ci_width, a threshold, or both.")
+        if not 0 < confidence < 1:
+            raise ValueError("Confidence must be between 0 and 1.")
+        self.metric = metric
+        self.ci_width = ci_width
+        self.threshold = threshold
+        self.confidence = confidence
+        self.min_games = min_games
+        self.games = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._range = 0  # Width of the level_lost range, set from the games' rules
+        self.reason: str | None = None
+
+    def update(self, game: Game):
+        """Adds a finished game to the running estimate."""
+        if self.metric == "win_rate":
+            value = 1.0 if game.is_win() else 0.0
+        else:
+            value = game.rules.num_levels + 1 if game.is_win() else game.level_lost
+            self._range = game.rules.num_levels
+        self.games += 1
+        delta = value - self.mean
+        self.mean += delta / self.games
+        self._m2 += delta * (value - self.mean)
+
+    def interval(self, confidence: float | None = None) -> tuple[float, float]:
+        """Returns the confidence interval of the metric (Wilson for the win rate, normal with a variance floor otherwise)."""
+        z = NormalDist().inv_cdf((1 + (confidence or self.confidence)) / 2)
+        n = self.games
+        if n == 0:
+            return (-math.inf, math.inf)
+        if self.metric == "win_rate":
+            center = (self.mean + z * z / (2 * n)) / (1 + z * z / n)
+            half_width = z * math.sqrt(self.mean * (1 - self.mean) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        else:
+            variance = self._m2 / (n - 1) if n > 1 else math.inf
+            variance = max(variance, self._range ** 2 / (4 * n))
+            center, half_width = self.mean, z * math.sqrt(variance / n)
+        return center - half_width, center + half_width
+
+    def should_stop(self) -> bool:
+        """Returns True once the configured target has been met."""
+        if self.games < self.min_games:
+            return False
+        low, high = self.interval()
+        if self.ci_width is not None and high - low <= self.ci_width:
+            self.reason = f"confidence interval [{low:.3f}, {high:.3f}] is narrower than {self.ci_width}"
+            return True
+        if self.threshold is not None:
+            alpha = (1 - self.confidence) / (self.games * (self.games + 1))
+            low, high = self.interval(1 - alpha)
+            if low > self.threshold or high < self.threshold:
+                side = "above" if low > self.threshold else "below"
+                self.reason = f"{self.metric} is significantly {side} {self.threshold}"
+                return True
+        return False
+
+    def to_dict(self) -> dict:
+        """Returns the current estimate as a JSON-serializable dictionary."""
+        low, high = self.interval()
+        return {
+            "metric": self.metric,
+            "games": self.games,
+            "estimate": self.mean,
+            "confidence_interval": [low, high] if self.games > 1 else None,
+            "reason": self.reason,
+        }
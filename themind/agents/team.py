@@ -2,34 +2,178 @@ import uuid
 import os
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator
 from ..game import Game
 from .agents import Agent
+from .stopping import StoppingRule
+from .writer import ResultsWriter
+from ..profiling import phase
+
+STREAM_REVIEW_HISTORY = 10  # Reviews kept per agent in streaming runs unless max_review_history is set
+
+
+@dataclass
+class RecordedDecision:
+    """One player's decision on a saved turn."""
+    player: str
+    hand: tuple[int, ...]
+    last_played_card: int
+    num_other_cards: int
+    seconds: int
+    played: bool  # The player acted on the turn
+    correct: bool  # The turn's play was correct, whoever made it
+
+    @property
+    def mistake(self) -> bool:
+        return self.played and not self.correct
+
+
+def iter_saved_levels(results_dir: str) -> Iterator[tuple[str, int, list[dict]]]:
+    """Yields every level file written by `Team.save_game_results` under a directory.
+
+    Args:
+        results_dir: A single game, a team, or a whole results tree.
+
+    Yields:
+        Tuples of (game directory, level number, saved turns), in directory order
+        and then level order.
+    """
+    for root, dirs, files in os.walk(results_dir):
+        dirs.sort()
+        levels = sorted(int(name[:-5]) for name in files if name.endswith(".json") and name[:-5].isdigit())
+        for level_number in levels:
+            with open(os.path.join(root, f"{level_number}.json"), 'r') as f:
+                yield root, level_number, json.load(f)
+
+
+@dataclass
+class TeamStats:
+    """Running aggregates over the games a team has played."""
+    games_played: int = 0
+    wins: int = 0
+    level_lost_counts: dict[int, int] = field(default_factory=dict)
+    cards_played_on_loss: int = 0
+    total_cards_on_loss: int = 0
+
+    def record(self, game: Game):
+        """Folds a finished game into the aggregates."""
+        self.games_played += 1
+        if game.is_win():
+            self.wins += 1
+            return
+        self.level_lost_counts[game.level_lost] = self.level_lost_counts.get(game.level_lost, 0) + 1
+        self.cards_played_on_loss += game.cards_played_on_loss or 0
+        self.total_cards_on_loss += game.total_cards_on_loss or 0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games_played if self.games_played else 0.0
+
+    def to_dict(self) -> dict:
+        """Returns the aggregates as a JSON-serializable dictionary."""
+        return {
+            "games_played": self.games_played,
+            "wins": self.wins,
+            "win_rate": self.win_rate,
+            "level_lost_counts": {str(level): count for level, count in sorted(self.level_lost_counts.items())},
+            "cards_played_on_loss": self.cards_played_on_loss,
+            "total_cards_on_loss": self.total_cards_on_loss,
+        }
 
 
 class Team:
     """Manages a team of agents playing multiple games of The Mind."""
 
-    def __init__(self, agents: list[Agent], num_games: int, results_dir: str = "./results"):
+    def __init__(
+        self,
+        agents: list[Agent],
+        num_games: int,
+        results_dir: str = "./results",
+        game_options: dict | None = None,
+        stream: bool = False,
+        max_review_history: int | None = None,
+        review_workers: int = 1,
+        stopping_rule: StoppingRule | None = None,
+        writer_queue_size: int = 64,
+    ):
+        """Initializes the team.
+
+        Args:
+            agents: The agents playing together.
+            num_games: The number of games to play.
+            results_dir: The directory under which this team's results are saved.
+            game_options: Extra keyword arguments passed to every `Game`.
+            stream: If True, games are not kept in `self.games` once they have been
+                saved and folded into `self.stats`, so memory stays flat over long runs.
+            max_review_history: If set, each agent only reviews its most recent
+                `max_review_history` games. Streaming runs default to
+                `STREAM_REVIEW_HISTORY` so the histories do not grow with the run.
+            review_workers: How many agents review a finished game at the same time.
+                Reviews are independent, so with more than one worker every agent's
+                review runs in parallel and the next game starts once all have finished.
+            stopping_rule: If given, `num_games` becomes an upper bound and the run
+                stops as soon as the rule's estimate is precise enough.
+            writer_queue_size: How many result files `play_games` may queue for its
+                background writer before the game loop waits for the disk. 0 writes
+                results synchronously instead.
+        """
+        if stream and max_review_history is None:
+            max_review_history = STREAM_REVIEW_HISTORY
+        if max_review_history is not None and max_review_history < 1:
+            raise ValueError("max_review_history must be at least 1.")
         self.agents = agents
         self.num_games = num_games
+        self.game_options = game_options or {}
+        self.stream = stream
+        self.max_review_history = max_review_history
+        self.review_workers = review_workers
+        self.stopping_rule = stopping_rule
+        self.writer_queue_size = writer_queue_size
+        self._writer: ResultsWriter | None = None
         self.team_guid = str(uuid.uuid4())
         self.results_dir = os.path.join(results_dir, self.team_guid)
         self.agent_review_histories: dict[str, list[str]] = {}
         self.games: list[Game] = []
+        self.stats = TeamStats()
         os.makedirs(self.results_dir, exist_ok=True)
         logging.info(f"Team {self.team_guid} created. Results will be saved to {self.results_dir}")
 
     def play_games(self):
-        """Plays the specified number of games."""
+        """Plays the specified number of games.
+
+        Results are written by a background writer, which is flushed before this
+        returns or raises. Every agent is closed once the games are over.
+        """
+        try:
+            if self.writer_queue_size <= 0:
+                self._play_games()
+                return
+            with ResultsWriter(self.writer_queue_size) as self._writer:
+                try:
+                    self._play_games()
+                finally:
+                    self._writer = None
+        finally:
+            for agent in self.agents:
+                agent.close()
+
+    def _play_games(self):
         for i in range(self.num_games):
             game_number = i + 1
             logging.info(f"\n--- Starting Game {game_number} for Team {self.team_guid} ---")
-            game = Game(self.agents)
-            self.games.append(game)
+            game = Game(self.agents, game_index=i, **self.game_options)
+            if not self.stream:
+                self.games.append(game)
             game.play()
 
             # Save game results
-            self.save_game_results(game, game_number)
+            with phase("persist"):
+                self.save_game_results(game, game_number)
+            self.stats.record(game)
+            if self.stream and not game.is_win():
+                self._log_loss(game, game_number)
 
             # Print game review for user
             logging.info("\n--- Game Review ---")
@@ -38,6 +182,7 @@ class Team:
 
             # Agents learn from the game
             logging.info("\n--- Agents Learning ---")
+            reviews = []
             for agent in self.agents:
                 # Generate the review text from the agent's perspective
                 review_text = game._generate_game_review_text(agent.name, game_number)
@@ -45,25 +190,71 @@ class Team:
                 # Append the new review to the agent's history
                 history = self.agent_review_histories.setdefault(agent.name, [])
                 history.append(review_text)
+                if self.max_review_history is not None:
+                    del history[:-self.max_review_history]
+                reviews.append((agent, history))
 
-                # Pass the full history of text-based reviews to the agent
-                agent.review_game(history)
+            # Pass the full history of text-based reviews to each agent
+            with phase("review"):
+                self._run_reviews(reviews)
+
+            if self.stopping_rule is not None:
+                self.stopping_rule.update(game)
+                if self.stopping_rule.should_stop():
+                    logging.info(f"Team {self.team_guid} stopping after {game_number} games: "
+                                 f"{self.stopping_rule.reason}. {self.num_games - game_number} games saved.")
+                    break
 
         for i, game in enumerate(self.games):
             if not game.is_win():
-                game_number = i + 1
-                level_lost = game.level_lost
-                cards_played = game.cards_played_on_loss
-                total_cards = game.total_cards_on_loss
-                percent_played = (cards_played / total_cards) * 100 if total_cards > 0 else 0
-                logging.info(f"Game {game_number}: Lost on level {level_lost}, "
-                             f"cards played: {cards_played}/{total_cards} ({percent_played:.2f}%)")
+                self._log_loss(game, i + 1)
+
+        with phase("persist"):
+            self.save_summary()
+        logging.info(f"Team {self.team_guid} won {self.stats.wins}/{self.stats.games_played} games "
+                     f"({self.stats.win_rate * 100:.2f}%). Levels lost: {self.stats.to_dict()['level_lost_counts']}")
+
+    def _run_reviews(self, reviews: list[tuple[Agent, list[str]]]):
+        """Lets every agent review its history, in parallel when `review_workers` > 1.
+
+        Each agent only updates its own notes, so the outcome does not depend on the
+        order reviews finish in. Errors are raised in agent order.
+        """
+        if self.review_workers <= 1:
+            for agent, history in reviews:
+                agent.review_game(history)
+            return
+
+        def review(agent: Agent, history: list[str]):
+            # Phases are tracked per thread, so the pool's threads enter their own.
+            with phase("review"):
+                agent.review_game(history)
+
+        with ThreadPoolExecutor(max_workers=self.review_workers, thread_name_prefix="review") as executor:
+            futures = [executor.submit(review, agent, history) for agent, history in reviews]
+            for future in futures:
+                future.result()
+
+    def _log_loss(self, game: Game, game_number: int):
+        """Logs how far a lost game got."""
+        level_lost = game.level_lost
+        cards_played = game.cards_played_on_loss
+        total_cards = game.total_cards_on_loss
+        percent_played = (cards_played / total_cards) * 100 if total_cards > 0 else 0
+        logging.info(f"Game {game_number}: Lost on level {level_lost}, "
+                     f"cards played: {cards_played}/{total_cards} ({percent_played:.2f}%)")
+
+    def save_summary(self):
+        """Saves the team's aggregate statistics to `summary.json` in the results directory."""
+        summary = self.stats.to_dict()
+        if self.stopping_rule is not None:
+            summary["early_stopping"] = self.stopping_rule.to_dict()
+            summary["games_saved"] = self.num_games - self.stats.games_played
+        self._write_json(os.path.join(self.results_dir, "summary.json"), summary)
 
     def save_game_results(self, game: Game, game_number: int):
-        """Saves the results of a single game to disk."""
+        """Saves the results of a single game to disk, through the background writer while games are playing."""
         game_dir = os.path.join(self.results_dir, str(game_number))
-        os.makedirs(game_dir, exist_ok=True)
-
         for level in game.levels:
             level_data = []
             for turn in level.turns:
@@ -71,11 +262,21 @@ class Team:
                 level_data.append(turn_data)
 
             level_file_path = os.path.join(game_dir, f"{level.level_number}.json")
-            with open(level_file_path, 'w') as f:
-                json.dump(level_data, f, indent=4)
+            self._write_json(level_file_path, level_data)
+
+    def _write_json(self, path: str, data):
+        """Queues data for the background writer if one is running, otherwise writes it now."""
+        if self._writer is not None:
+            self._writer.write(path, data)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
 
     def get_game_history(self, game_number: int) -> dict:
         """Retrieves the history of a single game from disk."""
+        if self._writer is not None:
+            self._writer.flush()
         game_dir = os.path.join(self.results_dir, str(game_number))
         game_history = {}
         for level_file in os.listdir(game_dir):
@@ -93,6 +294,8 @@ class Team:
             "Seconds waited": turn.recommended_actions[turn.player_who_played].time_to_wait,
             "Correct decision": turn.correct_decision,
         }
+        if turn.played_at is not None:
+            turn_data["Played at"] = turn.played_at
 
         for player_name, hand in turn.player_hands.items():
             turn_data[f"{player_name}-hand"] = sorted(hand)
@@ -106,5 +309,36 @@ class Team:
             else:
                 turn_data[f"{player_name}-lowest-card"] = None
                 turn_data[f"{player_name}-seconds"] = None
+            if turn.risks is not None and player_name in turn.risks:
+                turn_data[f"{player_name}-risk"] = turn.risks[player_name]
+            action = turn.recommended_actions.get(player_name)
+            if action is not None and action.details is not None:
+                turn_data[f"{player_name}-decision"] = action.details
 
         return turn_data
+
+    @staticmethod
+    def parse_turn_data(turn_data: dict) -> tuple[dict[str, list[int]], list["RecordedDecision"]]:
+        """Reads a turn saved by `_format_turn_data` back into hands and decisions.
+
+        Returns:
+            Every player's hand at the start of the turn, in seating order, and the
+            decisions of the players who held cards and recorded a wait.
+        """
+        hands = {key[:-5]: hand for key, hand in turn_data.items() if key.endswith("-hand")}
+        total_cards = sum(len(hand) for hand in hands.values())
+        decisions = []
+        for player_name, hand in hands.items():
+            seconds = turn_data.get(f"{player_name}-seconds")
+            if not hand or seconds is None:
+                continue
+            decisions.append(RecordedDecision(
+                player=player_name,
+                hand=tuple(hand),
+                last_played_card=turn_data["Previous-card"],
+                num_other_cards=total_cards - len(hand),
+                seconds=seconds,
+                played=turn_data["Acting-player"] == player_name,
+                correct=turn_data["Correct decision"],
+            ))
+        return hands, decisions
@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Any
+
+from ..profiling import phase
+
+
+class ResultsWriter:
+    """Writes JSON result files on a background thread.
+
+    `write` hands a file to the writer thread through a bounded queue and returns
+    immediately, so the game loop does not wait for disk I/O. When `max_pending`
+    files are already queued, `write` blocks until the writer catches up, which
+    keeps memory bounded if the disk is slower than the games.
+
+    The first error the writer hits is raised from the next `write`, `flush` or
+    `close`; files queued after an error are dropped.
+    """
+
+    def __init__(self, max_pending: int = 64):
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1.")
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: Exception | None = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="results-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, path: str, data: Any):
+        """Queues `data` to be written to `path` as indented JSON, creating its directory."""
+        if self._closed:
+            raise RuntimeError("The results writer is closed.")
+        self._raise_error()
+        self._queue.put((path, data))
+
+    def flush(self):
+        """Blocks until every queued file has been written."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Writes every queued file, then stops the writer thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        # Still flush what was queued, but do not hide the original exception.
+        try:
+            self.close()
+        except Exception as e:
+            logging.error(f"Results writer failed while shutting down: {e}")
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:
+                    path, data = item
+                    with phase("persist"):
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        with open(path, 'w') as f:
+                            json.dump(data, f, indent=4)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,7 @@
+from .risk import lower_card_risk, lower_card_risks, load_decisions, score_decisions
+from .paired import game_outcomes, paired_difference, compare_teams
+
+__all__ = [
+    "lower_card_risk", "lower_card_risks", "load_decisions", "score_decisions",
+    "game_outcomes", "paired_difference", "compare_teams",
+]
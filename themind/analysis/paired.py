@@ -0,0 +1,98 @@
+"""Paired comparisons of two teams that played the same deals.
+
+When two agent configurations play the same deal library, each game is a matched
+pair. The per-game differences cancel the luck of the deal, so their standard
+error is usually far smaller than that of the difference between two
+independent means.
+"""
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+
+
+def game_outcomes(team_dir: str) -> dict[int, dict]:
+    """Summarizes every saved game in a team's results directory.
+
+    Returns:
+        For each game number: `won`, and `levels_cleared`, the number of levels played
+        through without a mistake.
+    """
+    outcomes = {}
+    for game_name in os.listdir(team_dir):
+        game_dir = os.path.join(team_dir, game_name)
+        if not (game_name.isdigit() and os.path.isdir(game_dir)):
+            continue
+        levels = {}
+        for file_name in os.listdir(game_dir):
+            if file_name.endswith(".json") and file_name[:-5].isdigit():
+                with open(os.path.join(game_dir, file_name), 'r') as f:
+                    levels[int(file_name[:-5])] = json.load(f)
+        cleared = [bool(turns) and all(turn["Correct decision"] for turn in turns) for _, turns in sorted(levels.items())]
+        outcomes[int(game_name)] = {
+            "won": bool(cleared) and all(cleared),
+            "levels_cleared": sum(cleared),
+        }
+    return outcomes
+
+
+def paired_difference(a: np.ndarray, b: np.ndarray, z: float = 1.96) -> dict:
+    """Compares two matched samples.
+
+    Args:
+        a: The metric for each game of the first team.
+        b: The metric for the same games played by the second team.
+        z: The normal quantile for the confidence interval (1.96 for 95%).
+
+    Returns:
+        The mean difference (a - b), its paired standard error and confidence interval,
+        the standard error an unpaired comparison would have had, and the variance
+        reduction factor between the two.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    n = len(a)
+    if n < 2:
+        raise ValueError("A paired comparison needs at least two games.")
+    diffs = a - b
+    mean = float(diffs.mean())
+    paired_se = float(diffs.std(ddof=1) / math.sqrt(n))
+    unpaired_se = float(math.sqrt((a.var(ddof=1) + b.var(ddof=1)) / n))
+    return {
+        "games": n,
+        "mean_a": float(a.mean()),
+        "mean_b": float(b.mean()),
+        "mean_difference": mean,
+        "paired_standard_error": paired_se,
+        "confidence_interval": [mean - z * paired_se, mean + z * paired_se],
+        "unpaired_standard_error": unpaired_se,
+        "variance_reduction": (unpaired_se / paired_se) ** 2 if paired_se > 0 else None,
+    }
+
+
+def compare_teams(team_dir_a: str, team_dir_b: str) -> dict[str, dict]:
+    """Runs paired comparisons of win rate and levels cleared over the games both teams played."""
+    outcomes_a = game_outcomes(team_dir_a)
+    outcomes_b = game_outcomes(team_dir_b)
+    games = sorted(set(outcomes_a) & set(outcomes_b))
+    return {
+        metric: paired_difference(
+            [outcomes_a[game][metric] for game in games],
+            [outcomes_b[game][metric] for game in games],
+        )
+        for metric in ("won", "levels_cleared")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two teams that played the same deal library.")
+    parser.add_argument("team_dir_a", help="Results directory of the first team.")
+    parser.add_argument("team_dir_b", help="Results directory of the second team.")
+    args = parser.parse_args()
+    print(json.dumps(compare_teams(args.team_dir_a, args.team_dir_b), indent=4))
+
+
+if __name__ == "__main__":
+    main()
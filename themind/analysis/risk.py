@@ -0,0 +1,155 @@
+"""Post-hoc risk scoring of the waits agents chose.
+
+The risk of a decision is the probability that another player holds a card
+between `last_played_card` and the agent's lowest card. While a level is still
+going, every card held by another player is higher than the last card played,
+so the other players' `num_other_cards` cards are a uniform sample of the
+unseen cards above it. The risk is therefore hypergeometric:
+
+    risk = 1 - C(N - K, m) / C(N, m)
+
+where N is the number of unseen cards above `last_played_card`, K the number of
+them below the agent's lowest card, and m = `num_other_cards`.
+"""
+import argparse
+import json
+import math
+
+import numpy as np
+
+
+def lower_card_risk(last_played_card: int, hand: list[int], num_other_cards: int, deck_size: int = 100) -> float:
+    """Returns the probability that another player holds a card below this hand's lowest card.
+
+    Args:
+        last_played_card: The last card played on the pile.
+        hand: The agent's current hand.
+        num_other_cards: The total number of cards in other players' hands.
+        deck_size: The number of cards in the deck.
+    """
+    unseen = deck_size - last_played_card - len(hand)
+    below = min(hand) - last_played_card - 1
+    if num_other_cards <= 0 or below <= 0:
+        return 0.0
+    if unseen - below < num_other_cards:
+        return 1.0
+    log_safe = _log_comb(unseen - below, num_other_cards) - _log_comb(unseen, num_other_cards)
+    return 1.0 - math.exp(log_safe)
+
+
+def _log_comb(n: int, k: int) -> float:
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def log_factorials(n: int) -> np.ndarray:
+    """Returns log(k!) for k = 0..n."""
+    return np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, n + 1)))))
+
+
+def lower_card_risks(
+    last_played_cards: np.ndarray,
+    lowest_cards: np.ndarray,
+    hand_sizes: np.ndarray,
+    num_other_cards: np.ndarray,
+    deck_size: int = 100,
+) -> np.ndarray:
+    """Vectorized `lower_card_risk` over arrays of decisions."""
+    last_played_cards = np.asarray(last_played_cards, dtype=np.int64)
+    num_other_cards = np.asarray(num_other_cards, dtype=np.int64)
+    unseen = deck_size - last_played_cards - np.asarray(hand_sizes, dtype=np.int64)
+    below = np.clip(np.asarray(lowest_cards, dtype=np.int64) - last_played_cards - 1, 0, None)
+    safe_pool = unseen - below
+
+    feasible = (safe_pool >= num_other_cards) & (num_other_cards >= 0)
+    log_fact = log_factorials(deck_size)
+    n_safe = np.where(feasible, safe_pool, 0)
+    n_all = np.clip(unseen, 0, None)
+    m = np.where(feasible, num_other_cards, 0)
+    log_safe = (
+        log_fact[n_safe] - log_fact[n_safe - m]
+        - log_fact[n_all] + log_fact[np.clip(n_all - m, 0, None)]
+    )
+    risks = np.where(feasible, -np.expm1(log_safe), 1.0)
+    return np.where((below == 0) | (num_other_cards <= 0), 0.0, risks)
+
+
+def load_decisions(results_dir: str) -> dict[str, np.ndarray]:
+    """Loads every player decision in a results directory into columnar arrays.
+
+    Args:
+        results_dir: A directory containing level files written by `Team.save_game_results`,
+            at any depth.
+
+    Returns:
+        A dictionary of equal-length arrays: `player`, `last_played_card`, `lowest_card`,
+        `hand_size`, `num_other_cards`, `seconds`, `played` (the player acted on the turn)
+        and `mistake` (the player acted and the play was wrong).
+    """
+    # Imported here because the game imports this module for its risk oracle.
+    from ..agents.team import Team, iter_saved_levels
+
+    columns = {name: [] for name in (
+        "player", "last_played_card", "lowest_card", "hand_size", "num_other_cards", "seconds", "played", "mistake"
+    )}
+    for _, _, turns in iter_saved_levels(results_dir):
+        for turn in turns:
+            for decision in Team.parse_turn_data(turn)[1]:
+                columns["player"].append(decision.player)
+                columns["last_played_card"].append(decision.last_played_card)
+                columns["lowest_card"].append(min(decision.hand))
+                columns["hand_size"].append(len(decision.hand))
+                columns["num_other_cards"].append(decision.num_other_cards)
+                columns["seconds"].append(decision.seconds)
+                columns["played"].append(decision.played)
+                columns["mistake"].append(decision.mistake)
+    return {name: np.array(values) for name, values in columns.items()}
+
+
+def score_decisions(decisions: dict[str, np.ndarray], deck_size: int = 100) -> dict[str, dict]:
+    """Scores each player's waits against the risk of the states they were in.
+
+    Returns:
+        Per player: the number of decisions and plays, the mean risk of all decisions and of
+        the plays actually made, the number of mistakes, the Brier score of the risk as a
+        forecast of a mistake on the plays made, and the correlation between risk and the
+        chosen wait (a well-calibrated agent waits longer when the risk is higher).
+    """
+    risks = lower_card_risks(
+        decisions["last_played_card"], decisions["lowest_card"], decisions["hand_size"],
+        decisions["num_other_cards"], deck_size,
+    )
+    scores = {}
+    for player_name in np.unique(decisions["player"]):
+        mask = decisions["player"] == player_name
+        player_risks = risks[mask]
+        seconds = decisions["seconds"][mask].astype(float)
+        played = decisions["played"][mask].astype(bool)
+        mistakes = decisions["mistake"][mask].astype(float)
+        correlation = None
+        if len(seconds) > 1 and seconds.std() > 0 and player_risks.std() > 0:
+            correlation = float(np.corrcoef(player_risks, seconds)[0, 1])
+        scores[str(player_name)] = {
+            "decisions": int(mask.sum()),
+            "plays": int(played.sum()),
+            "mean_risk": float(player_risks.mean()),
+            "mean_play_risk": float(player_risks[played].mean()) if played.any() else None,
+            "mistakes": int(mistakes.sum()),
+            "brier_score": float(((player_risks[played] - mistakes[played]) ** 2).mean()) if played.any() else None,
+            "risk_wait_correlation": correlation,
+        }
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score agents' waits against the risk of each decision.")
+    parser.add_argument("results_dirs", nargs="+", help="Results directories to analyze.")
+    parser.add_argument("--deck-size", type=int, default=100, help="Number of cards in the deck.")
+    args = parser.parse_args()
+
+    loaded = [load_decisions(results_dir) for results_dir in args.results_dirs]
+    decisions = {name: np.concatenate([d[name] for d in loaded]) for name in loaded[0]}
+    print(json.dumps(score_decisions(decisions, args.deck_size), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
-from .game import Game
+from .game import Game, GameRules
+from .deals import DealLibrary
+from .replay import ReplayGame, Recording, load_recording
 
-__all__ = ["Game"]
+__all__ = ["Game", "GameRules", "DealLibrary", "ReplayGame", "Recording", "load_recording"]
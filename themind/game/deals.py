@@ -0,0 +1,154 @@
+"""Precomputed deal libraries for common-random-numbers comparisons.
+
+Comparing two agent configurations on different random deals adds the variance
+of the deals to the difference between them. A deal library stores a seeded,
+shuffled deck prefix for every (game, level), so every configuration that uses
+the same library plays exactly the same hands and results can be compared game
+by game.
+"""
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+
+from .game import GameRules
+
+
+class DealLibrary:
+    """A memory-mapped library of seeded deals, indexed by (game, level).
+
+    Each entry is the first `cards_per_deal` cards of a shuffled deck. Players are
+    dealt consecutive slices of it, so one library serves any player count whose
+    hands fit in `cards_per_deal`.
+    """
+
+    def __init__(self, path: str):
+        """Opens a library written by `DealLibrary.build`."""
+        with open(path + ".json", 'r') as f:
+            metadata = json.load(f)
+        self.path = path
+        self.seed: int = metadata["seed"]
+        self.deck_size: int = metadata["deck_size"]
+        self.cards = np.load(path, mmap_mode="r")
+        self.num_games, self.num_levels, self.cards_per_deal = self.cards.shape
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        num_games: int,
+        rules: GameRules | None = None,
+        seed: int = 0,
+        max_players: int = 8,
+    ) -> "DealLibrary":
+        """Generates a library and writes it to `path` (plus a `.json` metadata file).
+
+        Deals depend only on the seed and the (game, level) index, so libraries built
+        with the same seed agree on every game they have in common.
+
+        Args:
+            path: Where to write the `.npy` array.
+            num_games: The number of games to generate deals for.
+            rules: The deck size and level schedule the deals are for.
+            seed: The random seed.
+            max_players: The largest table the library has to deal for.
+        """
+        rules = rules or GameRules()
+        largest_level = max(rules.cards_for_level(level) for level in range(1, rules.num_levels + 1))
+        cards_per_deal = min(rules.deck_size, largest_level * max_players)
+        dtype = np.uint16 if rules.deck_size < 2**16 else np.uint32
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        cards = np.lib.format.open_memmap(
+            path, mode="w+", dtype=dtype, shape=(num_games, rules.num_levels, cards_per_deal)
+        )
+        for game_index in range(num_games):
+            rng = np.random.default_rng([seed, game_index])
+            for level_index in range(rules.num_levels):
+                cards[game_index, level_index] = rng.choice(rules.deck_size, cards_per_deal, replace=False) + 1
+        cards.flush()
+        del cards
+
+        with open(path + ".json", 'w') as f:
+            json.dump({"seed": seed, "deck_size": rules.deck_size}, f)
+        logging.info(f"Built deal library with {num_games} games at {path}")
+        return cls(path)
+
+    @classmethod
+    def open_or_build(
+        cls,
+        path: str,
+        num_games: int,
+        rules: GameRules | None = None,
+        seed: int = 0,
+        max_players: int = 8,
+    ) -> "DealLibrary":
+        """Opens the library at `path`, building it first if it does not exist.
+
+        An existing library is checked against the arguments, and a ValueError is
+        raised if it was built with another seed or rules, or holds too few games or
+        cards per deal. It is not rebuilt in place, as other configurations may be
+        comparing themselves on it.
+        """
+        if not (os.path.exists(path) and os.path.exists(path + ".json")):
+            return cls.build(path, num_games, rules, seed, max_players)
+
+        library = cls(path)
+        rules = rules or GameRules()
+        largest_level = max(rules.cards_for_level(level) for level in range(1, rules.num_levels + 1))
+        problems = []
+        if library.seed != seed:
+            problems.append(f"seed {library.seed}, not {seed}")
+        if library.deck_size != rules.deck_size:
+            problems.append(f"deck size {library.deck_size}, not {rules.deck_size}")
+        if library.num_levels != rules.num_levels:
+            problems.append(f"{library.num_levels} levels, not {rules.num_levels}")
+        if library.num_games < num_games:
+            problems.append(f"{library.num_games} games, fewer than {num_games}")
+        if library.cards_per_deal < min(rules.deck_size, largest_level * max_players):
+            problems.append(f"{library.cards_per_deal} cards per deal, too few for {max_players} players")
+        if problems:
+            raise ValueError(
+                f"Deal library {path} does not match the configuration: it has {'; '.join(problems)}. "
+                "Delete it to rebuild it, or point deal_library.path somewhere else."
+            )
+        return library
+
+    def deal(self, game_index: int, level_number: int, num_players: int, cards_per_player: int) -> list[list[int]]:
+        """Returns the hands for every seat on one level of one game."""
+        if game_index >= self.num_games or level_number > self.num_levels:
+            raise IndexError(
+                f"Deal library {self.path} has {self.num_games} games of {self.num_levels} levels; "
+                f"game {game_index + 1}, level {level_number} was requested."
+            )
+        if num_players * cards_per_player > self.cards_per_deal:
+            raise ValueError(
+                f"Deal library {self.path} holds {self.cards_per_deal} cards per deal, "
+                f"not enough for {num_players} players with {cards_per_player} cards each."
+            )
+        deck = self.cards[game_index, level_number - 1]
+        return [
+            [int(card) for card in deck[seat * cards_per_player:(seat + 1) * cards_per_player]]
+            for seat in range(num_players)
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a deal library for common-random-numbers comparisons.")
+    parser.add_argument("path", help="Path of the .npy file to write.")
+    parser.add_argument("--games", type=int, required=True, help="Number of games to generate.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--deck-size", type=int, default=100, help="Number of cards in the deck.")
+    parser.add_argument("--levels", type=int, default=12, help="Number of levels per game.")
+    parser.add_argument("--max-players", type=int, default=8, help="Largest table to deal for.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    rules = GameRules(deck_size=args.deck_size, num_levels=args.levels)
+    DealLibrary.build(args.path, args.games, rules, args.seed, args.max_players)
+
+
+if __name__ == "__main__":
+    main()
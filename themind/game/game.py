@@ -1,7 +1,15 @@
 import random
 import logging
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 from ..agents import Agent, AgentResponse
+from .realtime import VirtualClock, TimerQueue
+from .rollout import GameState
+from ..analysis.risk import lower_card_risk
+from ..profiling import phase
+
+if TYPE_CHECKING:
+    from .deals import DealLibrary
 
 
 @dataclass
@@ -15,6 +23,8 @@ class Turn:
     correct_decision: bool
     correct_card: int | None = None
     owner_of_correct_card: str | None = None
+    played_at: float | None = None
+    risks: dict[str, float] | None = None
 
 
 @dataclass
@@ -25,28 +35,112 @@ class Level:
     win: bool = False
 
 
-class Deck:
-    """Represents the deck of cards."""
+@dataclass
+class GameRules:
+    """Configurable rules for a game of The Mind."""
+    deck_size: int = 100
+    num_levels: int = 12
+    cards_per_level: list[int] | None = None  # Cards dealt to each player per level; defaults to the level number
+
+    def __post_init__(self):
+        if self.deck_size < 1 or self.num_levels < 1:
+            raise ValueError("Deck size and number of levels must be positive.")
+        if self.cards_per_level is not None:
+            if len(self.cards_per_level) != self.num_levels:
+                raise ValueError("cards_per_level must have one entry per level.")
+            if any(cards < 1 for cards in self.cards_per_level):
+                raise ValueError("Every level must deal at least one card per player.")
+
+    def cards_for_level(self, level_number: int) -> int:
+        """Returns the number of cards each player is dealt on a level."""
+        if self.cards_per_level is None:
+            return level_number
+        return self.cards_per_level[level_number - 1]
 
-    def __init__(self):
-        self.cards = list(range(1, 101))
-        self.shuffle()
+
+class Deck:
+    """Represents the deck of cards.
+
+    Cards are drawn lazily, so dealing a few hands costs the same for a deck of
+    100 cards as for a deck of a million. The full shuffled deck is only built
+    when `cards` is accessed or when most of the deck is being dealt.
+    """
+
+    def __init__(self, size: int = 100, rng: random.Random | None = None):
+        self.size = size
+        self.rng = rng or random  # The module functions draw from the global generator
+        self._cards: list[int] | None = None
+        self._dealt: set[int] = set()
+
+    @property
+    def cards(self) -> list[int]:
+        """The undealt cards, in the order they will be dealt from the end."""
+        if self._cards is None:
+            self._cards = [card for card in range(1, self.size + 1) if card not in self._dealt]
+            self.rng.shuffle(self._cards)
+        return self._cards
 
     def shuffle(self):
         """Shuffles the deck."""
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
 
     def deal(self, num_cards: int) -> list[int]:
         """Deals a hand of cards."""
-        return [self.cards.pop() for _ in range(num_cards)]
+        if self._cards is not None or 2 * (len(self._dealt) + num_cards) > self.size:
+            return [self.cards.pop() for _ in range(num_cards)]
+
+        hand = []
+        while len(hand) < num_cards:
+            card = self.rng.randint(1, self.size)
+            if card not in self._dealt:
+                self._dealt.add(card)
+                hand.append(card)
+        return hand
 
 
 class Game:
     """Manages the game of The Mind."""
 
-    def __init__(self, players: list[Agent]):
+    def __init__(
+        self,
+        players: list[Agent],
+        clock: VirtualClock | None = None,
+        rules: GameRules | None = None,
+        risk_oracle: bool = False,
+        deal_library: "DealLibrary | None" = None,
+        game_index: int = 0,
+        speculative: bool = False,
+        rng: random.Random | None = None,
+    ):
+        """Initializes the game.
+
+        Args:
+            players: The agents taking part in the game.
+            clock: A virtual clock for real-time play. When given, agents' waits
+                run concurrently as timers instead of being compared turn by turn.
+            rules: The deck size and level schedule. Defaults to the standard game.
+            risk_oracle: If True, every turn records the risk each player with cards was
+                taking: the probability that someone else held a lower card.
+            deal_library: A library of precomputed deals. When given, hands are dealt
+                from it instead of from a freshly shuffled deck.
+            game_index: Which of the library's games this game plays.
+            speculative: If True, while a turn's decisions are collected, every player
+                who has decided is told through `Agent.prefetch` the state it will see
+                next if the fastest decision so far is the one played. Slow agents start
+                on their next decision while later seats are still deciding this turn.
+            rng: The generator fresh decks are shuffled with. Defaults to the global one.
+        """
         self.players = players
-        self.deck = Deck()
+        self.clock = clock
+        self.rules = rules or GameRules()
+        self.risk_oracle = risk_oracle
+        self.deal_library = deal_library
+        self.game_index = game_index
+        self.speculative = speculative
+        self.rng = rng
+        if deal_library is not None and deal_library.deck_size != self.rules.deck_size:
+            raise ValueError("The deal library was built for a different deck size.")
+        self.deck = Deck(self.rules.deck_size, self.rng)
         self.levels: list[Level] = []
         self.current_level_number = 1
         self.game_over = False
@@ -55,6 +149,17 @@ class Game:
         self.cards_played_on_loss = None
         self.total_cards_on_loss = None
 
+    def snapshot(self) -> GameState:
+        """Returns an immutable snapshot of the current level, for lookahead and rollouts."""
+        level = self.levels[-1] if self.levels else None
+        last_played_card = level.turns[-1].played_card if level and level.turns else 0
+        return GameState(
+            tuple(tuple(sorted(player.hand)) for player in self.players),
+            last_played_card,
+            self.current_level_number,
+            self.level_lost is not None,
+        )
+
     def play(self):
         """Starts and runs the game until it's over."""
         while not self.game_over:
@@ -64,94 +169,225 @@ class Game:
         """Plays a single level of the game."""
         level = Level(level_number=self.current_level_number)
         self.levels.append(level)
-        self.deck = Deck()
+        self.deck = Deck(self.rules.deck_size, self.rng)
 
-        cards_to_deal = self.current_level_number * len(self.players)
-        if cards_to_deal > 100: # A new deck has 100 cards
+        cards_per_player = self.rules.cards_for_level(self.current_level_number)
+        if cards_per_player * len(self.players) > self.rules.deck_size:
             logging.info(f"Game Over! Not enough cards in a new deck to deal for level {self.current_level_number}.")
+            # The team cannot play this level, so it counts as lost before any card was played.
+            level.win = False
+            self.game_over = True
+            self._win = False
+            self.level_lost = self.current_level_number
+            self.cards_played_on_loss = 0
+            self.total_cards_on_loss = 0
+            return
+
+        with phase("deal"):
+            self._deal_level(cards_per_player)
+
+        if self.clock is None:
+            self._play_turns(level)
+        else:
+            self._play_turns_real_time(level)
+
+        if self.game_over:
+            return
+
+        level.win = True
+        if self.current_level_number == self.rules.num_levels:
+            self._win = True
             self.game_over = True
+
+        self.current_level_number += 1
+
+    def _deal_level(self, cards_per_player: int):
+        """Deals every player a new hand for the current level."""
+        if self.deal_library is not None:
+            hands = self.deal_library.deal(
+                self.game_index, self.current_level_number, len(self.players), cards_per_player
+            )
+            for player, hand in zip(self.players, hands):
+                player.receive_hand(hand)
             return
 
         for player in self.players:
-            hand = self.deck.deal(self.current_level_number)
+            hand = self.deck.deal(cards_per_player)
             player.receive_hand(hand)
 
+    def _play_turns(self, level: Level):
+        """Plays the turns of a level, letting the agent with the shortest wait act each turn."""
         last_played_card = 0
-        cards_in_play = self.current_level_number * len(self.players)
+        cards_in_play = self._cards_dealt()
+        players_by_name = {p.name: p for p in self.players}
 
         while cards_in_play > 0:
             recommended_actions: dict[str, AgentResponse] = {}
+            candidate_name = None
             for player in self.players:
                 if player.hand:
-                    num_other_cards = sum(len(p.hand) for p in self.players if p != player)
-                    recommended_actions[player.name] = player.decide_move(
-                        last_played_card, num_other_cards
-                    )
+                    num_other_cards = cards_in_play - len(player.hand)
+                    with phase("decide"):
+                        action = player.decide_move(last_played_card, num_other_cards)
+                    recommended_actions[player.name] = action
+                    hinted = [player]
+                    if candidate_name is None or action.time_to_wait < recommended_actions[candidate_name].time_to_wait:
+                        # The predicted play changed, so everyone who has decided needs a new hint.
+                        candidate_name = player.name
+                        hinted = [p for p in self.players if p.name in recommended_actions]
+                    if self.speculative:
+                        self._hint_next_state(players_by_name[candidate_name], hinted, recommended_actions, cards_in_play)
 
             if not recommended_actions:
                 break
 
-            player_who_played_name = min(
-                recommended_actions,
-                key=lambda p: recommended_actions[p].time_to_wait
-            )
-
-            action = recommended_actions[player_who_played_name]
-            played_card = action.card_to_play
+            player_who_played_name = candidate_name
+            player_who_played = players_by_name[player_who_played_name]
 
-            player_who_played = next(
-                p for p in self.players if p.name == player_who_played_name
-            )
+            with phase("resolve"):
+                correct = self._resolve_play(level, last_played_card, recommended_actions, player_who_played)
+            if not correct:
+                return
 
-            all_remaining_cards = []
-            for p in self.players:
-                all_remaining_cards.extend(p.hand)
+            last_played_card = recommended_actions[player_who_played_name].card_to_play
+            cards_in_play -= 1
 
-            correct_decision = played_card == min(all_remaining_cards)
+    def _hint_next_state(
+        self, candidate: Agent, players: list[Agent], recommended_actions: dict[str, AgentResponse], cards_in_play: int
+    ):
+        """Tells `players` what they will see next if `candidate`'s play is correct.
+
+        Called after each decision of a turn, with the fastest decision so far as `candidate`:
+        the player who just decided is hinted, and when the candidate changes every player who
+        has decided is hinted again, replacing the query its previous hint started.
+        """
+        card = recommended_actions[candidate.name].card_to_play
+        for player in players:
+            hand = [c for c in player.hand if c != card] if player is candidate else player.hand.copy()
+            if hand:
+                player.prefetch(hand, card, cards_in_play - 1 - len(hand))
+
+    def _play_turns_real_time(self, level: Level):
+        """Plays the turns of a level on the virtual clock.
+
+        Each agent's wait runs as a timer from the moment it decided. When a card
+        is played, the player who played re-decides and every other agent is
+        notified through `Agent.on_card_played`, which may reschedule its timer.
+        """
+        timers = TimerQueue()
+        actions: dict[str, AgentResponse] = {}
+        last_played_card = 0
+        cards_in_play = self._cards_dealt()
+
+        for index, player in enumerate(self.players):
+            if player.hand:
+                with phase("decide"):
+                    actions[player.name] = player.decide_move(last_played_card, cards_in_play - len(player.hand))
+                timers.schedule(index, self.clock.now + actions[player.name].time_to_wait)
+
+        while timers:
+            played_at, index = timers.pop()
+            self.clock.advance_to(played_at)
+            player_who_played = self.players[index]
+
+            with phase("resolve"):
+                correct = self._resolve_play(level, last_played_card, dict(actions), player_who_played, played_at)
+            if not correct:
+                return
 
-            turn = Turn(
-                last_played_card=last_played_card,
-                player_hands={p.name: p.hand.copy() for p in self.players},
-                recommended_actions=recommended_actions,
-                played_card=played_card,
-                player_who_played=player_who_played.name,
-                correct_decision=correct_decision,
-            )
-            level.turns.append(turn)
-
-            if not correct_decision:
-                correct_card = min(all_remaining_cards)
-                owner_of_correct_card = "unknown"
-                for p in self.players:
-                    if correct_card in p.hand:
-                        owner_of_correct_card = p.name
-                        break
-                
-                turn.correct_card = correct_card
-                turn.owner_of_correct_card = owner_of_correct_card
-                level.win = False
+            last_played_card = actions[player_who_played.name].card_to_play
+            cards_in_play -= 1
 
-                logging.info(
-                    f"Game Over! Card {played_card} was played by {player_who_played.name}, "
-                    f"but {owner_of_correct_card} had a lower card ({correct_card})."
+            for index, player in enumerate(self.players):
+                if not player.hand:
+                    actions.pop(player.name, None)
+                    timers.cancel(index)
+                    continue
+
+                num_other_cards = cards_in_play - len(player.hand)
+                with phase("decide"):
+                    if player is player_who_played:
+                        response = player.decide_move(last_played_card, num_other_cards)
+                    else:
+                        response = player.on_card_played(
+                            player_who_played.name, last_played_card, num_other_cards
+                        )
+
+                if response is not None:
+                    actions[player.name] = response
+                    timers.schedule(index, self.clock.now + response.time_to_wait)
+
+    def _resolve_play(
+        self,
+        level: Level,
+        last_played_card: int,
+        recommended_actions: dict[str, AgentResponse],
+        player_who_played: Agent,
+        played_at: float | None = None,
+    ) -> bool:
+        """Records a play on the level and removes the card from the player's hand.
+
+        Returns:
+            True if the play was correct, False if it ended the game.
+        """
+        played_card = recommended_actions[player_who_played.name].card_to_play
+
+        all_remaining_cards = []
+        for p in self.players:
+            all_remaining_cards.extend(p.hand)
+
+        correct_decision = played_card == min(all_remaining_cards)
+
+        risks = None
+        if self.risk_oracle:
+            risks = {
+                p.name: lower_card_risk(
+                    last_played_card, p.hand, len(all_remaining_cards) - len(p.hand), self.rules.deck_size
                 )
-                self.game_over = True
-                self._win = False
-                self.level_lost = self.current_level_number
-                self.cards_played_on_loss = self.current_level_number * len(self.players) - len(all_remaining_cards)
-                self.total_cards_on_loss = self.current_level_number * len(self.players)
-                return
+                for p in self.players if p.hand
+            }
+
+        turn = Turn(
+            last_played_card=last_played_card,
+            player_hands={p.name: p.hand.copy() for p in self.players},
+            recommended_actions=recommended_actions,
+            played_card=played_card,
+            player_who_played=player_who_played.name,
+            correct_decision=correct_decision,
+            played_at=played_at,
+            risks=risks,
+        )
+        level.turns.append(turn)
+
+        if not correct_decision:
+            correct_card = min(all_remaining_cards)
+            owner_of_correct_card = "unknown"
+            for p in self.players:
+                if correct_card in p.hand:
+                    owner_of_correct_card = p.name
+                    break
 
-            last_played_card = played_card
-            player_who_played.hand.remove(played_card)
-            cards_in_play -= 1
+            turn.correct_card = correct_card
+            turn.owner_of_correct_card = owner_of_correct_card
+            level.win = False
 
-        level.win = True
-        if self.current_level_number == 12:
-            self._win = True
+            logging.info(
+                f"Game Over! Card {played_card} was played by {player_who_played.name}, "
+                f"but {owner_of_correct_card} had a lower card ({correct_card})."
+            )
             self.game_over = True
-
-        self.current_level_number += 1
+            self._win = False
+            self.level_lost = self.current_level_number
+            self.cards_played_on_loss = self._cards_dealt() - len(all_remaining_cards)
+            self.total_cards_on_loss = self._cards_dealt()
+            return False
+
+        player_who_played.hand.remove(played_card)
+        return True
+
+    def _cards_dealt(self) -> int:
+        """Returns the total number of cards dealt on the current level."""
+        return self.rules.cards_for_level(self.current_level_number) * len(self.players)
 
     def is_win(self) -> bool:
         """Returns True if the game was won, False otherwise."""
@@ -0,0 +1,68 @@
+import heapq
+import time
+
+
+class VirtualClock:
+    """A simulated clock that drives real-time play.
+
+    Virtual time is measured in the same seconds agents use for `time_to_wait`.
+    The clock can be slowed down to wall-clock pace or run as fast as possible.
+    """
+
+    def __init__(self, speedup: float | None = None):
+        """Initializes the clock.
+
+        Args:
+            speedup: How many virtual seconds pass per wall-clock second.
+                1.0 plays in real time, None runs as fast as possible.
+        """
+        if speedup is not None and speedup <= 0:
+            raise ValueError("Speedup must be positive.")
+        self.speedup = speedup
+        self.now = 0.0
+
+    def advance_to(self, timestamp: float):
+        """Moves the clock forward to `timestamp`, sleeping if the clock is paced."""
+        if timestamp <= self.now:
+            return
+        if self.speedup is not None:
+            time.sleep((timestamp - self.now) / self.speedup)
+        self.now = timestamp
+
+
+class TimerQueue:
+    """An event queue holding at most one pending timer per player.
+
+    Timers fire in order of their scheduled time; ties go to the lowest player
+    index, which matches the seating order used by the turn-based engine.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, int]] = []
+        self._versions: dict[int, int] = {}
+
+    def schedule(self, player_index: int, fire_at: float):
+        """Schedules (or reschedules) the timer for a player."""
+        version = self._versions.get(player_index, 0) + 1
+        self._versions[player_index] = version
+        heapq.heappush(self._heap, (fire_at, player_index, version))
+
+    def cancel(self, player_index: int):
+        """Cancels the pending timer for a player, if any."""
+        if player_index in self._versions:
+            self._versions[player_index] += 1
+
+    def pop(self) -> tuple[float, int]:
+        """Removes and returns the next live timer as (fire_at, player_index)."""
+        self._discard_stale()
+        fire_at, player_index, _ = heapq.heappop(self._heap)
+        self._versions[player_index] += 1
+        return fire_at, player_index
+
+    def __bool__(self) -> bool:
+        self._discard_stale()
+        return bool(self._heap)
+
+    def _discard_stale(self):
+        while self._heap and self._heap[0][2] != self._versions[self._heap[0][1]]:
+            heapq.heappop(self._heap)
@@ -0,0 +1,219 @@
+"""What-if replays of saved games.
+
+A replay re-deals the recorded hands and seats new agents in place of some of the
+recorded players. Every other player's decisions are served from the recording
+for as long as the state they see matches a recorded one, so a counterfactual
+game only calls live agents (such as LLMs) once it has diverged.
+"""
+import argparse
+import json
+import logging
+import sys
+from dataclasses import dataclass, field
+
+import yaml
+
+from ..agents import Agent, AgentResponse
+from .game import Game
+
+# (hand, last played card, cards held by others)
+Observation = tuple[tuple[int, ...], int, int]
+
+
+class ReplayDivergedError(RuntimeError):
+    """Raised when a recorded player faces a state that was never recorded and has no live agent."""
+
+    def __init__(self, player_name: str, hand: list[int], last_played_card: int):
+        super().__init__(
+            f"No recorded decision for '{player_name}' with hand {hand} after card {last_played_card}, "
+            "and no live agent to fall back on."
+        )
+        self.player_name = player_name
+        self.hand = hand
+        self.last_played_card = last_played_card
+
+
+@dataclass
+class Recording:
+    """The deals and per-player decisions of a saved game."""
+    player_names: list[str]
+    deals: dict[int, dict[str, list[int]]] = field(default_factory=dict)
+    decisions: dict[str, dict[Observation, int]] = field(default_factory=dict)
+
+
+def load_recording(game_dir: str) -> Recording:
+    """Loads a game saved by `Team.save_game_results`.
+
+    Args:
+        game_dir: The directory holding one level file per level of the game.
+
+    Raises:
+        ValueError: If `game_dir` holds more than one game, such as a team's results directory.
+    """
+    # Imported here because the agents package imports this one through the team.
+    from ..agents.team import Team, iter_saved_levels
+
+    player_names: list[str] = []
+    deals: dict[int, dict[str, list[int]]] = {}
+    decisions: dict[str, dict[Observation, int]] = {}
+
+    recorded_dir = None
+    for level_dir, level_number, turns in iter_saved_levels(game_dir):
+        if recorded_dir is not None and level_dir != recorded_dir:
+            raise ValueError(f"{game_dir} holds more than one game ({recorded_dir} and {level_dir}); "
+                             "pass a single game's directory, e.g. ./results/<team>/<game>.")
+        recorded_dir = level_dir
+        if not turns:
+            continue
+        for turn_index, turn in enumerate(turns):
+            hands, turn_decisions = Team.parse_turn_data(turn)
+            if turn_index == 0:
+                player_names = player_names or list(hands)
+                deals[level_number] = hands
+            for decision in turn_decisions:
+                observation = (decision.hand, decision.last_played_card, decision.num_other_cards)
+                decisions.setdefault(decision.player, {})[observation] = decision.seconds
+
+    return Recording(player_names=player_names, deals=deals, decisions=decisions)
+
+
+class RecordedAgent(Agent):
+    """Plays a recorded player's decisions, deferring to a live agent once the game diverges."""
+
+    def __init__(self, name: str, decisions: dict[Observation, int], live_agent: Agent | None = None):
+        """Initializes the RecordedAgent.
+
+        Args:
+            name: The name of the recorded player.
+            decisions: The recorded waits, keyed by the observation they were made in.
+            live_agent: The agent to ask once a state has no recorded decision.
+        """
+        super().__init__(name)
+        self.decisions = decisions
+        self.live_agent = live_agent
+        self.diverged = False
+        self.recorded_calls = 0
+        self.live_calls = 0
+
+    def decide_move(self, last_played_card: int, num_other_cards: int) -> AgentResponse:
+        if not self.diverged:
+            seconds = self.decisions.get((tuple(self.hand), last_played_card, num_other_cards))
+            if seconds is not None:
+                self.recorded_calls += 1
+                return AgentResponse(card_to_play=min(self.hand), time_to_wait=seconds)
+            self.diverged = True
+            logging.info(f"Replay of '{self.name}' diverged from the recording at card {last_played_card}.")
+
+        if self.live_agent is None:
+            raise ReplayDivergedError(self.name, list(self.hand), last_played_card)
+        self.live_calls += 1
+        self.live_agent.hand = list(self.hand)
+        return self.live_agent.decide_move(last_played_card, num_other_cards)
+
+    def review_game(self, game_reviews: list[str]):
+        if self.live_agent is not None:
+            self.live_agent.review_game(game_reviews)
+
+
+class ReplayGame(Game):
+    """A game that re-deals the hands of a recording and serves recorded decisions."""
+
+    def __init__(
+        self,
+        recording: Recording,
+        substitutes: list[Agent],
+        live_agents: list[Agent] | None = None,
+        **game_options,
+    ):
+        """Initializes the replay.
+
+        Args:
+            recording: The recorded game to replay.
+            substitutes: New agents taking over recorded players with the same names.
+            live_agents: Agents to ask for the remaining players' decisions once the
+                replay leaves the recording, matched by name.
+            game_options: Extra keyword arguments for `Game`.
+        """
+        substitutes_by_name = {agent.name: agent for agent in substitutes}
+        live_by_name = {agent.name: agent for agent in live_agents or []}
+        unknown = set(substitutes_by_name) - set(recording.player_names)
+        if unknown:
+            raise ValueError(f"Substitutes are not players in the recording: {sorted(unknown)}")
+
+        players = [
+            substitutes_by_name.get(name)
+            or RecordedAgent(name, recording.decisions.get(name, {}), live_by_name.get(name))
+            for name in recording.player_names
+        ]
+        super().__init__(players, **game_options)
+        self.recording = recording
+
+    def _deal_level(self, cards_per_player: int):
+        """Deals the recorded hands while the recording has them, and fresh ones after."""
+        deal = self.recording.deals.get(self.current_level_number)
+        if deal is None:
+            super()._deal_level(cards_per_player)
+            return
+        for player in self.players:
+            player.receive_hand(deal[player.name])
+
+    @property
+    def recorded_calls(self) -> int:
+        """The number of decisions served from the recording."""
+        return sum(p.recorded_calls for p in self.players if isinstance(p, RecordedAgent))
+
+    @property
+    def live_calls(self) -> int:
+        """The number of decisions recorded players made live after diverging."""
+        return sum(p.live_calls for p in self.players if isinstance(p, RecordedAgent))
+
+
+def main():
+    # Imported here because the registry includes agents built on this package.
+    from ..agents.registry import build_agents
+
+    parser = argparse.ArgumentParser(description="Replay a saved game with some players substituted.")
+    parser.add_argument("game_dir", help="Directory of a saved game, e.g. ./results/<team>/<game>.")
+    parser.add_argument(
+        "--agent", action="append", required=True,
+        help='A substitute agent as JSON, e.g. \'{"type": "PerfectAgent", "name": "LLM Player 4"}\'.',
+    )
+    parser.add_argument(
+        "--live", action="append", default=[],
+        help="A live agent as JSON for a recorded player to fall back on once the replay diverges, "
+             "matched by name.",
+    )
+    parser.add_argument(
+        "--config",
+        help="A YAML config whose agents are used as live agents for the recorded players, matched by name. "
+             "Usually the config the game was played with.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    substitutes = build_agents([json.loads(agent_json) for agent_json in args.agent], at_table=False)
+    live_configs = []
+    if args.config:
+        with open(args.config, 'r') as f:
+            live_configs.extend(yaml.safe_load(f).get("agents", []))
+    live_configs.extend(json.loads(agent_json) for agent_json in args.live)
+    substituted = {agent.name for agent in substitutes}
+    live_agents = build_agents([conf for conf in live_configs if conf.get("name", conf.get("type")) not in substituted],
+                               at_table=False)
+
+    game = ReplayGame(load_recording(args.game_dir), substitutes, live_agents)
+    try:
+        game.play()
+    except ReplayDivergedError as e:
+        logging.error(f"Replay diverged on level {game.current_level_number}: '{e.player_name}' held {e.hand} "
+                      f"after card {e.last_played_card}, which the recording never saw. Pass --config or --live "
+                      f"to let recorded players continue live. Decisions served from the recording: "
+                      f"{game.recorded_calls}.")
+        sys.exit(1)
+    outcome = "won" if game.is_win() else f"lost on level {game.level_lost}"
+    logging.info(f"Replay {outcome}. Decisions served from the recording: {game.recorded_calls}, "
+                 f"made live: {game.live_calls}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Cheap snapshots of a level in progress and a vectorized engine for rolling levels out.
+
+A `GameState` is immutable, so copying one is free, and `play` returns a new
+state that shares every hand it did not touch. Rollouts themselves run on
+arrays: `simulate` plays thousands of copies of a level side by side with
+numpy, one turn per step, using the same turn rule as `Game._play_turns`.
+"""
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+EMPTY = np.iinfo(np.int64).max // 4  # Pads hands; never the lowest card and never played
+
+
+@dataclass(frozen=True, slots=True)
+class GameState:
+    """An immutable snapshot of a level in progress.
+
+    Attributes:
+        hands: Every player's hand, sorted, in seating order.
+        last_played_card: The card on top of the pile (0 before the first play).
+        level_number: The level being played.
+        lost: True once a card was played while someone held a lower one.
+    """
+    hands: tuple[tuple[int, ...], ...]
+    last_played_card: int = 0
+    level_number: int = 1
+    lost: bool = False
+
+    @property
+    def cards_in_play(self) -> int:
+        return sum(len(hand) for hand in self.hands)
+
+    @property
+    def cleared(self) -> bool:
+        return not self.lost and self.cards_in_play == 0
+
+    def play(self, player_index: int) -> "GameState":
+        """Returns the state after a player plays their lowest card. Other hands are shared, not copied."""
+        hand = self.hands[player_index]
+        if not hand:
+            raise ValueError(f"Player {player_index} has no cards to play.")
+        card = hand[0]
+        lost = self.lost or any(other and other[0] < card for other in self.hands)
+        hands = self.hands[:player_index] + (hand[1:],) + self.hands[player_index + 1:]
+        return GameState(hands, card, self.level_number, lost)
+
+    def to_array(self) -> np.ndarray:
+        """Returns the hands as a (players, max hand size) array padded with `EMPTY`."""
+        return stack_hands([self])[0]
+
+
+def stack_hands(states: Sequence[GameState]) -> np.ndarray:
+    """Stacks the hands of several states into a (states, players, max hand size) array padded with `EMPTY`."""
+    num_players = len(states[0].hands)
+    size = max(1, max(len(hand) for state in states for hand in state.hands))
+    hands = np.full((len(states), num_players, size), EMPTY, dtype=np.int64)
+    for i, state in enumerate(states):
+        for player, hand in enumerate(state.hands):
+            hands[i, player, :len(hand)] = hand
+    return hands
+
+
+def sample_without_replacement(n: int, k: int, size: int, rng: np.random.Generator) -> np.ndarray:
+    """Draws `size` independent samples of `k` distinct indices below `n`, in random order.
+
+    Runs Floyd's algorithm across all rows at once, drawing the complement instead
+    when `k` is more than half of `n`, so no row ever holds more than
+    min(k, n - k) draws and no (size, n) matrix is sorted.
+    """
+    m = min(k, n - k)
+    chosen = np.empty((size, m), dtype=np.int64)
+    for i, j in enumerate(range(n - m, n)):
+        draw = rng.integers(0, j + 1, size=size)
+        chosen[:, i] = np.where((chosen[:, :i] == draw[:, None]).any(axis=1), j, draw)
+    if m < k:
+        kept = np.ones((size, n), dtype=bool)
+        kept[np.arange(size)[:, None], chosen] = False
+        chosen = np.nonzero(kept)[1].reshape(size, k)
+    # Floyd's algorithm picks a uniform set but not a uniform order.
+    return rng.permuted(chosen, axis=1)
+
+
+def simulate(
+    hands: np.ndarray,
+    last_played_card: int | np.ndarray,
+    offsets: Sequence[int],
+    noise: int,
+    rng: np.random.Generator,
+    first_waits: np.ndarray | None = None,
+    first_waits_seat: int = 0,
+) -> np.ndarray:
+    """Plays many copies of a level to the end and reports which were cleared.
+
+    Every turn, each player with cards waits the gap to their lowest card plus
+    their offset and uniform integer noise in [-noise, noise]; the shortest wait
+    plays, ties going to the earlier seat, as in `Game._play_turns`.
+
+    Args:
+        hands: A (rollouts, players, max hand size) array of sorted hands padded with `EMPTY`.
+        last_played_card: The card on top of the pile, for all rollouts or per rollout.
+        offsets: Each player's wait offset.
+        noise: The bound of the uniform noise added to every wait.
+        rng: The random generator for the noise.
+        first_waits: If given, one player's wait on the first turn of each rollout,
+            replacing its modelled wait.
+        first_waits_seat: The player `first_waits` are for.
+
+    Returns:
+        A boolean array with True for every rollout that cleared the level.
+    """
+    num_rollouts, num_players, hand_size = hands.shape
+    rows = np.arange(num_rollouts)
+    positions = np.zeros((num_rollouts, num_players), dtype=np.int64)
+    last = np.broadcast_to(np.asarray(last_played_card, dtype=np.int64), (num_rollouts,)).copy()
+    offsets = np.asarray(offsets, dtype=np.int64)
+    cleared = np.ones(num_rollouts, dtype=bool)
+    remaining = (hands != EMPTY).sum(axis=(1, 2))
+
+    for step in range(int(remaining.max(initial=0))):
+        lowest = np.take_along_axis(hands, np.minimum(positions, hand_size - 1)[:, :, None], axis=2)[:, :, 0]
+        lowest = np.where(positions < hand_size, lowest, EMPTY)
+        waits = lowest - last[:, None] + offsets
+        if noise > 0:
+            waits += rng.integers(-noise, noise + 1, size=waits.shape)
+        if step == 0 and first_waits is not None:
+            waits[:, first_waits_seat] = first_waits
+        waits = np.where(lowest != EMPTY, waits, EMPTY)
+
+        player = waits.argmin(axis=1)
+        card = lowest[rows, player]
+        active = cleared & (remaining > step)
+        cleared &= ~(active & (card > lowest.min(axis=1)))
+        positions[rows, player] += active
+        last = np.where(active, card, last)
+    return cleared
+
+
+def rollout(
+    state: GameState,
+    num_rollouts: int,
+    offsets: Sequence[int],
+    noise: int,
+    rng: np.random.Generator | None = None,
+) -> float:
+    """Returns the fraction of `num_rollouts` rollouts of a fully known state that clear the level."""
+    if state.lost:
+        return 0.0
+    hands = state.to_array()
+    hands = np.broadcast_to(hands, (num_rollouts, *hands.shape))
+    rng = rng or np.random.default_rng()
+    return float(simulate(hands, state.last_played_card, offsets, noise, rng).mean())
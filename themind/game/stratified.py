@@ -0,0 +1,281 @@
+"""Stratified evaluation: estimating a team's win probability level by level.
+
+Every level is dealt from a fresh deck, so for agents that do not learn between
+games the levels are independent and
+
+    P(win) = p_1 * p_2 * ... * p_L
+
+where p_l is the probability of clearing level l. Sequential games spend most
+of their time on easy early levels and rarely reach the late ones. Playing
+each level on its own lets trials go where the uncertainty is. After a pilot
+round, trials are allocated to minimize the variance of log P(win) per card
+played. Level l gets trials in proportion to sqrt((1 - p_l) / (p_l * c_l)),
+where c_l is the number of cards dealt on the level.
+
+Run with:
+
+    uv run python -m themind.game.stratified config.yaml --trials 20000 --workers 8
+
+Reviews are skipped, so agents that update their notes between games are
+evaluated with the notes they start with.
+
+Every level trial deals from its own seeded generator, and agents that take a
+`seed` (RandomAgent, NoisyAgent, RolloutAgent) are given one drawn from it
+unless their config sets it, so a seed reproduces the whole evaluation. Agents
+without one, such as LLMAgents, are not reproducible.
+"""
+import argparse
+import inspect
+import itertools
+import json
+import logging
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from statistics import NormalDist
+
+import numpy as np
+import yaml
+
+from .game import Game, GameRules
+
+
+def seed_agent_configs(agent_configs: list[dict], rng: random.Random) -> list[dict]:
+    """Returns the configs with a seed drawn from `rng` for every agent that takes one and has none."""
+    # Imported here because the registry includes agents built on this package.
+    from ..agents import AGENT_REGISTRY
+
+    seeded = []
+    for agent_conf in agent_configs:
+        params = agent_conf.get("params", {})
+        agent_class = AGENT_REGISTRY.get(agent_conf.get("type"))
+        if agent_class is not None and "seed" in inspect.signature(agent_class).parameters and "seed" not in params:
+            agent_conf = dict(agent_conf, params=dict(params, seed=rng.getrandbits(32)))
+        seeded.append(agent_conf)
+    return seeded
+
+
+def play_level_trials(agent_configs: list[dict], rules: dict, level_number: int, num_trials: int, seed: int) -> int:
+    """Plays one level `num_trials` times from fresh deals and returns how many were cleared.
+
+    Runs in worker processes, so it takes plain configs rather than agents and rules.
+    """
+    # Imported here because the registry includes agents built on this package.
+    from ..agents.registry import build_agents
+
+    rng = random.Random(seed)
+    agents = build_agents(seed_agent_configs(agent_configs, rng), rules)
+    game_rules = GameRules(**rules)
+    cleared = 0
+    for _ in range(num_trials):
+        game = Game(agents, rules=game_rules, rng=rng)
+        game.current_level_number = level_number
+        game.play_level()
+        cleared += game.levels[-1].win
+    return cleared
+
+
+@dataclass
+class LevelEstimate:
+    """The trials played on one level and the estimated probability of clearing it."""
+    level: int
+    cards: int  # Cards dealt per trial
+    trials: int = 0
+    cleared: int = 0
+
+    @property
+    def rate(self) -> float:
+        return self.cleared / self.trials if self.trials else 0.0
+
+    @property
+    def smoothed_rate(self) -> float:
+        """The clear rate shrunk away from 0 and 1, so the variance of its log is finite and non-zero."""
+        return (self.cleared + 0.5) / (self.trials + 1)
+
+    @property
+    def log_variance(self) -> float:
+        """The delta-method variance of log(rate)."""
+        p = self.smoothed_rate
+        return (1 - p) / (p * max(self.trials, 1))
+
+
+@dataclass
+class StratifiedResult:
+    """A win probability assembled from independent per-level estimates."""
+    levels: list[LevelEstimate]
+    confidence: float = 0.95
+    cost: int = field(init=False)
+
+    def __post_init__(self):
+        self.cost = sum(level.trials * level.cards for level in self.levels)
+
+    @property
+    def win_probability(self) -> float:
+        return math.prod(level.rate for level in self.levels)
+
+    def interval(self) -> tuple[float, float]:
+        """Returns the confidence interval of the win probability, from the delta method on its log.
+
+        The interval is centred on the estimate, with the variance taken from the
+        smoothed rates so levels that were always cleared still widen it. If a
+        level was never cleared the estimate is 0, the interval starts at 0, and
+        that level's smoothed rate bounds it from above.
+        """
+        z = NormalDist().inv_cdf((1 + self.confidence) / 2)
+        se = math.sqrt(sum(level.log_variance for level in self.levels))
+        if self.win_probability == 0:
+            log_high = sum(math.log(level.rate or level.smoothed_rate) for level in self.levels) + z * se
+            return 0.0, min(1.0, math.exp(log_high))
+        log_p = math.log(self.win_probability)
+        return math.exp(log_p - z * se), min(1.0, math.exp(log_p + z * se))
+
+    def sequential_cost(self) -> float:
+        """Returns the cards sequential games would deal to estimate P(win) as precisely.
+
+        A sequential game only reaches level l if it cleared every level before it,
+        and the number of games needed follows from the binomial variance of the
+        win rate at the same standard error. Returns 0 when every level was always
+        cleared or one was never cleared, as the win rate of sequential games then
+        has no variance to match.
+        """
+        rates = [level.rate for level in self.levels]
+        p = math.prod(rates)
+        if not 0 < p < 1:
+            return 0.0
+        cards_per_game = sum(level.cards * math.prod(rates[:i]) for i, level in enumerate(self.levels))
+        variance = p * p * sum(level.log_variance for level in self.levels)
+        return cards_per_game * p * (1 - p) / variance
+
+    def to_dict(self) -> dict:
+        """Returns the result as a JSON-serializable dictionary."""
+        low, high = self.interval()
+        return {
+            "win_probability": self.win_probability,
+            "confidence_interval": [low, high],
+            "confidence": self.confidence,
+            "levels": [dict(asdict(level), rate=level.rate, smoothed_rate=level.smoothed_rate) for level in self.levels],
+            "cards_dealt": self.cost,
+            "sequential_cards_for_same_precision": self.sequential_cost(),
+        }
+
+
+def allocate(levels: list[LevelEstimate], num_trials: int) -> list[int]:
+    """Splits `num_trials` new trials across levels to minimize the variance of log P(win) per card.
+
+    Each level's target is a share of all trials so far proportional to
+    sqrt((1 - p_l) / (p_l * c_l)). New trials go to the levels furthest below
+    their target, and levels already past it get none.
+    """
+    weights = np.array([math.sqrt((1 - level.smoothed_rate) / level.smoothed_rate / level.cards) for level in levels])
+    done = np.array([level.trials for level in levels])
+    target = weights / weights.sum() * (done.sum() + num_trials)
+    shortfall = np.maximum(target - done, 0)
+    if shortfall.sum() == 0:
+        shortfall = weights
+    shares = shortfall / shortfall.sum() * num_trials
+    allocation = np.floor(shares).astype(int)
+    for index in np.argsort(shares - allocation)[::-1][:num_trials - allocation.sum()]:
+        allocation[index] += 1
+    return allocation.tolist()
+
+
+def evaluate(
+    agent_configs: list[dict],
+    rules: GameRules | None = None,
+    num_trials: int = 10_000,
+    pilot_trials: int = 100,
+    rounds: int = 4,
+    workers: int = 1,
+    confidence: float = 0.95,
+    ci_width: float | None = None,
+    seed: int = 0,
+) -> StratifiedResult:
+    """Estimates a team's win probability by playing every level independently.
+
+    Args:
+        agent_configs: The `agents` entries of a config.
+        rules: The rules of the game. Defaults to the standard game.
+        num_trials: The total number of level trials to play, pilot included.
+        pilot_trials: Trials per level in the pilot round.
+        rounds: How many allocation rounds follow the pilot.
+        workers: Worker processes; 1 plays every trial in this process.
+        confidence: The confidence level of the reported interval.
+        ci_width: If set, stop after a round once the interval is at most this wide.
+        seed: Seeds the deals and every agent that takes a seed; the same seed and
+            settings give the same result for such agents.
+
+    Returns:
+        The per-level estimates and the combined win probability.
+    """
+    rules = rules or GameRules()
+    num_players = len(agent_configs)
+    levels = [LevelEstimate(level, rules.cards_for_level(level) * num_players) for level in range(1, rules.num_levels + 1)]
+    pilot_trials = min(pilot_trials, num_trials // len(levels))
+    if pilot_trials < 1:
+        raise ValueError("num_trials must allow at least one pilot trial per level.")
+
+    rules_dict = asdict(rules)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    seeds = itertools.count(seed * 1_000_000)
+
+    def run(allocation: list[int]):
+        jobs = []
+        for level, trials in zip(levels, allocation):
+            # Split each level's trials so every worker gets a share.
+            chunks = [trials // workers + (i < trials % workers) for i in range(workers)] if executor else [trials]
+            for chunk in chunks:
+                if chunk:
+                    jobs.append((level, chunk, (agent_configs, rules_dict, level.level, chunk, next(seeds))))
+        if executor is None:
+            results = [play_level_trials(*job_args) for _, _, job_args in jobs]
+        else:
+            results = list(executor.map(play_level_trials, *zip(*(job_args for _, _, job_args in jobs))))
+        for (level, chunk, _), cleared in zip(jobs, results):
+            level.trials += chunk
+            level.cleared += cleared
+
+    try:
+        run([pilot_trials] * len(levels))
+        remaining = num_trials - pilot_trials * len(levels)
+        for round_index in range(rounds):
+            round_trials = remaining // (rounds - round_index)
+            if round_trials <= 0:
+                break
+            run(allocate(levels, round_trials))
+            remaining -= round_trials
+            result = StratifiedResult(levels, confidence)
+            low, high = result.interval()
+            logging.info(f"Round {round_index + 1}: P(win) = {result.win_probability:.4g} "
+                         f"[{low:.4g}, {high:.4g}] after {sum(level.trials for level in levels)} trials.")
+            if ci_width is not None and high - low <= ci_width:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return StratifiedResult(levels, confidence)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate a team's win probability level by level.")
+    parser.add_argument("config_file", help="A YAML config; its agents and rules are evaluated.")
+    parser.add_argument("--trials", type=int, default=10_000, help="Total level trials to play.")
+    parser.add_argument("--pilot", type=int, default=100, help="Trials per level in the pilot round.")
+    parser.add_argument("--rounds", type=int, default=4, help="Allocation rounds after the pilot.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes.")
+    parser.add_argument("--ci-width", type=float, default=None, help="Stop once the interval is this narrow.")
+    parser.add_argument("--seed", type=int, default=0, help="Seeds the deals.")
+    args = parser.parse_args()
+    # Games log every turn at INFO, which would swamp the report.
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    with open(args.config_file, 'r') as f:
+        config = yaml.safe_load(f)
+    rules = GameRules(**config["rules"]) if "rules" in config else None
+    result = evaluate(config.get("agents", []), rules, args.trials, args.pilot, args.rounds, args.workers,
+                      ci_width=args.ci_width, seed=args.seed)
+    print(json.dumps(result.to_dict(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
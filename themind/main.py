@@ -1,43 +1,132 @@
 import argparse
+import os
 import yaml
 import logging
-from .agents import AGENT_REGISTRY
+from concurrent.futures import ThreadPoolExecutor
+from .agents.llmclient import configure_shared_clients
+from .agents.registry import build_agents
 from .agents.team import Team
-from .game import Game
+from .agents.stopping import StoppingRule
+from .game import Game, GameRules
+from .game.realtime import VirtualClock
+from .game.deals import DealLibrary
+from .profiling import MODES as PROFILE_MODES, Profiler
 
-def main():
-    parser = argparse.ArgumentParser(description="Run The Mind game with a specified configuration.")
-    parser.add_argument("config_file", help="Path to the YAML configuration file.")
-    args = parser.parse_args()
 
-    with open(args.config_file, 'r') as f:
-        config = yaml.safe_load(f)
+def find_config_files(paths: list[str]) -> list[str]:
+    """Expands directories into the YAML files they contain."""
+    config_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            config_files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.endswith((".yaml", ".yml"))
+            )
+        else:
+            config_files.append(path)
+    return config_files
+
 
-    log_level_str = config.get("log_level", "INFO").upper()
-    log_level = getattr(logging, log_level_str, logging.INFO)
-    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+def load_config(config_file: str) -> dict:
+    """Reads a YAML configuration file."""
+    with open(config_file, 'r') as f:
+        return yaml.safe_load(f)
 
-    game_name = config.get("game_name", "The Mind Game")
+
+def build_team(config: dict) -> Team:
+    """Creates the agents and team described by a configuration."""
     agents_config = config.get("agents", [])
     num_games = config.get("num_games", 1)
     results_dir = config.get("results_dir", "./results")
 
-    agents = []
-    for agent_conf in agents_config:
-        agent_type = agent_conf.get("type")
-        agent_name = agent_conf.get("name", agent_type)
-        agent_params = agent_conf.get("params", {})
+    game_options = {}
+    if "rules" in config:
+        game_options["rules"] = GameRules(**config["rules"])
+    if config.get("risk_oracle"):
+        game_options["risk_oracle"] = True
+    if config.get("speculative"):
+        game_options["speculative"] = True
+    deal_library = config.get("deal_library")
+    if deal_library:
+        game_options["deal_library"] = DealLibrary.open_or_build(
+            deal_library["path"], num_games, game_options.get("rules"), deal_library.get("seed", 0),
+            max_players=len(agents_config),
+        )
+    real_time = config.get("real_time")
+    # An empty mapping still turns real-time play on, at the default speed.
+    if real_time is not None and real_time is not False:
+        speedup = real_time.get("speedup") if isinstance(real_time, dict) else None
+        game_options["clock"] = VirtualClock(speedup)
 
-        if agent_type in AGENT_REGISTRY:
-            agent_class = AGENT_REGISTRY[agent_type]
-            agents.append(agent_class(name=agent_name, **agent_params))
-        else:
-            logging.error(f"Unknown agent type: {agent_type}")
-            raise ValueError(f"Unknown agent type: {agent_type}")
+    return Team(
+        build_agents(agents_config, config.get("rules")),
+        num_games,
+        results_dir,
+        game_options=game_options,
+        stream=config.get("stream", False),
+        max_review_history=config.get("max_review_history"),
+        review_workers=config.get("review_workers", 1),
+        stopping_rule=StoppingRule(**config["early_stopping"]) if "early_stopping" in config else None,
+        writer_queue_size=config.get("writer_queue_size", 64),
+    )
+
+
+def run_teams(teams: list[Team], workers: int | None = None):
+    """Plays every team's games, running teams concurrently on a thread pool."""
+    if not teams:
+        raise ValueError("No teams to run.")
+    if len(teams) == 1:
+        teams[0].play_games()
+        return
+
+    with ThreadPoolExecutor(max_workers=workers or len(teams), thread_name_prefix="team") as executor:
+        futures = [executor.submit(team.play_games) for team in teams]
+        for future in futures:
+            future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run The Mind game with a specified configuration.")
+    parser.add_argument("config_file", nargs="+", help="Paths to YAML configuration files, or directories of them.")
+    parser.add_argument("--workers", type=int, default=None, help="How many teams to run at once (default: all).")
+    parser.add_argument("--rate-limit", type=float, default=None,
+                        help="LLM requests per second allowed across all teams and LLM agents.")
+    parser.add_argument("--cache-size", type=int, default=None,
+                        help="LLM replies to cache across all teams and LLM agents.")
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=None,
+                        help="Profile the run, with time attributed to the deal, decide, resolve, review and "
+                             "persist phases. 'cprofile' traces every call on the main thread; 'sample' samples "
+                             "every thread's stack with low overhead.")
+    parser.add_argument("--profile-output", default="profile",
+                        help="Path prefix for the profile files (default: ./profile).")
+    parser.add_argument("--profile-interval", type=float, default=0.005,
+                        help="Seconds between stack samples in 'sample' mode.")
+    args = parser.parse_args()
+
+    configs = [load_config(config_file) for config_file in find_config_files(args.config_file)]
+    if not configs:
+        parser.error(f"No YAML config files found in {', '.join(args.config_file)}.")
+
+    log_levels = [getattr(logging, config.get("log_level", "INFO").upper(), logging.INFO) for config in configs]
+    logging.basicConfig(level=min(log_levels), format='%(asctime)s - %(levelname)s - %(message)s')
+    configure_shared_clients(args.rate_limit, args.cache_size)
+
+    teams = []
+    for config in configs:
+        game_name = config.get("game_name", "The Mind Game")
+        logging.info(f"Starting game: {game_name}")
+        teams.append(build_team(config))
+
+    if args.profile:
+        with Profiler(args.profile, args.profile_output, args.profile_interval):
+            run_teams(teams, args.workers)
+    else:
+        run_teams(teams, args.workers)
 
-    logging.info(f"Starting game: {game_name}")
-    team = Team(agents, num_games, results_dir)
-    team.play_games()
+    if len(teams) > 1:
+        for config, team in zip(configs, teams):
+            logging.info(f"{config.get('game_name', 'The Mind Game')}: won {team.stats.wins}/{team.stats.games_played} "
+                         f"games. Results in {team.results_dir}")
 
 if __name__ == "__main__":
     main()
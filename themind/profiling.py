@@ -0,0 +1,175 @@
+"""Profiling for runs of the CLI, attributed to named phases of the game loop.
+
+Code marks what it is doing with `phase`:
+
+    with phase("decide"):
+        response = player.decide_move(last_played_card, num_other_cards)
+
+While a `Profiler` is running, the time spent in each phase is recorded per
+thread, and its output is written as collapsed stacks ("a;b;c <count>" lines)
+that flamegraph.pl, speedscope and inferno read directly. With no profiler
+running, `phase` does nothing.
+"""
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PHASES = ("deal", "decide", "resolve", "review", "persist")
+MODES = ("cprofile", "sample")
+
+_profiler: "Profiler | None" = None
+_thread_phases: dict[int, list[list]] = {}  # Thread id -> stack of [name, started, child_time]
+
+
+class phase:
+    """A context manager that attributes the time spent inside it to a named phase."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        if _profiler is not None:
+            _thread_phases.setdefault(threading.get_ident(), []).append([self.name, time.perf_counter(), 0.0])
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if _profiler is None:
+            return
+        stack = _thread_phases.get(threading.get_ident())
+        if not stack:
+            return
+        path = ";".join(entry[0] for entry in stack)
+        name, started, child_time = stack.pop()
+        elapsed = time.perf_counter() - started
+        if stack:
+            stack[-1][2] += elapsed
+        _profiler._add_phase_time(path, elapsed - child_time)
+
+
+def current_phases(thread_id: int) -> list[str]:
+    """Returns the phases a thread is currently in, outermost first."""
+    return [entry[0] for entry in list(_thread_phases.get(thread_id, ()))]
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Profiler:
+    """Profiles the process between `start` and `stop`, in one of two modes.
+
+    - "cprofile" runs the deterministic `cProfile` profiler on the thread that
+      started it and writes `<output>.prof`, which pstats, snakeviz and
+      flameprof read. Only that thread is traced, so run a single config (or
+      `--workers 1`) to profile the game loop this way.
+    - "sample" records the stack of every thread each `interval` seconds from a
+      background thread, prefixed with the phases the thread is in, and writes
+      `<output>.collapsed`. Its overhead does not depend on how many calls the
+      run makes, so it suits long and multi-team runs.
+
+    Both modes also write `<output>.phases.collapsed`: the wall-clock
+    microseconds spent in each phase, excluding nested phases.
+    """
+
+    def __init__(self, mode: str = "sample", output: str = "profile", interval: float = 0.005):
+        """Initializes the profiler.
+
+        Args:
+            mode: "cprofile" or "sample".
+            output: The path prefix of the files written by `stop`.
+            interval: Seconds between stack samples in "sample" mode.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        if interval <= 0:
+            raise ValueError("The sampling interval must be positive.")
+        self.mode = mode
+        self.output = output
+        self.interval = interval
+        self.phase_times: Counter[str] = Counter()
+        self.samples: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._profile: cProfile.Profile | None = None
+        self._sampler: threading.Thread | None = None
+
+    def start(self):
+        """Starts profiling and phase timing."""
+        global _profiler
+        if _profiler is not None:
+            raise RuntimeError("A profiler is already running.")
+        _thread_phases.clear()
+        _profiler = self
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = threading.Thread(target=self._sample, name="profiler", daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> list[str]:
+        """Stops profiling and writes the output files.
+
+        Returns:
+            The paths written.
+        """
+        global _profiler
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._stopped.set()
+            self._sampler.join()
+        _profiler = None
+
+        directory = os.path.dirname(self.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        paths = []
+        if self._profile is not None:
+            paths.append(f"{self.output}.prof")
+            self._profile.dump_stats(paths[-1])
+        else:
+            paths.append(f"{self.output}.collapsed")
+            self._write_collapsed(paths[-1], self.samples)
+        paths.append(f"{self.output}.phases.collapsed")
+        self._write_collapsed(paths[-1], {path: round(seconds * 1e6) for path, seconds in self.phase_times.items()})
+        logging.info(f"Profile written to {', '.join(paths)}")
+        return paths
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _add_phase_time(self, path: str, seconds: float):
+        with self._lock:
+            self.phase_times[path] += seconds
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(_frame_label(frame))
+                    frame = frame.f_back
+                phases = current_phases(thread_id) or ["other"]
+                self.samples[";".join(phases + frames[::-1])] += 1
+
+    @staticmethod
+    def _write_collapsed(path: str, counts):
+        with open(path, 'w') as f:
+            for stack, count in sorted(counts.items()):
+                if count > 0:
+                    f.write(f"{stack} {count}\n")